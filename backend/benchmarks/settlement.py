@@ -0,0 +1,112 @@
+# backend/benchmarks/settlement.py
+"""
+Speed and correctness of the trip settlement engine.
+
+Builds synthetic trips of increasing size and times computing the balances
+and settling them. Every settlement is checked to net to zero: applying its
+transfers must leave every member with a zero balance, with at most n - 1
+transfers. Small random groups also check that the exact settlement never
+needs more transfers than the greedy one.
+
+Run from the backend directory:
+
+    python -m benchmarks.settlement
+"""
+
+import random
+import time
+from utils.settlement import EXACT_MAX_MEMBERS, net_balances, settle
+
+SIZES = [(10, 100), (100, 1_000), (500, 5_000)]
+PROPERTY_RUNS = 500
+REPEAT = 5
+
+
+def synthetic_trip(participants: int, transactions: int) -> dict:
+    ids = [f"p{index}" for index in range(participants)]
+    trip = {
+        "participants": [
+            {
+                "id": member,
+                "name": member,
+                "initial_contribution": random.choice([0, 500, 1000, 1234.56]),
+            }
+            for member in ids
+        ],
+        "transactions": [],
+    }
+    for _ in range(transactions):
+        kind = random.choice(
+            ["leader_expense", "participant_outofpocket", "participant_contribution"]
+        )
+        payer = random.choice(ids)
+        trip["transactions"].append(
+            {
+                "type": kind,
+                "amount": round(random.uniform(1, 5000), 2),
+                "paid_by": "leader" if kind == "leader_expense" else payer,
+                "participant_id": None if kind == "leader_expense" else payer,
+            }
+        )
+    return trip
+
+
+def check_settles(net: dict, transfers: list):
+    assert sum(net.values()) == 0, "balances do not net to zero"
+    remaining = dict(net)
+    for debtor, creditor, cents in transfers:
+        assert cents > 0
+        remaining[debtor] += cents
+        remaining[creditor] -= cents
+    assert not any(remaining.values()), "transfers leave balances unsettled"
+    owing = sum(1 for cents in net.values() if cents)
+    assert len(transfers) <= max(owing - 1, 0)
+
+
+def check_properties():
+    for _ in range(PROPERTY_RUNS):
+        trip = synthetic_trip(
+            random.randint(1, EXACT_MAX_MEMBERS - 1), random.randint(0, 30)
+        )
+        _, _, net = net_balances(trip)
+        greedy, _ = settle(net, exact=False)
+        exact, method = settle(net, exact=True)
+        check_settles(net, greedy)
+        check_settles(net, exact)
+        assert method == "exact" or len(net) > EXACT_MAX_MEMBERS
+        assert len(exact) <= len(greedy)
+    # Groups that only settle optimally by pairing: greedy needs one more
+    net = {"leader": 0, "a": 500, "b": 300, "c": -300, "d": -500, "e": 100, "f": -100}
+    net["leader"] = -sum(net.values())
+    exact, _ = settle(net)
+    check_settles(net, exact)
+    assert len(exact) == 3, exact
+
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        function(*args)
+    return (time.perf_counter() - started) / REPEAT * 1e3
+
+
+def main():
+    random.seed(42)
+    check_properties()
+    print(f"{PROPERTY_RUNS} random groups: every settlement nets to zero")
+
+    for participants, transactions in SIZES:
+        trip = synthetic_trip(participants, transactions)
+        _, _, net = net_balances(trip)
+        transfers, method = settle(net)
+        check_settles(net, transfers)
+        print(
+            f"{participants:>4} participants, {transactions:>5} expenses:"
+            f"  balances {timed(net_balances, trip):6.2f} ms"
+            f"  settle {timed(settle, net):6.2f} ms"
+            f"  {len(transfers)} transfers ({method})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# backend/benchmarks/task_history.py
+"""
+Size and speed of the two habit-history representations.
+
+Builds a synthetic user with TASKS tasks and YEARS of daily history, then
+compares the BSON size of the tasks document and the time to answer one
+month of the calendar (what GET /api/tasks/history does per request).
+
+Run from the backend directory:
+
+    python -m benchmarks.task_history
+"""
+
+import random
+import time
+from datetime import date, timedelta
+import bson
+from utils.task_history import bits_from_history, days_in_month
+
+TASKS = 20
+YEARS = 3
+COMPLETION_RATE = 0.7
+REPEAT = 200
+
+
+def synthetic_history(days: int) -> list:
+    start = date.today() - timedelta(days=days)
+    return [
+        {
+            "date": (start + timedelta(days=offset)).isoformat(),
+            "completed": random.random() < COMPLETION_RATE,
+        }
+        for offset in range(days)
+    ]
+
+
+def build_documents():
+    histories = [synthetic_history(365 * YEARS) for _ in range(TASKS)]
+    as_list = {
+        "owner_id": "bench@example.com",
+        "categories": [
+            {
+                "name": "Bench",
+                "tasks": [
+                    {"id": task_id, "text": f"Task {task_id}", "history": history}
+                    for task_id, history in enumerate(histories)
+                ],
+            }
+        ],
+    }
+    as_bits = {
+        "owner_id": "bench@example.com",
+        "categories": [
+            {
+                "name": "Bench",
+                "tasks": [
+                    {
+                        "id": task_id,
+                        "text": f"Task {task_id}",
+                        "history_bits": bits_from_history(history),
+                    }
+                    for task_id, history in enumerate(histories)
+                ],
+            }
+        ],
+    }
+    return as_list, as_bits
+
+
+def month_from_list(doc: dict, key: str) -> dict:
+    return {
+        task["id"]: [
+            entry["date"]
+            for entry in task["history"]
+            if entry["completed"] and entry["date"].startswith(key)
+        ]
+        for task in doc["categories"][0]["tasks"]
+    }
+
+
+def month_from_bits(doc: dict, key: str) -> dict:
+    return {
+        task["id"]: days_in_month(key, task["history_bits"].get(key, 0))
+        for task in doc["categories"][0]["tasks"]
+    }
+
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        function(*args)
+    return (time.perf_counter() - started) / REPEAT * 1e6
+
+
+def main():
+    random.seed(42)
+    as_list, as_bits = build_documents()
+    key = date.today().strftime("%Y-%m")
+    assert month_from_list(as_list, key) == month_from_bits(as_bits, key)
+
+    list_bytes = bson.encode(as_list)
+    bits_bytes = bson.encode(as_bits)
+    print(f"{TASKS} tasks x {YEARS} years of daily history")
+    print(
+        f"  document size  list: {len(list_bytes):>9,} B   bits: {len(bits_bytes):>7,} B"
+    )
+    print(
+        f"  decode doc     list: {timed(bson.decode, list_bytes):>9.1f} us"
+        f"  bits: {timed(bson.decode, bits_bytes):>7.1f} us"
+    )
+    print(
+        f"  one month      list: {timed(month_from_list, as_list, key):>9.1f} us"
+        f"  bits: {timed(month_from_bits, as_bits, key):>7.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
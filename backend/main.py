@@ -1,9 +1,29 @@
 # backend/main.py
+import asyncio
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from utils.database import client  # Import the mongodb client
-from routes import auth, tasks, agent, transactions, categories, todos, trips, accounts
+from utils.database import client, database  # Import the mongodb client
+from utils.change_stream import hub
+from utils.indexes import ensure_indexes
+from migrations.runner import run_migrations
+from utils.payment_sweep import payment_sweep_loop
+from utils.task_archive import task_archive_loop
+from utils.trip_totals import trip_totals_loop
+from routes import (
+    auth,
+    tasks,
+    agent,
+    transactions,
+    categories,
+    todos,
+    trips,
+    accounts,
+    events,
+    search,
+    activity,
+)
 
 
 # --- Lifespan Manager for Database Connection ---
@@ -14,12 +34,25 @@ async def lifespan(app: FastAPI):
     try:
         await client.admin.command("ping")
         print("Successfully connected to MongoDB.")
+        await ensure_indexes(database)
+        # Schema repair happens once here (or via migrate.py), never on reads
+        if os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true":
+            await run_migrations(database)
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
 
+    # Background jobs
+    payment_sweep = asyncio.create_task(payment_sweep_loop(database))
+    task_archive = asyncio.create_task(task_archive_loop(database))
+    trip_totals = asyncio.create_task(trip_totals_loop(database))
+
     yield  # The application runs here
 
     # Code here runs on shutdown
+    payment_sweep.cancel()
+    task_archive.cancel()
+    trip_totals.cancel()
+    await hub.close()
     print("Closing the database connection...")
     client.close()
     print("Database connection closed.")
@@ -43,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # --- Include API Routers ---
@@ -62,6 +96,12 @@ app.include_router(
 app.include_router(todos.router, prefix="/api/todos", tags=["Todos"])
 # Add the new Trips router
 app.include_router(trips.router, prefix="/api/trips", tags=["Trips"])
+# Live change feed for open tabs and devices
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+# Full-text search across todos, transactions and trips
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+# Habits, todos and spending per day of a month, for the calendar
+app.include_router(activity.router, prefix="/api/activity", tags=["Activity"])
 
 
 # --- API Routes ---
@@ -0,0 +1,30 @@
+"""
+Apply pending data migrations (see migrations/runner.py).
+Run this at deploy time, or leave RUN_MIGRATIONS_ON_STARTUP enabled and let
+the app apply them when it starts:
+
+    python migrate.py          # apply pending migrations
+    python migrate.py --list   # show applied and pending migrations
+"""
+
+import asyncio
+import sys
+from utils.database import client, database
+from migrations.runner import MIGRATIONS, pending_migrations, run_migrations
+
+
+async def main():
+    if "--list" in sys.argv:
+        pending = {version for version, _, _ in await pending_migrations(database)}
+        for version, name, _ in MIGRATIONS:
+            state = "pending" if version in pending else "applied"
+            print(f"{version:03d} {name}: {state}")
+    else:
+        applied = await run_migrations(database)
+        print(f"{applied} migration(s) applied.")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+from typing import AsyncIterable, Awaitable, Callable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 5
+
+# (filter, update) for one document, or None to leave it alone
+Rewrite = Callable[[dict], Awaitable[Optional[Tuple[dict, dict]]]]
+
+
+async def bulk_write_batched(
+    collection: AsyncIOMotorCollection,
+    operations: AsyncIterable,
+    report: Callable[[str], None],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Stream write operations to the server in batches, reporting progress."""
+    batch = []
+    written = 0
+    async for operation in operations:
+        batch.append(operation)
+        if len(batch) >= batch_size:
+            await collection.bulk_write(batch, ordered=False)
+            written += len(batch)
+            batch = []
+            report(f"  {written} documents written")
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        written += len(batch)
+        report(f"  {written} documents written")
+    return written
+
+
+async def rewrite_documents(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    projection: dict,
+    rewrite: Rewrite,
+    report: Callable[[str], None],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Apply rewrite(document) to every document matching `query`, as a
+    compare-and-set: its filter must pin the values the update was derived
+    from. If a live worker (e.g. one not yet upgraded, during a rolling
+    deploy) changed the document in between, the write matches nothing and
+    the document is read again and rewritten from its new state, so that
+    worker's write is kept. Returns the number of documents rewritten.
+    """
+    written = 0
+    batch = []
+    async for document in collection.find(query, projection=projection):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            written += await _rewrite_batch(
+                collection, query, projection, rewrite, batch
+            )
+            batch = []
+            report(f"  {written} documents written")
+    if batch:
+        written += await _rewrite_batch(collection, query, projection, rewrite, batch)
+        report(f"  {written} documents written")
+    return written
+
+
+async def _rewrite_batch(
+    collection: AsyncIOMotorCollection,
+    query: dict,
+    projection: dict,
+    rewrite: Rewrite,
+    documents: List[dict],
+) -> int:
+    """One bulk_write per attempt; only documents whose filters missed are retried."""
+    written = 0
+    for _ in range(MAX_ATTEMPTS):
+        changes = []
+        for document in documents:
+            change = await rewrite(document)
+            if change is not None:
+                changes.append(UpdateOne(*change))
+        if not changes:
+            return written
+        result = await collection.bulk_write(changes, ordered=False)
+        written += result.matched_count
+        if result.matched_count == len(changes):
+            return written
+        # Rewritten documents no longer match `query` (or rewrite to None or
+        # to themselves), so this re-reads the ones whose filters missed
+        documents = await collection.find(
+            {**query, "_id": {"$in": [document["_id"] for document in documents]}},
+            projection=projection,
+        ).to_list(length=None)
+    raise RuntimeError("Documents kept changing; run the migration again")
@@ -0,0 +1,20 @@
+# backend/migrations/m001_todo_created_at.py
+"""Backfill createdAt on todos created before it existed, from the ObjectId."""
+
+from pymongo import UpdateOne
+from .batch import bulk_write_batched
+
+
+async def run(db, report):
+    async def operations():
+        async for todo in db.todos.find(
+            {"$or": [{"createdAt": {"$exists": False}}, {"createdAt": None}]},
+            projection={"_id": 1},
+        ):
+            yield UpdateOne(
+                {"_id": todo["_id"]},
+                {"$set": {"createdAt": todo["_id"].generation_time}},
+            )
+
+    migrated = await bulk_write_batched(db.todos, operations(), report)
+    return {"migrated": migrated}
@@ -0,0 +1,9 @@
+# backend/migrations/m002_category_usage.py
+"""Backfill category usage counters for transactions written before them."""
+
+from utils.category_usage import rebuild_category_usage
+
+
+async def run(db, report):
+    await rebuild_category_usage(db)
+    return {"usage_documents": await db.category_usage.count_documents({})}
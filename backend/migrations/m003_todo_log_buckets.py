@@ -0,0 +1,48 @@
+# backend/migrations/m003_todo_log_buckets.py
+"""Move embedded todo logs into todo_log_buckets and drop the logs arrays."""
+
+from bson import ObjectId
+from utils.todo_logs import LOG_BUCKET_SIZE
+from .batch import rewrite_documents
+
+
+async def run(db, report):
+    async def rewrite(todo):
+        logs = [{**log, "_id": log.get("_id") or ObjectId()} for log in todo["logs"]]
+        logs.sort(key=lambda log: log["_id"])
+        buckets = [
+            {
+                "todoId": todo["_id"],
+                "userId": todo["userId"],
+                "seq": seq,
+                "firstLogId": chunk[0]["_id"],
+                "count": len(chunk),
+                "logs": chunk,
+            }
+            for seq, chunk in enumerate(
+                logs[start : start + LOG_BUCKET_SIZE]
+                for start in range(0, len(logs), LOG_BUCKET_SIZE)
+            )
+        ]
+        # Buckets from an interrupted earlier run (or an earlier attempt at
+        # this todo) are replaced, not duplicated
+        await db.todo_log_buckets.delete_many({"todoId": todo["_id"]})
+        if buckets:
+            await db.todo_log_buckets.insert_many(buckets)
+        # Only drop the array if no log was added to it since it was read
+        return (
+            {"_id": todo["_id"], "logs": todo["logs"]},
+            {"$set": {"logCount": len(logs)}, "$unset": {"logs": ""}},
+        )
+
+    moved_todos = await rewrite_documents(
+        db.todos,
+        {"logs": {"$exists": True}},
+        {"userId": 1, "logs": 1},
+        rewrite,
+        report,
+    )
+    totals = await db.todo_log_buckets.aggregate(
+        [{"$group": {"_id": None, "logs": {"$sum": "$count"}}}]
+    ).to_list(length=1)
+    return {"todos": moved_todos, "logs": totals[0]["logs"] if totals else 0}
@@ -0,0 +1,23 @@
+# backend/migrations/m004_task_history_bits.py
+"""Fold every task's embedded history list into monthly history_bits."""
+
+from utils.task_history import encode_categories
+from .batch import rewrite_documents
+
+
+async def run(db, report):
+    async def rewrite(user_tasks):
+        categories = user_tasks["categories"]
+        return (
+            {"_id": user_tasks["_id"], "categories": categories},
+            {"$set": {"categories": encode_categories(categories)}},
+        )
+
+    migrated = await rewrite_documents(
+        db.tasks,
+        {"categories.tasks.history": {"$exists": True}},
+        {"categories": 1},
+        rewrite,
+        report,
+    )
+    return {"migrated": migrated}
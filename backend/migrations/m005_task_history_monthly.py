@@ -0,0 +1,18 @@
+# backend/migrations/m005_task_history_monthly.py
+"""Build task_history_monthly from every user's task history bits."""
+
+from utils.task_history import rebuild_monthly_index
+
+
+async def run(db, report):
+    users = 0
+    async for user_tasks in db.tasks.find(
+        {}, projection={"owner_id": 1, "categories": 1}
+    ):
+        await rebuild_monthly_index(
+            db, user_tasks["owner_id"], user_tasks["categories"]
+        )
+        users += 1
+        if users % 500 == 0:
+            report(f"  {users} users indexed")
+    return {"users": users}
@@ -0,0 +1,17 @@
+# backend/migrations/m006_task_streaks.py
+"""Compute the stored streak state of every existing task."""
+
+from utils.streaks import with_streaks
+from .batch import rewrite_documents
+
+
+async def run(db, report):
+    async def rewrite(user_tasks):
+        categories = user_tasks["categories"]
+        return (
+            {"_id": user_tasks["_id"], "categories": categories},
+            {"$set": {"categories": with_streaks(categories)}},
+        )
+
+    migrated = await rewrite_documents(db.tasks, {}, {"categories": 1}, rewrite, report)
+    return {"migrated": migrated}
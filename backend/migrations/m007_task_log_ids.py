@@ -0,0 +1,31 @@
+# backend/migrations/m007_task_log_ids.py
+"""Give every existing task daily log an id (and string dates)."""
+
+from utils.task_logs import needs_normalizing, normalize_log
+from .batch import rewrite_documents
+
+
+async def run(db, report):
+    async def rewrite(user_tasks):
+        query = {"_id": user_tasks["_id"]}
+        updates = {}
+        for c, category in enumerate(user_tasks.get("categories", [])):
+            for t, task in enumerate(category.get("tasks", [])):
+                logs = task.get("daily_logs") or []
+                if not any(needs_normalizing(log) for log in logs):
+                    continue
+                path = f"categories.{c}.tasks.{t}"
+                # Only if the task has not moved and its logs are as read
+                query[f"{path}.id"] = task["id"]
+                query[f"{path}.daily_logs"] = task.get("daily_logs")
+                updates[f"{path}.daily_logs"] = [normalize_log(log) for log in logs]
+        return (query, {"$set": updates}) if updates else None
+
+    migrated = await rewrite_documents(
+        db.tasks,
+        {"categories.tasks.daily_logs.0": {"$exists": True}},
+        {"categories.tasks.id": 1, "categories.tasks.daily_logs": 1},
+        rewrite,
+        report,
+    )
+    return {"migrated": migrated}
@@ -0,0 +1,29 @@
+# backend/migrations/m008_task_schedule.py
+"""Precompute the next due date of every existing task."""
+
+from datetime import date
+from utils.task_schedule import schedule_update
+from .batch import bulk_write_batched
+
+
+async def run(db, report):
+    today = date.today()
+
+    async def operations():
+        async for user_tasks in db.tasks.find(
+            {},
+            projection={
+                "owner_id": 1,
+                "categories.tasks.id": 1,
+                "categories.tasks.text": 1,
+                "categories.tasks.frequency": 1,
+                "categories.tasks.prescription": 1,
+                "categories.tasks.streak": 1,
+            },
+        ):
+            for category in user_tasks.get("categories", []):
+                for task in category.get("tasks", []):
+                    yield schedule_update(user_tasks["owner_id"], task, today)
+
+    scheduled = await bulk_write_batched(db.task_schedule, operations(), report)
+    return {"scheduled": scheduled}
@@ -0,0 +1,15 @@
+# backend/migrations/m009_trip_totals.py
+"""Store trip totals and participant aggregates for every existing trip."""
+
+from utils.trip_totals import verify_trip_totals
+
+
+async def run(db, report):
+    # Trips not yet moved by migration 010 still hold their transactions
+    embedded = await verify_trip_totals(
+        db, {"transactions": {"$exists": True}}, embedded=True
+    )
+    # Trips created since by upgraded workers keep them in trip_transactions
+    moved = await verify_trip_totals(db, {"transactions": {"$exists": False}})
+    report(f"  {len(embedded) + len(moved)} trips updated")
+    return {"updated": len(embedded) + len(moved)}
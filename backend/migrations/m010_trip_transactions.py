@@ -0,0 +1,56 @@
+# backend/migrations/m010_trip_transactions.py
+"""Move embedded trip transactions into trip_transactions and drop the arrays."""
+
+from pymongo import DeleteOne, ReplaceOne
+from pymongo.errors import OperationFailure
+from utils.trip_totals import verify_trip_totals
+from utils.trip_transactions import transaction_doc
+from .batch import rewrite_documents
+
+
+async def run(db, report):
+    # Ids copied by an earlier attempt at each trip, in case a live worker
+    # removed one from the array before its unset went through
+    copied = {}
+
+    async def rewrite(trip):
+        docs = [
+            transaction_doc(trip["_id"], trip["user_id"], transaction)
+            for transaction in trip["transactions"] or []
+        ]
+        ids = {doc["_id"] for doc in docs}
+        # Keyed by the transaction id, so a rerun does not duplicate
+        operations = [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs]
+        operations += [
+            DeleteOne({"_id": stale}) for stale in copied.get(trip["_id"], set()) - ids
+        ]
+        if operations:
+            await db.trip_transactions.bulk_write(operations, ordered=False)
+        copied[trip["_id"]] = ids
+        # Only drop the array if it still holds exactly what was copied
+        return (
+            {"_id": trip["_id"], "transactions": trip["transactions"]},
+            {"$unset": {"transactions": ""}},
+        )
+
+    trips = await rewrite_documents(
+        db.trips,
+        {"transactions": {"$exists": True}},
+        {"user_id": 1, "transactions": 1},
+        rewrite,
+        report,
+    )
+    # The text index now lives on trip_transactions
+    try:
+        await db.trips.drop_index("user_trip_transaction_text")
+    except OperationFailure:
+        pass
+
+    # Fills in the transaction counts and per-type totals
+    repaired = await verify_trip_totals(db)
+    report(f"  {len(repaired)} trips' totals updated")
+    return {
+        "moved": sum(len(ids) for ids in copied.values()),
+        "trips": trips,
+        "totals_updated": len(repaired),
+    }
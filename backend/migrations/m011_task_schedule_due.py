@@ -0,0 +1,8 @@
+# backend/migrations/m011_task_schedule_due.py
+"""Rewrite every task's schedule entry, now with last_completed and next_due."""
+
+from . import m008_task_schedule
+
+
+async def run(db, report):
+    return await m008_task_schedule.run(db, report)
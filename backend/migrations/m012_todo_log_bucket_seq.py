@@ -0,0 +1,29 @@
+# backend/migrations/m012_todo_log_bucket_seq.py
+"""Number every todo's log buckets and leave only the newest one open."""
+
+from pymongo import UpdateOne
+from utils.todo_logs import LOG_BUCKET_SIZE
+from .batch import bulk_write_batched
+
+
+async def run(db, report):
+    async def operations():
+        todo_id = None
+        async for bucket in db.todo_log_buckets.find(
+            {"seq": {"$exists": False}}, projection={"todoId": 1}
+        ).sort([("todoId", 1), ("firstLogId", -1)]):
+            update = {}
+            if bucket["todoId"] != todo_id:
+                todo_id, seq = bucket["todoId"], -1
+            else:
+                # Appends racing for a full bucket could open two; close all
+                # but the newest so logs stay in bucket order
+                update["$max"] = {"count": LOG_BUCKET_SIZE}
+            # Counting down from -1 stays below any bucket an upgraded worker
+            # has numbered from 0 in the meantime
+            update["$set"] = {"seq": seq}
+            yield UpdateOne({"_id": bucket["_id"]}, update)
+            seq -= 1
+
+    numbered = await bulk_write_batched(db.todo_log_buckets, operations(), report)
+    return {"numbered": numbered}
@@ -0,0 +1,88 @@
+# backend/migrations/m013_category_unique_names.py
+"""
+Merge categories that share a name and make (userId, name) unique.
+
+Categories created concurrently could end up with the same name. Each set of
+duplicates is folded into the oldest: sub-categories are merged by name and
+transactions re-pointed at the surviving ids. The unique index is built here
+rather than in ensure_indexes, which runs first and would fail on the
+duplicates.
+"""
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from utils.category_usage import rebuild_category_usage
+
+
+async def merge_categories(db, user_id: str, keep_id, duplicate_ids: list):
+    keep = await db.categories.find_one({"_id": keep_id})
+    subcategories = list(keep.get("subcategories", []))
+    by_name = {sub["name"]: sub["_id"] for sub in subcategories}
+    async for duplicate in db.categories.find({"_id": {"$in": duplicate_ids}}):
+        for sub in duplicate.get("subcategories", []):
+            if sub["name"] in by_name:
+                await db.transactions.update_many(
+                    {
+                        "userId": user_id,
+                        "categoryId": str(duplicate["_id"]),
+                        "subCategoryId": str(sub["_id"]),
+                    },
+                    {"$set": {"subCategoryId": str(by_name[sub["name"]])}},
+                )
+            else:
+                by_name[sub["name"]] = sub["_id"]
+                subcategories.append(sub)
+    await db.transactions.update_many(
+        {
+            "userId": user_id,
+            "categoryId": {"$in": [str(_id) for _id in duplicate_ids]},
+        },
+        {"$set": {"categoryId": str(keep_id)}},
+    )
+    await db.categories.update_one(
+        {"_id": keep_id}, {"$set": {"subcategories": subcategories}}
+    )
+    await db.categories.delete_many({"_id": {"$in": duplicate_ids}})
+    await db.category_usage.delete_many(
+        {"userId": user_id, "categoryId": {"$in": [str(_id) for _id in duplicate_ids]}}
+    )
+
+
+async def run(db, report):
+    merged = 0
+    async for group in db.categories.aggregate(
+        [
+            {"$sort": {"_id": 1}},
+            {
+                "$group": {
+                    "_id": {"userId": "$userId", "name": "$name"},
+                    "ids": {"$push": "$_id"},
+                }
+            },
+            {"$match": {"ids.1": {"$exists": True}}},
+        ],
+        allowDiskUse=True,
+    ):
+        keep_id, *duplicate_ids = group["ids"]
+        await merge_categories(db, group["_id"]["userId"], keep_id, duplicate_ids)
+        merged += len(duplicate_ids)
+        report(f"  {merged} duplicate categories merged")
+    if merged:
+        # Usage of the merged categories now counts under the survivors
+        await rebuild_category_usage(db)
+
+    # Replaces the earlier non-unique index of the same name
+    try:
+        await db.categories.drop_index("user_category_name")
+    except OperationFailure:
+        pass
+    await db.categories.create_indexes(
+        [
+            IndexModel(
+                [("userId", ASCENDING), ("name", ASCENDING)],
+                name="user_category_name",
+                unique=True,
+            ),
+        ]
+    )
+    return {"merged": merged}
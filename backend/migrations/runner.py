@@ -0,0 +1,79 @@
+# backend/migrations/runner.py
+"""
+Versioned data migrations.
+
+Each migration is an idempotent async step registered in MIGRATIONS with a
+unique, increasing version. Applied versions are recorded in the `migrations`
+collection, so every step runs once per database: at startup (see main.py) or
+from the command line with `python migrate.py`. Steps are safe to re-run, and
+each rewrite of a document is a compare-and-set on the values it was derived
+from (see batch.rewrite_documents), so two workers starting at the same time
+only repeat work, and a write made by a live worker while a step runs is
+re-read rather than overwritten.
+"""
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from . import (
+    m001_todo_created_at,
+    m002_category_usage,
+    m003_todo_log_buckets,
+    m004_task_history_bits,
+    m005_task_history_monthly,
+    m006_task_streaks,
+    m007_task_log_ids,
+    m008_task_schedule,
+    m009_trip_totals,
+    m010_trip_transactions,
+    m011_task_schedule_due,
+    m012_todo_log_bucket_seq,
+    m013_category_unique_names,
+)
+
+Report = Callable[[str], None]
+Step = Callable[[AsyncIOMotorDatabase, Report], Awaitable[dict]]
+
+MIGRATIONS: List[Tuple[int, str, Step]] = [
+    (1, "todo_created_at", m001_todo_created_at.run),
+    (2, "category_usage_backfill", m002_category_usage.run),
+    (3, "todo_log_buckets", m003_todo_log_buckets.run),
+    (4, "task_history_bits", m004_task_history_bits.run),
+    (5, "task_history_monthly", m005_task_history_monthly.run),
+    (6, "task_streaks", m006_task_streaks.run),
+    (7, "task_log_ids", m007_task_log_ids.run),
+    (8, "task_schedule", m008_task_schedule.run),
+    (9, "trip_totals", m009_trip_totals.run),
+    (10, "trip_transactions", m010_trip_transactions.run),
+    (11, "task_schedule_due", m011_task_schedule_due.run),
+    (12, "todo_log_bucket_seq", m012_todo_log_bucket_seq.run),
+    (13, "category_unique_names", m013_category_unique_names.run),
+]
+
+
+async def pending_migrations(db: AsyncIOMotorDatabase) -> List[Tuple[int, str, Step]]:
+    applied = {doc["_id"] async for doc in db.migrations.find({}, {"_id": 1})}
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+
+async def run_migrations(db: AsyncIOMotorDatabase, report: Report = print) -> int:
+    """Apply all pending migrations in version order; returns how many ran."""
+    pending = await pending_migrations(db)
+    for version, name, step in pending:
+        report(f"Applying migration {version:03d} {name}...")
+        started_at = datetime.now(timezone.utc)
+        stats = await step(db, report)
+        await db.migrations.update_one(
+            {"_id": version},
+            {
+                "$set": {
+                    "name": name,
+                    "startedAt": started_at,
+                    "appliedAt": datetime.now(timezone.utc),
+                    "stats": stats,
+                }
+            },
+            upsert=True,
+        )
+        report(f"Migration {version:03d} {name} done: {stats}")
+    return len(pending)
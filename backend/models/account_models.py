@@ -29,6 +29,9 @@ class Account(BaseModel):
     lastPaymentAmount: Optional[float] = None  # Last payment amount
     interestRate: Optional[float] = None  # APR percentage
     gracePeriodDays: Optional[int] = None  # Grace period for payments
+    # Precomputed by the payment-due sweep and on due-date changes
+    paymentUrgency: Optional[Literal["low", "medium", "high"]] = None
+    urgencyUpdatedAt: Optional[datetime] = None
 
 
 class CreateAccount(BaseModel):
@@ -107,5 +110,22 @@ class CreditCardPaymentSuggestion(BaseModel):
     payoffTimeline: Optional[str] = None  # Time to pay off at current rate
 
 
+class PaymentNotification(BaseModel):
+    """Due/overdue reminder written by the payment-due sweep"""
+
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    userId: str
+    accountId: str
+    accountName: Optional[str] = None
+    kind: Literal["due_soon", "overdue"]
+    paymentDueDate: datetime
+    daysUntilDue: int
+    amountDue: float
+    urgency: Literal["low", "medium", "high"]
+    message: str
+    read: bool = False
+    createdAt: datetime
+
+
 # Update PaymentOption forward reference
 CreditCardAnalysis.model_rebuild()
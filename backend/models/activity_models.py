@@ -0,0 +1,20 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class DayActivity(BaseModel):
+    date: str  # YYYY-MM-DD
+    habitsCompleted: int
+    todosCompleted: int
+    todosStarted: int
+    spent: float
+    expenses: int
+
+
+class MonthlyActivity(BaseModel):
+    year: int
+    month: int
+    # Task id -> completed dates, as served by /api/tasks/history
+    habits: Dict[int, List[str]]
+    days: List[DayActivity]
+    totalSpent: float
@@ -1,4 +1,5 @@
 # This file will define the structure for a main category and its sub-categories.
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from .user_models import PyObjectId
@@ -18,6 +19,23 @@ class Category(BaseModel):
     subcategories: List[SubCategory] = []
 
 
+class UsageStats(BaseModel):
+    count: int = 0
+    total: float = 0.0
+    lastUsed: Optional[datetime] = None
+
+
+class SubCategoryWithUsage(SubCategory):
+    usage: Optional[UsageStats] = None
+
+
+class CategoryWithUsage(Category):
+    """A category as returned by GET /api/categories when ranking by usage."""
+
+    subcategories: List[SubCategoryWithUsage] = []
+    usage: Optional[UsageStats] = None
+
+
 class CreateCategory(BaseModel):
     name: str
 
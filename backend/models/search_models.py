@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+
+SearchHitType = Literal["todo", "todo_log", "transaction", "trip_transaction"]
+
+
+class SearchHit(BaseModel):
+    type: SearchHitType
+    id: str
+    title: str
+    snippet: Optional[str] = None
+    score: float
+    date: Optional[datetime] = None
+    # Where the hit lives, for navigation in the frontend
+    todoId: Optional[str] = None
+    tripId: Optional[str] = None
+    accountId: Optional[str] = None
+    amount: Optional[float] = None
+
+
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit]
+    offset: int
+    limit: int
+    hasMore: bool
@@ -19,6 +19,7 @@ class TaskHistory(BaseModel):
 
 # Add this new model for a single log entry
 class DailyLog(BaseModel):
+    id: Optional[str] = None  # Assigned by the server when missing
     date: str  # Date in YYYY-MM-DD format
     note: str
     created_at: Optional[str] = None  # ISO string timestamp
@@ -68,6 +69,59 @@ class UserTasks(BaseModel):
     categories: List[Category]
 
 
+class ToggleDay(BaseModel):
+    completed: bool
+
+
+class DailyLogWrite(BaseModel):
+    date: str  # Date in YYYY-MM-DD format
+    note: str
+    created_at: Optional[str] = None  # Set by the server when not provided
+    id: Optional[str] = None  # Set by the server when not provided
+
+
+class MoveTask(BaseModel):
+    category_name: str
+
+
+class RenameCategory(BaseModel):
+    name: str = Field(..., min_length=1)
+
+
+class TaskStreak(BaseModel):
+    task_id: int
+    text: str
+    frequency: Optional[str] = None
+    unit: str  # "days", or "weeks" for N-per-week frequencies
+    current: int
+    longest: int
+    last_completed: Optional[str] = None
+    repaired: bool = False  # Only set by a recompute that fixed stored state
+
+
+class TaskPlan(BaseModel):
+    task_id: int
+    text: str
+    frequency: Optional[str] = None
+    prescription: bool = False
+    next_due: str  # YYYY-MM-DD
+    overdue: bool
+
+
+class HeatmapRow(BaseModel):
+    task_id: int
+    text: str
+    days: List[int]  # 1 if done, indexed by day of year (0 = January 1st)
+
+
+class TaskHeatmap(BaseModel):
+    year: int
+    start: str
+    tasks: List[HeatmapRow]
+    totals: List[int]  # Tasks done per day
+    ratios: List[float]  # Share of all tasks done per day
+
+
 class UserTasksCreate(BaseModel):
     """UserTasksCreate: The data we'll use when a new user saves their initial set of tasks."""
 
@@ -26,6 +26,9 @@ class TodoItem(BaseModel):
     createdAt: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     inProgressAt: Optional[datetime] = None
     completedAt: Optional[datetime] = None
+    position: Optional[float] = None  # Order within its Kanban column
+    logCount: int = 0
+    # Only the most recent logs, and only on single-todo responses
     logs: List[TodoLog] = []
 
     # 3. Add this serializer as well for the creation date
@@ -60,5 +63,51 @@ class UpdateTodo(BaseModel):
     completedAt: Optional[datetime] = None
 
 
+class TodoMove(BaseModel):
+    """One card's new column and/or position in a bulk Kanban update"""
+
+    id: str
+    status: Optional[TodoStatus] = None
+    position: Optional[float] = None
+
+
+class BulkUpdateTodos(BaseModel):
+    changes: List[TodoMove] = Field(..., min_length=1, max_length=500)
+
+
 class CreateTodoLog(BaseModel):
     notes: str
+
+
+class DurationStats(BaseModel):
+    """Lead or cycle time over the completed todos, in hours"""
+
+    count: int = 0
+    averageHours: Optional[float] = None
+    p50: Optional[float] = None
+    p85: Optional[float] = None
+    p95: Optional[float] = None
+
+
+class WeeklyCompletions(BaseModel):
+    weekStart: datetime
+    completed: int
+
+
+class ThroughputStats(BaseModel):
+    """Todos completed per week"""
+
+    p50: Optional[float] = None
+    p85: Optional[float] = None
+    p95: Optional[float] = None
+    weeks: List[WeeklyCompletions] = []
+
+
+class TodoAnalytics(BaseModel):
+    start: datetime
+    end: datetime
+    completed: int
+    wip: int
+    leadTime: DurationStats
+    cycleTime: DurationStats
+    throughput: ThroughputStats
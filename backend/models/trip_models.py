@@ -23,6 +23,7 @@ class Participant(BaseModel):
     email: Optional[str] = None
     initial_contribution: float = 0.0
     total_contributed: float = 0.0
+    paid_for_group: float = 0.0  # Out-of-pocket expenses paid for the group
     payment_method: Optional[str] = "cash"  # Default to cash for backward compatibility
 
     model_config = {
@@ -50,12 +51,26 @@ class Transaction(BaseModel):
     }
 
 
+class TransactionTypeTotals(BaseModel):
+    amount: float = 0.0
+    count: int = 0
+
+
+class TripTotals(BaseModel):
+    spent: float = 0.0  # Leader and out-of-pocket expenses
+    contributed: float = 0.0  # Initial and additional contributions
+    transaction_count: int = 0
+    by_category: Dict[str, float] = {}
+    by_type: Dict[str, TransactionTypeTotals] = {}
+
+
 class Trip(BaseModel):
     id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
     name: str
     destinations: List[str]
     participants: List[Participant] = []
-    transactions: List[Transaction] = []
+    transactions: List[Transaction] = []  # The most recent ones only
+    totals: TripTotals = TripTotals()
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     status: str = "planning"  # planning, active, completed
@@ -71,6 +86,45 @@ class Trip(BaseModel):
     }
 
 
+class TripSummary(BaseModel):
+    """A trip without its embedded arrays, for the trips overview."""
+
+    id: str
+    name: str
+    destinations: List[str]
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    status: str = "planning"
+    leader_id: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    participant_count: int
+    transaction_count: int
+    total_spent: float  # Leader and out-of-pocket expenses
+    total_contributed: float  # Initial and additional participant contributions
+
+
+class SettlementBalance(BaseModel):
+    member_id: str  # "leader" or a participant id
+    name: str
+    paid: float  # Paid for the group; for the leader, net of contributions held
+    net: float  # Positive: is owed money; negative: owes money
+
+
+class SettlementTransfer(BaseModel):
+    from_id: str
+    from_name: str
+    to_id: str
+    to_name: str
+    amount: float
+
+
+class TripSettlement(BaseModel):
+    method: str  # "exact" (fewest transfers) or "greedy"
+    balances: List[SettlementBalance]
+    transfers: List[SettlementTransfer]
+
+
 class TripCreate(BaseModel):
     name: str
     destinations: List[str]
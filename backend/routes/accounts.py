@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from utils.database import get_database
 from models.account_models import (
@@ -9,14 +9,24 @@ from models.account_models import (
     CreditCardAnalysis,
     PaymentOption,
     CreditCardPaymentSuggestion,
+    PaymentNotification,
 )
 from utils.security import get_current_user
+from utils.payment_sweep import days_until_due, payment_urgency
+from utils.versioning import bump_versions, conditional_get
 from bson import ObjectId
 from datetime import datetime, timedelta
 
 router = APIRouter()
 
 
+def urgency_fields(payment_due_date) -> dict:
+    """Precomputed urgency to store alongside a (new) payment due date."""
+    _, days_left = days_until_due(payment_due_date)
+    urgency, _ = payment_urgency(days_left)
+    return {"paymentUrgency": urgency, "urgencyUpdatedAt": datetime.now()}
+
+
 @router.post("/", response_model=Account, status_code=status.HTTP_201_CREATED)
 async def create_account(
     account_data: CreateAccount,
@@ -28,8 +38,11 @@ async def create_account(
     """
     account_dict = account_data.model_dump()
     account_dict["userId"] = user_id
+    if account_dict["accountType"] == "credit_card":
+        account_dict.update(urgency_fields(account_dict.get("paymentDueDate")))
 
     result = await db.accounts.insert_one(account_dict)
+    await bump_versions(db, user_id, "accounts")
     created_account = await db.accounts.find_one({"_id": result.inserted_id})
 
     return Account(**created_account)
@@ -37,17 +50,41 @@ async def create_account(
 
 @router.get("/", response_model=List[Account])
 async def get_user_accounts(
+    request: Request,
+    response: Response,
     db: AsyncIOMotorDatabase = Depends(get_database),
     user_id: str = Depends(get_current_user),
 ):
     """
     Retrieve all accounts for the logged-in user.
     """
+    not_modified = await conditional_get(request, response, db, user_id, "accounts")
+    if not_modified:
+        return not_modified
+
     accounts_cursor = db.accounts.find({"userId": user_id})
     accounts = await accounts_cursor.to_list(length=10)
     return [Account(**account) for account in accounts]
 
 
+@router.get("/notifications", response_model=List[PaymentNotification])
+async def get_payment_notifications(
+    unread_only: bool = False,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Retrieve the due/overdue reminders produced by the payment-due sweep.
+    """
+    query = {"userId": user_id}
+    if unread_only:
+        query["read"] = False
+
+    notifications_cursor = db.payment_notifications.find(query).sort("createdAt", -1)
+    notifications = await notifications_cursor.to_list(length=50)
+    return [PaymentNotification(**notification) for notification in notifications]
+
+
 @router.get("/{account_id}", response_model=Account)
 async def get_account(
     account_id: str,
@@ -96,6 +133,9 @@ async def update_account(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No update data provided"
         )
 
+    if "paymentDueDate" in update_data:
+        update_data.update(urgency_fields(update_data["paymentDueDate"]))
+
     result = await db.accounts.update_one(
         {"_id": ObjectId(account_id), "userId": user_id}, {"$set": update_data}
     )
@@ -105,6 +145,7 @@ async def update_account(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found or you don't have permission to update it",
         )
+    await bump_versions(db, user_id, "accounts")
 
     updated_account = await db.accounts.find_one({"_id": ObjectId(account_id)})
     return Account(**updated_account)
@@ -133,6 +174,7 @@ async def delete_account(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found or you don't have permission to delete it",
         )
+    await bump_versions(db, user_id, "accounts")
 
     return
 
@@ -259,25 +301,8 @@ async def get_payment_suggestions(
     payment_due_date = account.get("paymentDueDate")
 
     # Calculate urgency
-    urgency = "low"
-    reasoning = "Regular payment maintains good credit standing"
-
-    if payment_due_date:
-        if isinstance(payment_due_date, str):
-            payment_due_date = datetime.fromisoformat(
-                payment_due_date.replace("Z", "+00:00")
-            )
-        days_until_due = (payment_due_date.date() - datetime.now().date()).days
-
-        if days_until_due < 0:
-            urgency = "high"
-            reasoning = "Payment is overdue! Pay immediately to avoid penalties"
-        elif days_until_due <= 3:
-            urgency = "high"
-            reasoning = "Payment due very soon, pay now to avoid late fees"
-        elif days_until_due <= 7:
-            urgency = "medium"
-            reasoning = "Payment due within a week, plan payment soon"
+    _, days_left = days_until_due(payment_due_date)
+    urgency, reasoning = payment_urgency(days_left)
 
     # Calculate recommended amount based on available budget
     recommended_amount = minimum_due
@@ -0,0 +1,50 @@
+# backend/routes/activity.py
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.database import get_database
+from utils.security import get_current_user
+from utils.versioning import conditional_get
+from utils.monthly_activity import activity_cache, compute_monthly_activity
+from models.activity_models import MonthlyActivity
+
+router = APIRouter()
+
+
+@router.get("/monthly", response_model=MonthlyActivity)
+async def get_monthly_activity(
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Per-day habit completions, todos completed and started, and spending for
+    one month (defaults to the current one), for the monthly calendar.
+    """
+    today = date.today()
+    year = year or today.year
+    month = month or today.month
+    # Without `year` and `month` the URL stays the same from month to month
+    not_modified = await conditional_get(
+        request,
+        response,
+        db,
+        user_id,
+        "tasks",
+        "todos",
+        "transactions",
+        variant=f"{year}-{month}",
+    )
+    if not_modified:
+        return not_modified
+
+    etag = response.headers["ETag"]
+    activity = activity_cache.get((user_id, year, month), etag)
+    if activity is None:
+        activity = await compute_monthly_activity(db, user_id, year, month)
+        activity_cache.put((user_id, year, month), etag, activity)
+    return activity
@@ -1,11 +1,20 @@
-from fastapi import APIRouter
+import json
+import re
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from langchain_core.messages import HumanMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 # https://python.langchain.com/docs/integrations/chat/google_generative_ai/
 import getpass
 import os
 
+from utils.database import get_database
+from utils.security import get_current_user
+from utils.category_cache import UserCategories, category_cache
+from utils.categorizer import MIN_CONFIDENCE, categorizer
+
 if "GOOGLE_API_KEY" not in os.environ:
     os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter your Google AI API key: ")
 
@@ -16,6 +25,17 @@ class AgentRequest(BaseModel):
     message: str
 
 
+class CategorizeRequest(BaseModel):
+    text: str  # e.g. "chai at Raghavendra hotel"
+
+
+class CategorySuggestion(BaseModel):
+    categoryId: Optional[str] = None
+    subCategoryId: Optional[str] = None
+    confidence: float = 0.0
+    source: Literal["local", "llm", "none"]
+
+
 @router.post("/invoke")
 async def invoke_agent(request: AgentRequest):
     # Initialize the Gemini model
@@ -27,3 +47,86 @@ async def invoke_agent(request: AgentRequest):
     response = model.invoke([HumanMessage(content=request.message)])
 
     return {"response": response.content}
+
+
+@router.post("/categorize", response_model=CategorySuggestion)
+async def categorize(
+    request: CategorizeRequest,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Suggest a category and sub-category for free text.
+    The local categorizer, trained on the user's own transactions, answers
+    whenever it is confident; only the remaining inputs are sent to the LLM.
+    """
+    suggestion = await categorizer.suggest(db, user_id, request.text)
+    if suggestion and suggestion[1] >= MIN_CONFIDENCE:
+        (category_id, subcategory_id), confidence = suggestion
+        return CategorySuggestion(
+            categoryId=category_id,
+            subCategoryId=subcategory_id,
+            confidence=round(confidence, 3),
+            source="local",
+        )
+
+    user_categories = await category_cache.get(db, user_id)
+    llm_choice = await ask_llm_for_category(request.text, user_categories)
+    if llm_choice:
+        category_id, subcategory_id = llm_choice
+        return CategorySuggestion(
+            categoryId=category_id, subCategoryId=subcategory_id, source="llm"
+        )
+
+    # Fall back to the best local guess, however unsure
+    if suggestion:
+        (category_id, subcategory_id), confidence = suggestion
+        return CategorySuggestion(
+            categoryId=category_id,
+            subCategoryId=subcategory_id,
+            confidence=round(confidence, 3),
+            source="local",
+        )
+    return CategorySuggestion(source="none")
+
+
+async def ask_llm_for_category(
+    text: str, user_categories: UserCategories
+) -> Optional[tuple]:
+    """Ask Gemini to pick one of the user's categories; None if it cannot."""
+    if not user_categories.categories:
+        return None
+
+    lines = []
+    for category in user_categories.categories:
+        lines.append(f'- categoryId "{category["_id"]}": {category["name"]}')
+        for sub in category.get("subcategories", []):
+            lines.append(f'  - subCategoryId "{sub["_id"]}": {sub["name"]}')
+
+    prompt = (
+        "Pick the best category for this expense or income note.\n"
+        f"Note: {text}\n"
+        "Categories:\n" + "\n".join(lines) + "\n"
+        'Reply with JSON only: {"categoryId": "...", "subCategoryId": "..." or null}'
+    )
+
+    try:
+        model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")
+        response = await model.ainvoke([HumanMessage(content=prompt)])
+        match = re.search(r"\{.*\}", str(response.content), re.DOTALL)
+        choice = json.loads(match.group(0)) if match else {}
+    except Exception as e:
+        print(f"LLM categorization failed: {e}")
+        return None
+
+    # Only accept ids that really belong to this user
+    category = user_categories.by_id.get(str(choice.get("categoryId")))
+    if category is None:
+        return None
+    subcategory_id = choice.get("subCategoryId")
+    if not any(
+        str(sub["_id"]) == str(subcategory_id)
+        for sub in category.get("subcategories", [])
+    ):
+        subcategory_id = None
+    return str(category["_id"]), subcategory_id
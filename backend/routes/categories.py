@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import List, Literal, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from utils.database import get_database
 from utils.security import get_current_user
+from utils.category_cache import category_cache
+from utils.versioning import bump_versions, conditional_get
+from utils.category_usage import categories_by_usage
 from models.category_models import (
     Category,
+    CategoryWithUsage,
     CreateCategory,
     SubCategory,
     CreateSubCategory,
@@ -22,29 +27,55 @@ async def create_category(
     user_id: str = Depends(get_current_user),
 ):
     """Creates a new main category for the user."""
-    # Check for duplicate category name
-    existing_category = await db.categories.find_one(
-        {"userId": user_id, "name": category_data.name}
-    )
-    if existing_category:
+    # Check for duplicate category name: the cache answers most requests, and
+    # on a miss the unique (userId, name) index decides
+    user_categories = await category_cache.get(db, user_id)
+    if category_data.name in user_categories.by_name:
         raise HTTPException(
             status_code=400, detail="A category with this name already exists."
         )
-
-    category_doc = {"name": category_data.name, "userId": user_id, "subcategories": []}
-    result = await db.categories.insert_one(category_doc)
-    created_category = await db.categories.find_one({"_id": result.inserted_id})
+    try:
+        result = await db.categories.update_one(
+            {"userId": user_id, "name": category_data.name},
+            {"$setOnInsert": {"subcategories": []}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        raise HTTPException(
+            status_code=400, detail="A category with this name already exists."
+        )
+    category_cache.invalidate(user_id)
+    await bump_versions(db, user_id, "categories")
+    created_category = await db.categories.find_one({"_id": result.upserted_id})
     return Category(**created_category)
 
 
-@router.get("/", response_model=List[Category])
+@router.get("/", response_model=List[CategoryWithUsage])
 async def get_user_categories(
+    request: Request,
+    response: Response,
+    sort: Optional[Literal["frequency", "recency"]] = None,
     db: AsyncIOMotorDatabase = Depends(get_database),
     user_id: str = Depends(get_current_user),
 ):
-    """Retrieves all categories and their sub-categories for the user."""
-    categories_cursor = db.categories.find({"userId": user_id})
-    return await categories_cursor.to_list(length=100)
+    """
+    Retrieves all categories and their sub-categories for the user.
+    With `sort`, categories and sub-categories come with their usage stats,
+    most used (frequency) or most recently used (recency) first.
+    """
+    # Usage changes with every transaction, so ranked lists depend on both
+    collections = ("categories", "transactions") if sort else ("categories",)
+    not_modified = await conditional_get(request, response, db, user_id, *collections)
+    if not_modified:
+        return not_modified
+
+    user_categories = await category_cache.get(db, user_id)
+    if sort:
+        return await categories_by_usage(db, user_id, user_categories.categories, sort)
+    # Copies: the cached dicts are shared with every other request
+    return user_categories.copies()
 
 
 @router.post("/{category_id}/subcategories", response_model=Category)
@@ -58,15 +89,10 @@ async def create_subcategory(
     if not ObjectId.is_valid(category_id):
         raise HTTPException(status_code=400, detail="Invalid category ID.")
 
-    # Find the parent category
-    parent_category = await db.categories.find_one(
-        {"_id": ObjectId(category_id), "userId": user_id}
-    )
-    if not parent_category:
-        raise HTTPException(status_code=404, detail="Parent category not found.")
-
     # Check for duplicate sub-category name within the same category
-    if any(
+    user_categories = await category_cache.get(db, user_id)
+    parent_category = user_categories.by_id.get(category_id)
+    if parent_category and any(
         sub["name"] == subcategory_data.name
         for sub in parent_category.get("subcategories", [])
     ):
@@ -76,10 +102,26 @@ async def create_subcategory(
 
     new_sub = SubCategory(name=subcategory_data.name)
 
-    await db.categories.update_one(
-        {"_id": ObjectId(category_id)},
+    # Push only if the category has no sub-category of that name yet
+    result = await db.categories.update_one(
+        {
+            "_id": ObjectId(category_id),
+            "userId": user_id,
+            "subcategories.name": {"$ne": subcategory_data.name},
+        },
         {"$push": {"subcategories": new_sub.model_dump(by_alias=True)}},
     )
+    if result.matched_count == 0:
+        parent_exists = await db.categories.count_documents(
+            {"_id": ObjectId(category_id), "userId": user_id}, limit=1
+        )
+        if not parent_exists:
+            raise HTTPException(status_code=404, detail="Parent category not found.")
+        raise HTTPException(
+            status_code=400, detail="This sub-category already exists in this category."
+        )
+    category_cache.invalidate(user_id)
+    await bump_versions(db, user_id, "categories")
 
     updated_category = await db.categories.find_one({"_id": ObjectId(category_id)})
     return Category(**updated_category)
@@ -101,9 +143,10 @@ async def delete_category(
     result = await db.categories.delete_one(
         {"_id": ObjectId(category_id), "userId": user_id}
     )
-
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found.")
+    category_cache.invalidate(user_id)
+    await bump_versions(db, user_id, "categories")
 
 
 @router.delete(
@@ -122,21 +165,17 @@ async def delete_subcategory(
             status_code=400, detail="Invalid category or subcategory ID."
         )
 
-    # Find the parent category
-    parent_category = await db.categories.find_one(
-        {"_id": ObjectId(category_id), "userId": user_id}
-    )
-    if not parent_category:
-        raise HTTPException(status_code=404, detail="Category not found.")
-
     # Remove the subcategory
     result = await db.categories.update_one(
-        {"_id": ObjectId(category_id)},
+        {"_id": ObjectId(category_id), "userId": user_id},
         {"$pull": {"subcategories": {"_id": ObjectId(subcategory_id)}}},
     )
-
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Category not found.")
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Subcategory not found.")
+    category_cache.invalidate(user_id)
+    await bump_versions(db, user_id, "categories")
 
 
 # UPDATE endpoints for categories and sub-categories
@@ -153,26 +192,27 @@ async def update_category(
     if not ObjectId.is_valid(category_id):
         raise HTTPException(status_code=400, detail="Invalid category ID.")
 
-    # Check for duplicate category name (excluding current category)
-    existing_category = await db.categories.find_one(
-        {
-            "userId": user_id,
-            "name": category_data.name,
-            "_id": {"$ne": ObjectId(category_id)},
-        }
-    )
-    if existing_category:
+    # Check for duplicate category name (excluding current category): the
+    # cache answers most requests, and on a miss the unique index decides
+    user_categories = await category_cache.get(db, user_id)
+    existing_category = user_categories.by_name.get(category_data.name)
+    duplicate = existing_category and str(existing_category["_id"]) != category_id
+    if not duplicate:
+        try:
+            result = await db.categories.update_one(
+                {"_id": ObjectId(category_id), "userId": user_id},
+                {"$set": {"name": category_data.name}},
+            )
+        except DuplicateKeyError:
+            duplicate = True
+    if duplicate:
         raise HTTPException(
             status_code=400, detail="A category with this name already exists."
         )
-
-    result = await db.categories.update_one(
-        {"_id": ObjectId(category_id), "userId": user_id},
-        {"$set": {"name": category_data.name}},
-    )
-
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Category not found.")
+    category_cache.invalidate(user_id)
+    await bump_versions(db, user_id, "categories")
 
     updated_category = await db.categories.find_one({"_id": ObjectId(category_id)})
     return Category(**updated_category)
@@ -192,15 +232,10 @@ async def update_subcategory(
             status_code=400, detail="Invalid category or subcategory ID."
         )
 
-    # Find the parent category
-    parent_category = await db.categories.find_one(
-        {"_id": ObjectId(category_id), "userId": user_id}
-    )
-    if not parent_category:
-        raise HTTPException(status_code=404, detail="Category not found.")
-
     # Check for duplicate sub-category name (excluding current subcategory)
-    if any(
+    user_categories = await category_cache.get(db, user_id)
+    parent_category = user_categories.by_id.get(category_id)
+    if parent_category and any(
         sub["name"] == subcategory_data.name and str(sub["_id"]) != subcategory_id
         for sub in parent_category.get("subcategories", [])
     ):
@@ -209,14 +244,41 @@ async def update_subcategory(
             detail="This sub-category name already exists in this category.",
         )
 
-    # Update the subcategory
+    # Rename only if no other sub-category of the category has the name
     result = await db.categories.update_one(
-        {"_id": ObjectId(category_id), "subcategories._id": ObjectId(subcategory_id)},
+        {
+            "_id": ObjectId(category_id),
+            "userId": user_id,
+            "subcategories._id": ObjectId(subcategory_id),
+            "subcategories": {
+                "$not": {
+                    "$elemMatch": {
+                        "name": subcategory_data.name,
+                        "_id": {"$ne": ObjectId(subcategory_id)},
+                    }
+                }
+            },
+        },
         {"$set": {"subcategories.$.name": subcategory_data.name}},
     )
-
-    if result.modified_count == 0:
+    if result.matched_count == 0:
+        parent_category = await db.categories.find_one(
+            {"_id": ObjectId(category_id), "userId": user_id},
+            projection={"subcategories": 1},
+        )
+        if not parent_category:
+            raise HTTPException(status_code=404, detail="Category not found.")
+        subcategories = parent_category.get("subcategories", [])
+        if any(sub["_id"] == ObjectId(subcategory_id) for sub in subcategories):
+            raise HTTPException(
+                status_code=400,
+                detail="This sub-category name already exists in this category.",
+            )
         raise HTTPException(status_code=404, detail="Subcategory not found.")
+    # Renaming to the current name matches without modifying: nothing changed
+    if result.modified_count:
+        category_cache.invalidate(user_id)
+        await bump_versions(db, user_id, "categories")
 
     updated_category = await db.categories.find_one({"_id": ObjectId(category_id)})
     return Category(**updated_category)
@@ -0,0 +1,60 @@
+# backend/routes/events.py
+import asyncio
+import json
+from datetime import datetime
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from utils.change_stream import hub
+from utils.security import get_current_user
+
+router = APIRouter()
+
+# Comment lines keep proxies and load balancers from closing idle connections
+HEARTBEAT_SECONDS = 15
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def format_sse(event: dict) -> str:
+    return (
+        f"event: {event['type']}\ndata: {json.dumps(event, default=_json_default)}\n\n"
+    )
+
+
+@router.get("/stream")
+async def stream_events(request: Request, user_id: str = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of changes to the user's accounts, transactions,
+    todos and trips. Each "change" event is a compact diff:
+    inserts/replaces carry the document, updates only the changed fields and
+    deletes only the id. A "resync" event means the client should refetch.
+    """
+    queue = hub.subscribe(user_id)
+
+    async def event_source():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            hub.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
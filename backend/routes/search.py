@@ -0,0 +1,244 @@
+# backend/routes/search.py
+import asyncio
+import re
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.database import get_database
+from utils.security import get_current_user
+from models.search_models import SearchHitType, SearchResults
+
+router = APIRouter()
+
+MAX_OFFSET = 200
+SNIPPET_LENGTH = 160
+
+
+def _snippet(text: Optional[str]) -> Optional[str]:
+    if not text or len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rstrip() + "…"
+
+
+def _term_pattern(query: str) -> str:
+    """Regex matching any search term, to pick the matching embedded entries."""
+    terms = re.findall(r"\w+", query)
+    return "|".join(re.escape(term) for term in terms) or re.escape(query)
+
+
+def _text_stage(owner_field: str, user_id: str, query: str) -> dict:
+    # The text indexes are prefixed with the owner field, so this equality
+    # match selects the user's slice of the index instead of filtering after.
+    return {"$match": {owner_field: user_id, "$text": {"$search": query}}}
+
+
+def _matching(array: str, field: str, pattern: str) -> dict:
+    return {
+        "$filter": {
+            "input": {"$ifNull": [array, []]},
+            "as": "entry",
+            "cond": {
+                "$regexMatch": {
+                    "input": {"$ifNull": [f"$$entry.{field}", ""]},
+                    "regex": pattern,
+                    "options": "i",
+                }
+            },
+        }
+    }
+
+
+async def search_todos(db, user_id: str, query: str, count: int) -> List[dict]:
+    pipeline = [
+        _text_stage("userId", user_id, query),
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": count},
+        {
+            "$project": {
+                "title": 1,
+                "notes": 1,
+                "createdAt": 1,
+                "score": {"$meta": "textScore"},
+            }
+        },
+    ]
+    return [
+        {
+            "type": "todo",
+            "id": str(todo["_id"]),
+            "title": todo["title"],
+            "snippet": _snippet(todo.get("notes")),
+            "score": todo["score"],
+            "date": todo.get("createdAt"),
+            "todoId": str(todo["_id"]),
+        }
+        async for todo in db.todos.aggregate(pipeline)
+    ]
+
+
+async def search_todo_logs(db, user_id: str, query: str, count: int) -> List[dict]:
+    pipeline = [
+        _text_stage("userId", user_id, query),
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": count},
+        {
+            "$project": {
+                "todoId": 1,
+                "score": {"$meta": "textScore"},
+                "logs": _matching("$logs", "notes", _term_pattern(query)),
+            }
+        },
+        {
+            "$lookup": {
+                "from": "todos",
+                "localField": "todoId",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"title": 1}}],
+                "as": "todo",
+            }
+        },
+    ]
+    hits = []
+    async for bucket in db.todo_log_buckets.aggregate(pipeline):
+        if not bucket["todo"]:
+            continue
+        for log in bucket["logs"]:
+            hits.append(
+                {
+                    "type": "todo_log",
+                    "id": str(log["_id"]),
+                    "title": bucket["todo"][0]["title"],
+                    "snippet": _snippet(log.get("notes")),
+                    "score": bucket["score"],
+                    "date": log.get("timestamp"),
+                    "todoId": str(bucket["todoId"]),
+                }
+            )
+    return hits
+
+
+async def search_transactions(db, user_id: str, query: str, count: int) -> List[dict]:
+    pipeline = [
+        _text_stage("userId", user_id, query),
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": count},
+        {
+            "$project": {
+                "notes": 1,
+                "date": 1,
+                "accountId": 1,
+                "amount": 1,
+                "score": {"$meta": "textScore"},
+            }
+        },
+    ]
+    return [
+        {
+            "type": "transaction",
+            "id": str(transaction["_id"]),
+            "title": _snippet(transaction.get("notes")) or "",
+            "score": transaction["score"],
+            "date": transaction.get("date"),
+            "accountId": transaction.get("accountId"),
+            "amount": transaction.get("amount"),
+        }
+        async for transaction in db.transactions.aggregate(pipeline)
+    ]
+
+
+async def search_trip_transactions(
+    db, user_id: str, query: str, count: int
+) -> List[dict]:
+    pipeline = [
+        _text_stage("user_id", user_id, query),
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": count},
+        {
+            "$project": {
+                "trip_id": 1,
+                "description": 1,
+                "date": 1,
+                "amount": 1,
+                "score": {"$meta": "textScore"},
+            }
+        },
+        {
+            "$lookup": {
+                "from": "trips",
+                "localField": "trip_id",
+                "foreignField": "_id",
+                "pipeline": [{"$project": {"name": 1}}],
+                "as": "trip",
+            }
+        },
+    ]
+    hits = []
+    async for transaction in db.trip_transactions.aggregate(pipeline):
+        if not transaction["trip"]:
+            continue
+        hits.append(
+            {
+                "type": "trip_transaction",
+                "id": str(transaction["_id"]),
+                "title": transaction.get("description") or "",
+                "snippet": transaction["trip"][0]["name"],
+                "score": transaction["score"],
+                "date": transaction.get("date"),
+                "tripId": str(transaction["trip_id"]),
+                "amount": transaction.get("amount"),
+            }
+        )
+    return hits
+
+
+SEARCHES = {
+    "todo": search_todos,
+    "todo_log": search_todo_logs,
+    "transaction": search_transactions,
+    "trip_transaction": search_trip_transactions,
+}
+
+# Fixed per-collection factors putting raw textScores on one scale: each is
+# 1 / the largest field weight of that collection's text index (todo titles
+# weigh 3, see utils/indexes.py), so a full match of the best field scores
+# alike whichever collection it is in.
+SCORE_WEIGHTS = {
+    "todo": 1 / 3,
+    "todo_log": 1.0,
+    "transaction": 1.0,
+    "trip_transaction": 1.0,
+}
+# Equal scores interleave in this order, then by id, so pages never shuffle
+TYPE_ORDER = {hit_type: order for order, hit_type in enumerate(SEARCHES)}
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    types: Optional[List[SearchHitType]] = Query(None),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=MAX_OFFSET),
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Ranked full-text search over the user's todos and todo logs, transaction
+    notes and trip expense descriptions. All collections are searched at once;
+    hits are merged by text score, weighted per collection (SCORE_WEIGHTS).
+    """
+    # Every source must supply enough top hits to fill the requested page
+    count = offset + limit + 1
+    searches = [SEARCHES[hit_type] for hit_type in dict.fromkeys(types or SEARCHES)]
+    results = await asyncio.gather(*(run(db, user_id, q, count) for run in searches))
+
+    hits = [hit for result in results for hit in result]
+    for hit in hits:
+        hit["score"] *= SCORE_WEIGHTS[hit["type"]]
+    hits.sort(key=lambda hit: (-hit["score"], TYPE_ORDER[hit["type"]], hit["id"]))
+    return {
+        "query": q,
+        "hits": hits[offset : offset + limit],
+        "offset": offset,
+        "limit": limit,
+        "hasMore": len(hits) > offset + limit,
+    }
@@ -1,24 +1,116 @@
-from typing import Dict, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.task_models import UserTasks, Category
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from models.task_models import (
+    UserTasks,
+    Category,
+    ToggleDay,
+    DailyLogWrite,
+    MoveTask,
+    RenameCategory,
+    TaskStreak,
+    TaskHeatmap,
+    TaskPlan,
+)
 from utils.database import database
 from utils.security import get_current_user
-from datetime import date, datetime
-from calendar import monthrange
+from utils.versioning import VersionedCache, bump_versions, conditional_get
+from utils.task_history import (
+    day_mask,
+    decode_user_tasks,
+    encode_categories,
+    get_month,
+    get_year_heatmap,
+    month_key,
+    rebuild_monthly_index,
+    record_day,
+)
+from utils.task_schedule import get_due, rebuild_schedule, schedule_update
+from utils.task_logs import log_match, new_log_id, with_log_ids
+from utils.task_archive import (
+    archived_before,
+    delete_archived_log,
+    is_archived,
+    merge_archived_month,
+    set_archived_day,
+    streak_bases,
+    update_archived_log,
+)
+from utils.streaks import (
+    compute_task,
+    current_streak,
+    parse_frequency,
+    toggle as toggle_streak,
+    with_streaks,
+)
+from datetime import date, datetime, timezone
+from pymongo import ReturnDocument, UpdateOne
 
 router = APIRouter()
 tasks_collection = database.get_collection("tasks")
+# Heatmaps per (user, year), valid until the user's next task write
+heatmap_cache = VersionedCache()
+
+# What streak bookkeeping needs to know about every task
+STREAK_PROJECTION = {
+    "categories.tasks.id": 1,
+    "categories.tasks.text": 1,
+    "categories.tasks.frequency": 1,
+    "categories.tasks.streak": 1,
+    "categories.tasks.history_bits": 1,
+    "categories.tasks.prescription": 1,
+    "archive.before": 1,
+    "archive.streak_base": 1,
+}
+
+# Task-level updates address one task through array filters: categories.$[]
+# visits every category and tasks.$[t] (with {"t.id": task_id}) only the task.
+TASK_PATH = "categories.$[].tasks.$[t]"
+
+
+def _task_has(task_id: int, condition: dict) -> dict:
+    """Query matching a user document whose task `task_id` satisfies `condition`."""
+    return {"categories.tasks": {"$elemMatch": {"id": task_id, **condition}}}
+
+
+def _find_task(user_tasks_doc: dict, task_id: int) -> dict:
+    for category in user_tasks_doc.get("categories", []):
+        for task in category.get("tasks", []):
+            if task.get("id") == task_id:
+                return task
+    return {}
 
 
 @router.get("/", response_model=UserTasks)
-async def get_user_tasks(current_user_email: str = Depends(get_current_user)):
+async def get_user_tasks(
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    current_user_email: str = Depends(get_current_user),
+):
     """
     Retrieve all tasks and categories for the logged-in user.
     If they don't have any tasks set up, it returns an empty list.
+
+    History and logs older than the archive horizon are not included; pass
+    `year` and `month` to have that month merged in from the archive.
     """
+    if (year is None) != (month is None):
+        raise HTTPException(
+            status_code=400, detail="year and month must be given together."
+        )
+    not_modified = await conditional_get(
+        request, response, database, current_user_email, "tasks"
+    )
+    if not_modified:
+        return not_modified
+
     user_tasks_doc = await tasks_collection.find_one({"owner_id": current_user_email})
     if user_tasks_doc:
-        return user_tasks_doc
+        key = f"{year:04d}-{month:02d}" if year else None
+        if key and is_archived(user_tasks_doc, key):
+            user_tasks_doc = await merge_archived_month(database, user_tasks_doc, key)
+        return decode_user_tasks(user_tasks_doc)
 
     # If no tasks found, return a default structure
     return {"owner_id": current_user_email, "categories": []}
@@ -37,17 +129,27 @@ async def setup_initial_tasks(
     if existing_tasks:
         # If they exist, we replace them. This is for the initial setup.
         await tasks_collection.delete_one({"owner_id": current_user_email})
+        await database.task_archive.delete_many({"owner_id": current_user_email})
 
     user_tasks_data = {
         "owner_id": current_user_email,
-        "categories": [cat.dict() for cat in categories],
+        "categories": with_streaks(
+            encode_categories(with_log_ids([cat.dict() for cat in categories]))
+        ),
     }
 
     await tasks_collection.insert_one(user_tasks_data)
+    await rebuild_monthly_index(
+        database, current_user_email, user_tasks_data["categories"]
+    )
+    await rebuild_schedule(
+        database, current_user_email, user_tasks_data["categories"], date.today()
+    )
+    await bump_versions(database, current_user_email, "tasks")
 
     # Fetch the newly created document to return it
     new_doc = await tasks_collection.find_one({"owner_id": current_user_email})
-    return new_doc
+    return decode_user_tasks(new_doc)
 
 
 @router.put("/", response_model=UserTasks)
@@ -58,7 +160,23 @@ async def update_user_tasks(
     Update the entire task list for a user.
     This is useful for toggling a task's history.
     """
-    update_data = {"categories": [cat.dict() for cat in categories]}
+    stored = await tasks_collection.find_one(
+        {"owner_id": current_user_email}, projection={"archive": 1}
+    )
+    if not stored:
+        raise HTTPException(
+            status_code=404, detail="No tasks found for this user to update."
+        )
+    encoded = encode_categories(with_log_ids([cat.dict() for cat in categories]))
+    archive = stored.get("archive") or {}
+    update_data = {}
+    bases = await streak_bases(database, current_user_email, encoded, archive)
+    if bases is not None:
+        # A frequency changed: replay its archived days for the new schedule
+        update_data["archive.streak_base"] = bases
+    else:
+        bases = archive.get("streak_base")
+    update_data["categories"] = with_streaks(encoded, bases)
 
     updated_doc = await tasks_collection.find_one_and_update(
         {"owner_id": current_user_email}, {"$set": update_data}, return_document=True
@@ -68,68 +186,148 @@ async def update_user_tasks(
         raise HTTPException(
             status_code=404, detail="No tasks found for this user to update."
         )
+    await rebuild_monthly_index(
+        database,
+        current_user_email,
+        update_data["categories"],
+        since=archived_before(stored),
+    )
+    await rebuild_schedule(
+        database, current_user_email, update_data["categories"], date.today()
+    )
+    await bump_versions(database, current_user_email, "tasks")
 
-    return updated_doc
+    return decode_user_tasks(updated_doc)
 
 
 @router.get("/history", response_model=Dict[int, List[str]])
 async def get_monthly_history(
-    year: int,
-    month: int,
+    year: int = Query(..., ge=1, le=9999),
+    month: int = Query(..., ge=1, le=12),
     current_user_email: str = Depends(get_current_user),
 ):
     """
     Retrieve a map of tasks and their completed dates for a specific month.
     The response will be like: { "taskId": ["2025-06-15", "2025-06-16"], ... }
     """
-    # Calculate the start and end dates for the given month
-    start_date_str = date(year, month, 1).isoformat()
-    _, num_days = monthrange(year, month)
-    end_date_str = date(year, month, num_days).isoformat()
-
-    pipeline = [
-        # 1. Find the document for the logged-in user
-        {"$match": {"owner_id": current_user_email}},
-        # 2. Deconstruct the arrays to process each task individually
-        {"$unwind": "$categories"},
-        {"$unwind": "$categories.tasks"},
-        # 3. Reshape the data and filter the history for the requested month
-        {
-            "$project": {
-                "task_id": "$categories.tasks.id",
-                "completed_dates": {
-                    "$filter": {
-                        "input": "$categories.tasks.history",
-                        "as": "h",
-                        "cond": {
-                            "$and": [
-                                {"$gte": ["$$h.date", start_date_str]},
-                                {"$lte": ["$$h.date", end_date_str]},
-                                {"$eq": ["$$h.completed", True]},
-                            ]
-                        },
-                    }
-                },
-            }
-        },
-        # 4. Group the results by task ID
-        {
-            "$group": {
-                "_id": "$task_id",
-                "completed_dates": {"$first": "$completed_dates.date"},
-            }
-        },
-    ]
+    # One indexed point read on the precomputed monthly index
+    return await get_month(database, current_user_email, year, month)
 
-    cursor = tasks_collection.aggregate(pipeline)
 
-    # 5. Format the result into the desired dictionary
-    history_map = {}
-    async for doc in cursor:
-        if doc["_id"] is not None and doc["completed_dates"]:
-            history_map[doc["_id"]] = doc["completed_dates"]
+@router.get("/heatmap", response_model=TaskHeatmap)
+async def get_task_heatmap(
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None, ge=1, le=9998),
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    A year of completions at a glance: one array per task with a 0/1 entry
+    per day of the year, plus per-day totals and completion ratios.
+    """
+    year = year or date.today().year
+    # Without `year` the URL stays the same across New Year
+    not_modified = await conditional_get(
+        request, response, database, current_user_email, "tasks", variant=str(year)
+    )
+    if not_modified:
+        return not_modified
+
+    etag = response.headers["ETag"]
+    heatmap = heatmap_cache.get((current_user_email, year), etag)
+    if heatmap is None:
+        user_tasks_doc = await tasks_collection.find_one(
+            {"owner_id": current_user_email},
+            projection={"categories.tasks.id": 1, "categories.tasks.text": 1},
+        )
+        tasks = [
+            task
+            for category in (user_tasks_doc or {}).get("categories", [])
+            for task in category.get("tasks", [])
+        ]
+        heatmap = await get_year_heatmap(database, current_user_email, year, tasks)
+        heatmap_cache.put((current_user_email, year), etag, heatmap)
+    return heatmap
+
+
+@router.get("/planner", response_model=List[TaskPlan])
+async def get_task_planner(
+    today: Optional[date] = None,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Tasks due today or overdue, by frequency, from the precomputed schedule.
+    Pass the client's local `today`; tasks done today are no longer listed.
+    """
+    return await get_due(database, current_user_email, today or date.today())
+
+
+@router.get("/streaks", response_model=List[TaskStreak])
+async def get_task_streaks(
+    today: Optional[date] = None,
+    recompute: bool = False,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Current and longest streak of every task, read from the stored streak
+    state (O(tasks)). Pass the client's local `today` so streaks end at the
+    right midnight.
 
-    return history_map
+    With `recompute=true`, every streak is replayed from the full history
+    instead; stored states that disagree are repaired and flagged `repaired`.
+    """
+    today = today or date.today()
+    projection = dict(STREAK_PROJECTION)
+    if not recompute:
+        projection.pop("categories.tasks.history_bits")
+    user_tasks_doc = await tasks_collection.find_one(
+        {"owner_id": current_user_email}, projection=projection
+    )
+
+    bases = ((user_tasks_doc or {}).get("archive") or {}).get("streak_base") or {}
+    streaks = []
+    repairs = []
+    schedule_repairs = []
+    for category in (user_tasks_doc or {}).get("categories", []):
+        for task in category.get("tasks", []):
+            state = task.get("streak")
+            repaired = False
+            if recompute:
+                computed = compute_task(task, bases.get(str(task["id"])))
+                if computed != state:
+                    state, repaired = computed, True
+                    repairs.append(
+                        UpdateOne(
+                            {"owner_id": current_user_email},
+                            {"$set": {f"{TASK_PATH}.streak": computed}},
+                            array_filters=[{"t.id": task["id"]}],
+                        )
+                    )
+                    schedule_repairs.append(
+                        schedule_update(
+                            current_user_email, {**task, "streak": computed}, today
+                        )
+                    )
+            schedule = parse_frequency(task.get("frequency"))
+            state = state or {}
+            streaks.append(
+                {
+                    "task_id": task["id"],
+                    "text": task.get("text", ""),
+                    "frequency": task.get("frequency"),
+                    "unit": schedule.unit,
+                    "current": current_streak(state, schedule, today),
+                    "longest": state.get("longest", 0),
+                    "last_completed": state.get("last_completed"),
+                    "repaired": repaired,
+                }
+            )
+
+    if repairs:
+        await tasks_collection.bulk_write(repairs)
+        await database.task_schedule.bulk_write(schedule_repairs, ordered=False)
+        await bump_versions(database, current_user_email, "tasks")
+    return streaks
 
 
 @router.delete("/logs/{task_id}")
@@ -137,56 +335,292 @@ async def delete_task_log(
     task_id: int, log_id: str, current_user_email: str = Depends(get_current_user)
 ):
     """
-    Delete a specific log entry for a task using unique identifier.
+    Delete one log entry of a task with a single $pull, identified by its id
+    (or created_at / date for logs saved before ids existed).
     """
-    # Find the user's tasks document
-    user_tasks_doc = await tasks_collection.find_one({"owner_id": current_user_email})
-    if not user_tasks_doc:
-        raise HTTPException(status_code=404, detail="No tasks found for this user.")
-
-    # Find the task and remove the specific log
-    task_found = False
-    log_deleted = False
-
-    for category in user_tasks_doc["categories"]:
-        for task in category["tasks"]:
-            if task["id"] == task_id:
-                task_found = True
-                if "daily_logs" in task:
-                    # Remove the log with the matching unique identifier
-                    original_count = len(task["daily_logs"])
-
-                    # Filter out logs that match the unique identifier
-                    filtered_logs = []
-                    for log in task["daily_logs"]:
-                        # Use created_at as primary identifier, fallback to date
-                        current_log_id = log.get("created_at") or log.get("date", "")
-
-                        # Handle datetime objects for backwards compatibility
-                        if isinstance(current_log_id, datetime):
-                            current_log_id = current_log_id.isoformat()
-                        elif isinstance(log.get("date"), datetime) and not log.get(
-                            "created_at"
-                        ):
-                            current_log_id = log["date"].isoformat()
-
-                        # Keep the log if the IDs don't match (i.e., don't delete it)
-                        if current_log_id != log_id:
-                            filtered_logs.append(log)
-
-                    task["daily_logs"] = filtered_logs
-                    log_deleted = len(task["daily_logs"]) < original_count
-                break
-        if task_found:
-            break
-
-    if not task_found:
+    result = await tasks_collection.update_one(
+        {
+            "owner_id": current_user_email,
+            **_task_has(task_id, {"daily_logs": {"$elemMatch": log_match(log_id)}}),
+        },
+        {"$pull": {f"{TASK_PATH}.daily_logs": log_match(log_id)}},
+        array_filters=[{"t.id": task_id}],
+    )
+    if result.matched_count == 0 and not await delete_archived_log(
+        database, current_user_email, task_id, log_match(log_id)
+    ):
+        task_exists = await tasks_collection.count_documents(
+            {"owner_id": current_user_email, **_task_has(task_id, {})}, limit=1
+        )
+        if not task_exists:
+            raise HTTPException(status_code=404, detail="Task not found.")
+        raise HTTPException(status_code=404, detail="Log entry not found.")
+
+    await bump_versions(database, current_user_email, "tasks")
+    return {"message": "Log deleted successfully"}
+
+
+@router.put("/{task_id}/history/{day}")
+async def set_task_day(
+    task_id: int,
+    day: date,
+    toggle: ToggleDay,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Mark one day of a task as done or not done: a single $bit on that month's
+    history bits, instead of rewriting the whole task list. Days in archived
+    months are toggled in the archive.
+    """
+    day_str = day.isoformat()
+    key, day_of_month = month_key(day_str)
+    mask = day_mask(day_of_month)
+    # ~mask is a small negative number, so both operands stay int32
+    operation = {"or": mask} if toggle.completed else {"and": ~mask}
+    user_tasks_doc = await tasks_collection.find_one_and_update(
+        {
+            "owner_id": current_user_email,
+            **_task_has(task_id, {}),
+            "archive.before": {"$not": {"$gt": key}},
+        },
+        {"$bit": {f"{TASK_PATH}.history_bits.{key}": operation}},
+        array_filters=[{"t.id": task_id}],
+        projection=STREAK_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    archived = user_tasks_doc is None
+    if archived:
+        # Either no such task, or the month has moved to the archive
+        user_tasks_doc = await tasks_collection.find_one(
+            {"owner_id": current_user_email, **_task_has(task_id, {})},
+            projection=STREAK_PROJECTION,
+        )
+        if not user_tasks_doc or not is_archived(user_tasks_doc, key):
+            raise HTTPException(status_code=404, detail="Task not found.")
+    await record_day(database, current_user_email, task_id, key, operation)
+
+    task = _find_task(user_tasks_doc, task_id)
+    updates = {}
+    if archived:
+        base = await set_archived_day(
+            database, current_user_email, task, key, operation
+        )
+        updates[f"archive.streak_base.{task_id}"] = base
+        streak = compute_task(task, base)
+    else:
+        base = (
+            user_tasks_doc.get("archive", {}).get("streak_base", {}).get(str(task_id))
+        )
+        streak = toggle_streak(task, day_str, toggle.completed, base)
+    array_filters = None
+    if streak != task.get("streak"):
+        updates[f"{TASK_PATH}.streak"] = streak
+        array_filters = [{"t.id": task_id}]
+    if updates:
+        await tasks_collection.update_one(
+            {"owner_id": current_user_email},
+            {"$set": updates},
+            array_filters=array_filters,
+        )
+    await database.task_schedule.bulk_write(
+        [schedule_update(current_user_email, {**task, "streak": streak}, date.today())]
+    )
+
+    await bump_versions(database, current_user_email, "tasks")
+    return {"task_id": task_id, "date": day_str, "completed": toggle.completed}
+
+
+@router.post("/{task_id}/logs", status_code=status.HTTP_201_CREATED)
+async def add_task_log(
+    task_id: int,
+    log_data: DailyLogWrite,
+    current_user_email: str = Depends(get_current_user),
+):
+    """Append a daily log to one task."""
+    log_doc = {
+        "id": log_data.id or new_log_id(),
+        "date": log_data.date,
+        "note": log_data.note,
+        "created_at": log_data.created_at or datetime.now(timezone.utc).isoformat(),
+    }
+    result = await tasks_collection.update_one(
+        {"owner_id": current_user_email, **_task_has(task_id, {})},
+        {"$push": {f"{TASK_PATH}.daily_logs": log_doc}},
+        array_filters=[{"t.id": task_id}],
+    )
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Task not found.")
+    await bump_versions(database, current_user_email, "tasks")
+    return log_doc
 
-    if not log_deleted:
+
+@router.put("/{task_id}/logs/{log_id}")
+async def update_task_log(
+    task_id: int,
+    log_id: str,
+    log_data: DailyLogWrite,
+    current_user_email: str = Depends(get_current_user),
+):
+    """Edit the date and note of one daily log, in place."""
+    result = await tasks_collection.update_one(
+        {
+            "owner_id": current_user_email,
+            **_task_has(task_id, {"daily_logs": {"$elemMatch": log_match(log_id)}}),
+        },
+        {
+            "$set": {
+                f"{TASK_PATH}.daily_logs.$[l].date": log_data.date,
+                f"{TASK_PATH}.daily_logs.$[l].note": log_data.note,
+            }
+        },
+        array_filters=[{"t.id": task_id}, log_match(log_id, prefix="l.")],
+    )
+    if result.matched_count == 0 and not await update_archived_log(
+        database,
+        current_user_email,
+        task_id,
+        log_match(log_id),
+        log_match(log_id, prefix="l."),
+        {"date": log_data.date, "note": log_data.note},
+    ):
         raise HTTPException(status_code=404, detail="Log entry not found.")
+    await bump_versions(database, current_user_email, "tasks")
+    return {"message": "Log updated successfully"}
 
-    # Update the document in the database
-    await tasks_collection.replace_one({"owner_id": current_user_email}, user_tasks_doc)
 
-    return {"message": "Log deleted successfully"}
+def _move_task_pipeline(task_id: int, destination: str, moved_at: datetime) -> list:
+    """
+    One pipeline update that takes the task out of its category and appends
+    it, with a new move_history entry, to the destination category.
+    """
+    destination = {"$literal": destination}
+    task = {
+        "$arrayElemAt": [
+            {
+                "$reduce": {
+                    "input": "$categories",
+                    "initialValue": [],
+                    "in": {
+                        "$concatArrays": [
+                            "$$value",
+                            {
+                                "$filter": {
+                                    "input": "$$this.tasks",
+                                    "as": "t",
+                                    "cond": {"$eq": ["$$t.id", task_id]},
+                                }
+                            },
+                        ]
+                    },
+                }
+            },
+            0,
+        ]
+    }
+    moved_task = {
+        "$mergeObjects": [
+            "$$task",
+            {
+                "move_history": {
+                    "$concatArrays": [
+                        {"$ifNull": ["$$task.move_history", []]},
+                        [{"category_name": destination, "moved_at": moved_at}],
+                    ]
+                }
+            },
+        ]
+    }
+    other_tasks = {
+        "$filter": {
+            "input": "$$c.tasks",
+            "as": "t",
+            "cond": {"$ne": ["$$t.id", task_id]},
+        }
+    }
+    arriving = {"$cond": [{"$eq": ["$$c.name", destination]}, [moved_task], []]}
+    categories = {
+        "$map": {
+            "input": "$categories",
+            "as": "c",
+            "in": {
+                "$mergeObjects": [
+                    "$$c",
+                    {"tasks": {"$concatArrays": [other_tasks, arriving]}},
+                ]
+            },
+        }
+    }
+    return [
+        {"$set": {"categories": {"$let": {"vars": {"task": task}, "in": categories}}}}
+    ]
+
+
+# Declared before /{task_id}/move, which would otherwise also match
+# /categories/move (and reject "categories" as a task id)
+@router.put("/categories/{category_name}")
+async def rename_task_category(
+    category_name: str,
+    rename: RenameCategory,
+    current_user_email: str = Depends(get_current_user),
+):
+    """Rename a category without touching its tasks."""
+    if rename.name == category_name:
+        return {"name": rename.name}
+
+    result = await tasks_collection.update_one(
+        {
+            "owner_id": current_user_email,
+            "$and": [
+                {"categories.name": category_name},
+                {"categories.name": {"$ne": rename.name}},
+            ],
+        },
+        {"$set": {"categories.$[c].name": rename.name}},
+        array_filters=[{"c.name": category_name}],
+    )
+    if result.matched_count == 0:
+        exists = await tasks_collection.count_documents(
+            {"owner_id": current_user_email, "categories.name": category_name},
+            limit=1,
+        )
+        if not exists:
+            raise HTTPException(status_code=404, detail="Category not found.")
+        raise HTTPException(
+            status_code=400, detail="A category with this name already exists."
+        )
+    await bump_versions(database, current_user_email, "tasks")
+    return {"name": rename.name}
+
+
+@router.put("/{task_id}/move")
+async def move_task(
+    task_id: int,
+    move: MoveTask,
+    current_user_email: str = Depends(get_current_user),
+):
+    """Move a task to another category and record the move in its history."""
+    moved_at = datetime.now(timezone.utc)
+    result = await tasks_collection.update_one(
+        {
+            "owner_id": current_user_email,
+            "categories.tasks.id": task_id,
+            # The destination exists and does not already hold the task
+            "categories": {
+                "$elemMatch": {
+                    "name": move.category_name,
+                    "tasks.id": {"$ne": task_id},
+                }
+            },
+        },
+        _move_task_pipeline(task_id, move.category_name, moved_at),
+    )
+    if result.matched_count == 0:
+        raise HTTPException(
+            status_code=404, detail="Task or category not found, or already moved."
+        )
+    await bump_versions(database, current_user_email, "tasks")
+    return {
+        "task_id": task_id,
+        "category_name": move.category_name,
+        "moved_at": moved_at,
+    }
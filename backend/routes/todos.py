@@ -1,20 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from datetime import date, datetime, time, timedelta, timezone
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
-from typing import List
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
 
 from utils.database import get_database
 from utils.security import get_current_user
+from utils.versioning import bump_versions, conditional_get
+from utils.todo_analytics import analytics_cache, compute_todo_analytics
+from utils.todo_logs import (
+    RECENT_LOGS,
+    append_log,
+    delete_log,
+    delete_todo_logs,
+    get_logs,
+    update_log,
+)
 from models.todo_models import (
     TodoItem,
+    TodoLog,
+    TodoStatus,
     CreateTodo,
     UpdateTodo,
     CreateTodoLog,
+    BulkUpdateTodos,
+    TodoAnalytics,
 )
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_LOG_PAGE_SIZE = 100
+DEFAULT_ANALYTICS_WEEKS = 12
+MAX_ANALYTICS_DAYS = 366
+
+
+# Kanban order within a column: unpositioned (null) cards sort first
+BOARD_ORDER = [("status", 1), ("position", 1), ("_id", -1)]
+
+
+def after_in_board_order(last: dict) -> List[dict]:
+    """$or clauses selecting the column's cards after `last` in BOARD_ORDER."""
+    position = last.get("position")
+    if position is None:
+        return [
+            {"position": None, "_id": {"$lt": last["_id"]}},
+            {"position": {"$ne": None}},
+        ]
+    return [
+        {"position": {"$gt": position}},
+        {"position": position, "_id": {"$lt": last["_id"]}},
+    ]
+
 
 def todo_from_db(doc: dict) -> dict:
     """Convert MongoDB document to dict for JSON response"""
@@ -32,11 +71,8 @@ def todo_from_db(doc: dict) -> dict:
         doc_copy["createdAt"] = object_id.generation_time
 
     # Convert log _id fields to id fields for the frontend
-    if "logs" in doc_copy and doc_copy["logs"]:
-        for log in doc_copy["logs"]:
-            if "_id" in log:
-                # Convert database _id to frontend id
-                log["id"] = str(log.pop("_id"))
+    if doc_copy.get("logs"):
+        doc_copy["logs"] = [log_from_db(log) for log in doc_copy["logs"]]
 
     # Create TodoItem and convert to dict for JSON response
     todo_item = TodoItem.model_validate(doc_copy)
@@ -45,30 +81,78 @@ def todo_from_db(doc: dict) -> dict:
     return result_dict
 
 
+def log_from_db(log: dict) -> dict:
+    log_copy = log.copy()
+    if "_id" in log_copy:
+        # Convert database _id to frontend id
+        log_copy["id"] = str(log_copy.pop("_id"))
+    return log_copy
+
+
+async def todo_with_logs(db: AsyncIOMotorDatabase, doc: dict) -> dict:
+    """A todo response with its most recent logs attached."""
+    logs = await get_logs(db, doc["_id"], limit=RECENT_LOGS)
+    return todo_from_db({**doc, "logs": logs})
+
+
 # GET all To-Do items for the user
 @router.get("/", response_model=List[TodoItem])
 async def get_user_todos(
+    request: Request,
+    response: Response,
+    status_filter: Optional[TodoStatus] = Query(None, alias="status"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
     db: AsyncIOMotorDatabase = Depends(get_database),
     user_id: str = Depends(get_current_user),
 ):
-    todos_cursor = db.todos.find({"userId": user_id}).sort("_id", -1)
-    todo_docs = await todos_cursor.to_list(length=None)
-
-    # Auto-migration: Update todos missing createdAt field
-    todos_to_migrate = []
-    for doc in todo_docs:
-        if "createdAt" not in doc or doc["createdAt"] is None:
-            todos_to_migrate.append(doc)
-
-    if todos_to_migrate:
-        for doc in todos_to_migrate:
-            # Use ObjectId creation time as createdAt
-            creation_time = doc["_id"].generation_time
-            await db.todos.update_one(
-                {"_id": doc["_id"]}, {"$set": {"createdAt": creation_time}}
+    """
+    Without parameters, returns every todo without logs, each column in board
+    order: cards never reordered (no position) first, newest first, then by
+    position. With `status`, `limit` or `before`, returns one page: of a
+    column in board order, served from the (userId, status, position, _id)
+    index, or without `status` of all todos newest first. When more items
+    exist, the X-Next-Cursor response header holds the value to pass as
+    `before` for the next page.
+    """
+    not_modified = await conditional_get(request, response, db, user_id, "todos")
+    if not_modified:
+        return not_modified
+
+    paginated = status_filter is not None or limit is not None or before is not None
+    if not paginated:
+        todos_cursor = db.todos.find({"userId": user_id}, projection={"logs": 0}).sort(
+            BOARD_ORDER
+        )
+        todo_docs = await todos_cursor.to_list(length=None)
+        return [todo_from_db(doc) for doc in todo_docs]
+
+    query = {"userId": user_id}
+    sort = [("_id", -1)]
+    if status_filter is not None:
+        query["status"] = status_filter
+        sort = BOARD_ORDER[1:]
+    if before is not None:
+        if not ObjectId.is_valid(before):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        if status_filter is None:
+            query["_id"] = {"$lt": ObjectId(before)}
+        else:
+            last = await db.todos.find_one(
+                {"_id": ObjectId(before), "userId": user_id},
+                projection={"position": 1},
             )
-            # Update the doc for immediate return
-            doc["createdAt"] = creation_time
+            if last is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor.")
+            query["$or"] = after_in_board_order(last)
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    todos_cursor = (
+        db.todos.find(query, projection={"logs": 0}).sort(sort).limit(page_size)
+    )
+    todo_docs = await todos_cursor.to_list(length=page_size)
+    if len(todo_docs) == page_size:
+        response.headers["X-Next-Cursor"] = str(todo_docs[-1]["_id"])
 
     transformed_todos = [todo_from_db(doc) for doc in todo_docs]
     return transformed_todos
@@ -87,17 +171,133 @@ async def create_todo(
         "userId": user_id,
         "status": "Not Started",
         "createdAt": datetime.now(timezone.utc),
-        "logs": [],
+        "logCount": 0,
         # inProgressAt and completedAt will be None/null by default
     }
 
     result = await db.todos.insert_one(todo_doc)
+    await bump_versions(db, user_id, "todos")
     created_todo = await db.todos.find_one({"_id": result.inserted_id})
     if not created_todo:
         raise HTTPException(status_code=500, detail="Failed to create todo")
     return todo_from_db(created_todo)
 
 
+# PUT many status/position changes at once (Kanban drag-and-drop)
+@router.put("/bulk")
+async def bulk_update_todos(
+    bulk_data: BulkUpdateTodos,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Apply many {id, status, position} changes in a single bulk_write.
+    The inProgressAt/completedAt stamping of update_todo happens inside each
+    update pipeline ($ifNull keeps an existing timestamp), so no todo has to
+    be read first.
+    """
+    now = datetime.now(timezone.utc)
+    operations = []
+    for change in bulk_data.changes:
+        if not ObjectId.is_valid(change.id):
+            raise HTTPException(
+                status_code=400, detail=f"Invalid To-Do ID: {change.id}"
+            )
+
+        fields = {}
+        if change.status is not None:
+            fields["status"] = change.status
+            if change.status == "In Progress":
+                fields["inProgressAt"] = {"$ifNull": ["$inProgressAt", now]}
+            elif change.status == "Done":
+                fields["completedAt"] = {"$ifNull": ["$completedAt", now]}
+        if change.position is not None:
+            fields["position"] = change.position
+
+        if fields:
+            operations.append(
+                UpdateOne(
+                    {"_id": ObjectId(change.id), "userId": user_id}, [{"$set": fields}]
+                )
+            )
+
+    if not operations:
+        raise HTTPException(status_code=400, detail="No update data provided.")
+
+    result = await db.todos.bulk_write(operations, ordered=False)
+    await bump_versions(db, user_id, "todos")
+
+    return {"matched": result.matched_count, "modified": result.modified_count}
+
+
+# GET per-column totals for the Kanban board
+@router.get("/counts", response_model=Dict[str, int])
+async def get_todo_counts(
+    request: Request,
+    response: Response,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """Number of todos per status, computed by one index-covered $group."""
+    not_modified = await conditional_get(request, response, db, user_id, "todos")
+    if not_modified:
+        return not_modified
+
+    counts = {"Not Started": 0, "In Progress": 0, "Done": 0}
+    pipeline = [
+        {"$match": {"userId": user_id}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ]
+    async for group in db.todos.aggregate(pipeline):
+        # Todos created before status existed count as "Not Started"
+        status_name = group["_id"] or "Not Started"
+        counts[status_name] = counts.get(status_name, 0) + group["count"]
+    return counts
+
+
+# GET lead time, cycle time, WIP and throughput over a date window
+@router.get("/analytics", response_model=TodoAnalytics)
+async def get_todo_analytics(
+    request: Request,
+    response: Response,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """
+    Flow metrics for todos completed between `start` and `end` (inclusive,
+    UTC days; defaults to the last 12 weeks). Percentiles are p50/p85/p95.
+    """
+    end_day = end or datetime.now(timezone.utc).date()
+    start_day = start or end_day - timedelta(weeks=DEFAULT_ANALYTICS_WEEKS)
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="start must not be after end.")
+    if (end_day - start_day).days > MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"The window can span at most {MAX_ANALYTICS_DAYS} days.",
+        )
+
+    # The default window moves with the date, so the ETag names the one used
+    not_modified = await conditional_get(
+        request, response, db, user_id, "todos", variant=f"{start_day}_{end_day}"
+    )
+    if not_modified:
+        return not_modified
+
+    window_start = datetime.combine(start_day, time.min)
+    window_end = datetime.combine(end_day + timedelta(days=1), time.min)
+    # The ETag changes with every todo write, so it doubles as the cache version
+    etag = response.headers["ETag"]
+    cache_key = (user_id, window_start, window_end)
+    analytics = analytics_cache.get(cache_key, etag)
+    if analytics is None:
+        analytics = await compute_todo_analytics(db, user_id, window_start, window_end)
+        analytics_cache.put(cache_key, etag, analytics)
+    return analytics
+
+
 # GET a single To-Do item by ID
 @router.get("/{todo_id}", response_model=TodoItem)
 async def get_todo(
@@ -111,11 +311,13 @@ async def get_todo(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid todo ID format")
 
-    todo = await db.todos.find_one({"_id": object_id, "userId": user_id})
+    todo = await db.todos.find_one(
+        {"_id": object_id, "userId": user_id}, projection={"logs": 0}
+    )
     if not todo:
         raise HTTPException(status_code=404, detail="Todo not found")
 
-    return todo_from_db(todo)
+    return await todo_with_logs(db, todo)
 
 
 # PUT (update) a To-Do item
@@ -135,7 +337,8 @@ async def update_todo(
 
     # Get the current todo to check existing timestamps
     current_todo = await db.todos.find_one(
-        {"_id": ObjectId(todo_id), "userId": user_id}
+        {"_id": ObjectId(todo_id), "userId": user_id},
+        projection={"inProgressAt": 1, "completedAt": 1},
     )
     if not current_todo:
         raise HTTPException(status_code=404, detail="To-Do not found.")
@@ -156,16 +359,16 @@ async def update_todo(
             if "completedAt" not in update_data:  # Only set if not provided by frontend
                 update_data["completedAt"] = datetime.now(timezone.utc)
 
-    result = await db.todos.update_one(
-        {"_id": ObjectId(todo_id), "userId": user_id}, {"$set": update_data}
+    updated_todo = await db.todos.find_one_and_update(
+        {"_id": ObjectId(todo_id), "userId": user_id},
+        {"$set": update_data},
+        projection={"logs": 0},
+        return_document=ReturnDocument.AFTER,
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="To-Do not found.")
-
-    updated_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
     if not updated_todo:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated todo")
-    return todo_from_db(updated_todo)
+        raise HTTPException(status_code=404, detail="To-Do not found.")
+    await bump_versions(db, user_id, "todos")
+    return await todo_with_logs(db, updated_todo)
 
 
 # DELETE a To-Do item
@@ -181,9 +384,38 @@ async def delete_todo(
     result = await db.todos.delete_one({"_id": ObjectId(todo_id), "userId": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="To-Do not found.")
+    await delete_todo_logs(db, ObjectId(todo_id))
+    await bump_versions(db, user_id, "todos")
     return
 
 
+# GET a page of a To-Do item's logs, newest first
+@router.get("/{todo_id}/logs", response_model=List[TodoLog])
+async def get_todo_logs(
+    todo_id: str,
+    limit: int = Query(RECENT_LOGS, ge=1, le=MAX_LOG_PAGE_SIZE),
+    before: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_database),
+    user_id: str = Depends(get_current_user),
+):
+    """Pass the id of the oldest log received as `before` to get the next page."""
+    if not ObjectId.is_valid(todo_id):
+        raise HTTPException(status_code=400, detail="Invalid To-Do ID.")
+    if before is not None and not ObjectId.is_valid(before):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    todo = await db.todos.find_one(
+        {"_id": ObjectId(todo_id), "userId": user_id}, projection={"_id": 1}
+    )
+    if not todo:
+        raise HTTPException(status_code=404, detail="To-Do not found.")
+
+    logs = await get_logs(
+        db, todo["_id"], limit=limit, before=ObjectId(before) if before else None
+    )
+    return [log_from_db(log) for log in logs]
+
+
 # POST a new log to a To-Do item
 @router.post("/{todo_id}/logs", response_model=TodoItem)
 async def add_todo_log(
@@ -203,16 +435,17 @@ async def add_todo_log(
         "notes": log_data.notes,
     }
 
-    result = await db.todos.update_one(
-        {"_id": ObjectId(todo_id), "userId": user_id}, {"$push": {"logs": log_doc}}
+    todo = await db.todos.find_one_and_update(
+        {"_id": ObjectId(todo_id), "userId": user_id},
+        {"$inc": {"logCount": 1}},
+        projection={"logs": 0},
+        return_document=ReturnDocument.AFTER,
     )
-    if result.matched_count == 0:
+    if not todo:
         raise HTTPException(status_code=404, detail="To-Do not found.")
-
-    updated_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
-    if not updated_todo:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated todo")
-    return todo_from_db(updated_todo)
+    await append_log(db, todo["_id"], user_id, log_doc)
+    await bump_versions(db, user_id, "todos")
+    return await todo_with_logs(db, todo)
 
 
 # PUT update a specific log entry
@@ -224,30 +457,26 @@ async def update_todo_log(
     db: AsyncIOMotorDatabase = Depends(get_database),
     user_id: str = Depends(get_current_user),
 ):
+    if not ObjectId.is_valid(todo_id) or not ObjectId.is_valid(log_id):
+        raise HTTPException(status_code=400, detail="Invalid To-Do or log ID.")
+
     # Check if todo exists and belongs to user
-    todo = await db.todos.find_one({"_id": ObjectId(todo_id), "userId": user_id})
+    todo = await db.todos.find_one(
+        {"_id": ObjectId(todo_id), "userId": user_id}, projection={"logs": 0}
+    )
     if not todo:
         raise HTTPException(status_code=404, detail="To-Do not found.")
 
-    # Update the specific log entry
-    # MongoDB stores logs with _id field as ObjectId, so we need to convert the string ID
-    result = await db.todos.update_one(
-        {"_id": ObjectId(todo_id), "userId": user_id, "logs._id": ObjectId(log_id)},
-        {
-            "$set": {
-                "logs.$.notes": log_data.notes,
-                "logs.$.timestamp": datetime.now(timezone.utc),
-            }
-        },
+    updated = await update_log(
+        db,
+        todo["_id"],
+        ObjectId(log_id),
+        {"notes": log_data.notes, "timestamp": datetime.now(timezone.utc)},
     )
-
-    if result.matched_count == 0:
+    if not updated:
         raise HTTPException(status_code=404, detail="Log entry not found.")
-
-    updated_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
-    if not updated_todo:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated todo")
-    return todo_from_db(updated_todo)
+    await bump_versions(db, user_id, "todos")
+    return await todo_with_logs(db, todo)
 
 
 # DELETE a specific log entry
@@ -258,57 +487,25 @@ async def delete_todo_log(
     db: AsyncIOMotorDatabase = Depends(get_database),
     user_id: str = Depends(get_current_user),
 ):
-    # Check if todo exists and belongs to user
-    todo = await db.todos.find_one({"_id": ObjectId(todo_id), "userId": user_id})
-    if not todo:
-        raise HTTPException(status_code=404, detail="To-Do not found.")
+    if not ObjectId.is_valid(todo_id) or not ObjectId.is_valid(log_id):
+        raise HTTPException(status_code=400, detail="Invalid To-Do or log ID.")
 
-    # Remove the specific log entry
-    # MongoDB stores logs with _id field as ObjectId, so we need to convert the string ID
-    result = await db.todos.update_one(
-        {"_id": ObjectId(todo_id), "userId": user_id},
-        {"$pull": {"logs": {"_id": ObjectId(log_id)}}},
+    # Check if todo exists and belongs to user
+    todo = await db.todos.find_one(
+        {"_id": ObjectId(todo_id), "userId": user_id}, projection={"_id": 1}
     )
-
-    if result.matched_count == 0:
+    if not todo:
         raise HTTPException(status_code=404, detail="To-Do not found.")
 
-    updated_todo = await db.todos.find_one({"_id": ObjectId(todo_id)})
-    if not updated_todo:
-        raise HTTPException(status_code=500, detail="Failed to retrieve updated todo")
-
-    return todo_from_db(updated_todo)
-
-
-# Admin endpoint for migrating todos (remove after migration is complete)
-@router.post("/migrate", status_code=status.HTTP_200_OK)
-async def migrate_user_todos(
-    db: AsyncIOMotorDatabase = Depends(get_database),
-    user_id: str = Depends(get_current_user),
-):
-    """Migrate user's todos to add missing timestamp fields"""
+    deleted = await delete_log(db, todo["_id"], ObjectId(log_id))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Log entry not found.")
 
-    # Find todos missing createdAt
-    todos_missing_created = await db.todos.count_documents(
-        {"userId": user_id, "createdAt": {"$exists": False}}
+    updated_todo = await db.todos.find_one_and_update(
+        {"_id": todo["_id"]},
+        {"$inc": {"logCount": -1}},
+        projection={"logs": 0},
+        return_document=ReturnDocument.AFTER,
     )
-
-    if todos_missing_created == 0:
-        return {"message": "No todos need migration", "migrated_count": 0}
-
-    migrated_count = 0
-    async for todo in db.todos.find(
-        {"userId": user_id, "createdAt": {"$exists": False}}
-    ):
-        # Use ObjectId creation time
-        creation_time = todo["_id"].generation_time
-
-        await db.todos.update_one(
-            {"_id": todo["_id"]}, {"$set": {"createdAt": creation_time}}
-        )
-        migrated_count += 1
-
-    return {
-        "message": f"Successfully migrated {migrated_count} todos",
-        "migrated_count": migrated_count,
-    }
+    await bump_versions(db, user_id, "todos")
+    return await todo_with_logs(db, updated_todo)
@@ -3,8 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
 from utils.database import get_database
 from utils.security import get_current_user
+from utils.category_cache import category_cache
+from utils.categorizer import categorizer
+from utils.category_usage import record_usage
+from utils.versioning import bump_versions
 from models.transaction_models import (
     Transaction,
     CreateTransaction,
@@ -70,6 +75,9 @@ async def create_transaction(
         transaction_doc["date"] = datetime.now()
 
     result = await db.transactions.insert_one(transaction_doc)
+    await bump_versions(db, user_id, "accounts", "transactions")
+    categorizer.observe(user_id, [transaction_doc])
+    await record_usage(db, added=[transaction_doc])
     created_transaction = await db.transactions.find_one({"_id": result.inserted_id})
 
     return Transaction(**created_transaction)
@@ -140,7 +148,10 @@ async def delete_transaction(
 
         # Delete the transaction
         await db.transactions.delete_one({"_id": transaction_obj_id})
+        categorizer.forget(user_id, [transaction])
+        await record_usage(db, removed=[transaction])
 
+    await bump_versions(db, user_id, "accounts", "transactions")
     return
 
 
@@ -307,8 +318,12 @@ async def update_transaction(
     # 3. Update the transaction document itself
     update_data = transaction_data.model_dump(exclude_unset=True)
     await db.transactions.update_one({"_id": transaction_obj_id}, {"$set": update_data})
+    await bump_versions(db, user_id, "accounts", "transactions")
 
     updated_tx = await db.transactions.find_one({"_id": transaction_obj_id})
+    categorizer.forget(user_id, [original_tx])
+    categorizer.observe(user_id, [updated_tx])
+    await record_usage(db, added=[updated_tx], removed=[original_tx])
     return Transaction(**updated_tx)
 
 
@@ -411,18 +426,22 @@ async def create_transfer(
     )
 
     # 6. Create or get transfer category
-    transfer_category = await db.categories.find_one(
-        {"userId": user_id, "name": "Transfer"}
-    )
+    user_categories = await category_cache.get(db, user_id)
+    transfer_category = user_categories.by_name.get("Transfer")
     if not transfer_category:
-        # Create transfer category if it doesn't exist
-        transfer_category_doc = {
-            "name": "Transfer",
-            "userId": user_id,
-            "subcategories": [],
-        }
-        result = await db.categories.insert_one(transfer_category_doc)
-        transfer_category = await db.categories.find_one({"_id": result.inserted_id})
+        # Upserted by name, so a stale cache cannot create it twice; the id is
+        # chosen here to tell whether this call inserted it
+        new_id = ObjectId()
+        transfer_category = await db.categories.find_one_and_update(
+            {"userId": user_id, "name": "Transfer"},
+            {"$setOnInsert": {"_id": new_id, "subcategories": []}},
+            upsert=True,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if transfer_category["_id"] == new_id:
+            category_cache.invalidate(user_id)
+            await bump_versions(db, user_id, "categories")
 
     if transfer_category:
         transfer_category_id = str(transfer_category["_id"])
@@ -486,6 +505,7 @@ async def create_transfer(
     # Insert both transactions
     from_result = await db.transactions.insert_one(from_transaction_doc)
     to_result = await db.transactions.insert_one(to_transaction_doc)
+    await bump_versions(db, user_id, "accounts", "transactions")
 
     # Fetch and return both created transactions
     from_transaction = await db.transactions.find_one({"_id": from_result.inserted_id})
@@ -1,25 +1,63 @@
 # backend/routes/trips.py
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pymongo import ReturnDocument
+from typing import List, Optional
 from bson import ObjectId
 from utils.database import database
 from utils.security import get_current_user
+from utils.versioning import bump_versions, conditional_get
+from utils.settlement import trip_settlement
+from utils.trip_totals import empty_totals, transaction_inc, verify_trip_totals
+from utils.trip_transactions import (
+    MAX_PAGE_SIZE,
+    RECENT_TRANSACTIONS,
+    delete_trip_transactions,
+    get_transactions,
+    page_start,
+    transaction_from_db,
+)
 from models.trip_models import (
     Trip,
     TripCreate,
     TripUpdate,
+    TripSummary,
+    TripSettlement,
+    Transaction,
     ParticipantCreate,
     TransactionCreate,
 )
 
 router = APIRouter()
 trips_collection = database.get_collection("trips")
+trip_transactions_collection = database.get_collection("trip_transactions")
+
+
+async def with_recent_transactions(trip: dict) -> dict:
+    """A trip response with its most recent transactions attached."""
+    transactions = await get_transactions(database, trip["_id"])
+    trip["transactions"] = [transaction_from_db(t) for t in transactions]
+    trip["id"] = str(trip["_id"])
+    del trip["_id"]
+    return trip
 
 
 @router.get("/", response_model=List[Trip])
-async def get_trips(current_user_email: str = Depends(get_current_user)):
-    """Get all trips for the current user"""
+async def get_trips(
+    request: Request,
+    response: Response,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Get all trips for the current user. Transactions are not included; page
+    them per trip with GET /{trip_id}/transactions.
+    """
+
+    not_modified = await conditional_get(
+        request, response, database, current_user_email, "trips"
+    )
+    if not_modified:
+        return not_modified
 
     trips = []
     async for trip in trips_collection.find({"user_id": current_user_email}):
@@ -30,6 +68,48 @@ async def get_trips(current_user_email: str = Depends(get_current_user)):
     return trips
 
 
+TRIP_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "name": 1,
+    "destinations": 1,
+    "start_date": 1,
+    "end_date": 1,
+    "status": 1,
+    "leader_id": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "participant_count": {"$size": {"$ifNull": ["$participants", []]}},
+    # Maintained incrementally, see utils/trip_totals.py
+    "transaction_count": {"$ifNull": ["$totals.transaction_count", 0]},
+    "total_spent": {"$ifNull": ["$totals.spent", 0]},
+    "total_contributed": {"$ifNull": ["$totals.contributed", 0]},
+}
+
+
+@router.get("/summary", response_model=List[TripSummary])
+async def get_trip_summaries(
+    request: Request,
+    response: Response,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Every trip of the current user with counts and stored totals, without the
+    participants and transactions arrays.
+    """
+    not_modified = await conditional_get(
+        request, response, database, current_user_email, "trips"
+    )
+    if not_modified:
+        return not_modified
+
+    pipeline = [
+        {"$match": {"user_id": current_user_email}},
+        {"$project": TRIP_SUMMARY_PROJECTION},
+    ]
+    return await trips_collection.aggregate(pipeline).to_list(length=None)
+
+
 @router.post("/", response_model=Trip)
 async def create_trip(
     trip_data: TripCreate, current_user_email: str = Depends(get_current_user)
@@ -41,7 +121,7 @@ async def create_trip(
         "name": trip_data.name,
         "destinations": trip_data.destinations,
         "participants": [],
-        "transactions": [],
+        "totals": empty_totals(),
         "start_date": trip_data.start_date,
         "end_date": trip_data.end_date,
         "status": "planning",
@@ -53,6 +133,7 @@ async def create_trip(
 
     # Insert the trip
     result = await trips_collection.insert_one(trip_doc)
+    await bump_versions(database, current_user_email, "trips")
 
     # Return the created trip
     created_trip = await trips_collection.find_one({"_id": result.inserted_id})
@@ -65,7 +146,7 @@ async def create_trip(
 
 @router.get("/{trip_id}", response_model=Trip)
 async def get_trip(trip_id: str, current_user_email: str = Depends(get_current_user)):
-    """Get a specific trip by ID"""
+    """Get a specific trip by ID, with its most recent transactions"""
 
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
@@ -77,9 +158,7 @@ async def get_trip(trip_id: str, current_user_email: str = Depends(get_current_u
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    trip["id"] = str(trip["_id"])
-    del trip["_id"]
-    return trip
+    return await with_recent_transactions(trip)
 
 
 @router.put("/{trip_id}", response_model=Trip)
@@ -115,12 +194,12 @@ async def update_trip(
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Trip not found")
+    await bump_versions(database, current_user_email, "trips")
 
     # Return updated trip
     updated_trip = await trips_collection.find_one({"_id": ObjectId(trip_id)})
     if updated_trip:
-        updated_trip["id"] = str(updated_trip["_id"])
-        del updated_trip["_id"]
+        updated_trip = await with_recent_transactions(updated_trip)
 
     return updated_trip
 
@@ -140,6 +219,8 @@ async def delete_trip(
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Trip not found")
+    await delete_trip_transactions(database, ObjectId(trip_id))
+    await bump_versions(database, current_user_email, "trips")
 
     return {"message": "Trip deleted successfully"}
 
@@ -162,6 +243,7 @@ async def add_participant(
         "email": participant_data.email,
         "initial_contribution": participant_data.initial_contribution,
         "total_contributed": participant_data.initial_contribution,
+        "paid_for_group": 0.0,
         "payment_method": participant_data.payment_method or "cash",
     }
 
@@ -170,12 +252,14 @@ async def add_participant(
         {"_id": ObjectId(trip_id), "user_id": current_user_email},
         {
             "$push": {"participants": participant_doc},
+            "$inc": {"totals.contributed": participant_data.initial_contribution},
             "$set": {"updated_at": datetime.now()},
         },
     )
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Trip not found")
+    await bump_versions(database, current_user_email, "trips")
 
     return {"message": "Participant added successfully", "participant": participant_doc}
 
@@ -191,34 +275,39 @@ async def remove_participant(
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
 
-    # Debug: Get current trip to see participant structure
-    current_trip = await trips_collection.find_one(
-        {"_id": ObjectId(trip_id), "user_id": current_user_email}
+    # Remove participant from trip, taking their initial contribution with them
+    removed = await trips_collection.find_one(
+        {
+            "_id": ObjectId(trip_id),
+            "user_id": current_user_email,
+            "participants.id": participant_id,
+        },
+        projection={"participants.$": 1},
     )
-    if not current_trip:
-        raise HTTPException(status_code=404, detail="Trip not found")
-
-    print(f"DEBUG: Removing participant {participant_id} from trip {trip_id}")
-    print(f"DEBUG: Current participants: {current_trip.get('participants', [])}")
+    if removed is None:
+        trip_exists = await trips_collection.count_documents(
+            {"_id": ObjectId(trip_id), "user_id": current_user_email}, limit=1
+        )
+        if not trip_exists:
+            raise HTTPException(status_code=404, detail="Trip not found")
+        raise HTTPException(status_code=404, detail="Participant not found")
 
-    # Remove participant from trip
+    initial = removed["participants"][0].get("initial_contribution", 0)
     result = await trips_collection.update_one(
-        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        {
+            "_id": ObjectId(trip_id),
+            "user_id": current_user_email,
+            "participants.id": participant_id,
+        },
         {
             "$pull": {"participants": {"id": participant_id}},
+            "$inc": {"totals.contributed": -initial},
             "$set": {"updated_at": datetime.now()},
         },
     )
-
-    print(
-        f"DEBUG: Update result - matched: {result.matched_count}, modified: {result.modified_count}"
-    )
-
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Trip not found")
-
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Participant not found")
+    await bump_versions(database, current_user_email, "trips")
 
     return {"message": "Participant removed successfully"}
 
@@ -235,28 +324,57 @@ async def update_participant(
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
 
-    # Update participant in trip
-    result = await trips_collection.update_one(
+    # Update participant in trip. A changed initial contribution shifts the
+    # totals by the difference, keeping contributions logged since.
+    query = {
+        "_id": ObjectId(trip_id),
+        "user_id": current_user_email,
+        "participants.id": participant_id,
+    }
+    current = await trips_collection.find_one(query, projection={"participants.$": 1})
+    if current is None:
+        raise HTTPException(status_code=404, detail="Trip or participant not found")
+    current_participant = current["participants"][0]
+    difference = participant_data.initial_contribution - current_participant.get(
+        "initial_contribution", 0
+    )
+
+    # Matching the contribution just read makes the $inc safe against races
+    updated = await trips_collection.find_one_and_update(
         {
             "_id": ObjectId(trip_id),
             "user_id": current_user_email,
-            "participants.id": participant_id,
+            "participants": {
+                "$elemMatch": {
+                    "id": participant_id,
+                    "initial_contribution": current_participant.get(
+                        "initial_contribution"
+                    ),
+                }
+            },
         },
         {
             "$set": {
                 "participants.$.name": participant_data.name,
                 "participants.$.email": participant_data.email,
                 "participants.$.initial_contribution": participant_data.initial_contribution,
-                "participants.$.total_contributed": participant_data.initial_contribution,
                 "participants.$.payment_method": participant_data.payment_method
                 or "cash",
                 "updated_at": datetime.now(),
-            }
+            },
+            "$inc": {
+                "participants.$.total_contributed": difference,
+                "totals.contributed": difference,
+            },
         },
+        projection={"participants.$": 1},
+        return_document=ReturnDocument.AFTER,
     )
-
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Trip or participant not found")
+    if updated is None:
+        raise HTTPException(
+            status_code=409, detail="Participant changed concurrently, please retry"
+        )
+    await bump_versions(database, current_user_email, "trips")
 
     # Create updated participant doc for response
     updated_participant = {
@@ -264,7 +382,7 @@ async def update_participant(
         "name": participant_data.name,
         "email": participant_data.email,
         "initial_contribution": participant_data.initial_contribution,
-        "total_contributed": participant_data.initial_contribution,
+        "total_contributed": updated["participants"][0].get("total_contributed", 0),
         "payment_method": participant_data.payment_method or "cash",
     }
 
@@ -274,6 +392,43 @@ async def update_participant(
     }
 
 
+@router.get("/{trip_id}/transactions", response_model=List[Transaction])
+async def get_trip_transactions(
+    trip_id: str,
+    response: Response,
+    limit: int = Query(RECENT_TRANSACTIONS, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    A page of the trip's transactions, newest first, from the (trip_id, date)
+    index. When more exist, the X-Next-Cursor response header holds the value
+    to pass as `before` for the next page.
+    """
+    if not ObjectId.is_valid(trip_id):
+        raise HTTPException(status_code=400, detail="Invalid trip ID")
+
+    trip_exists = await trips_collection.count_documents(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email}, limit=1
+    )
+    if not trip_exists:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    start = None
+    if before is not None:
+        start = await page_start(database, ObjectId(trip_id), before)
+        if start is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    transactions = await get_transactions(
+        database, ObjectId(trip_id), limit=limit, before=start
+    )
+    if len(transactions) == limit:
+        response.headers["X-Next-Cursor"] = str(transactions[-1]["_id"])
+
+    return [transaction_from_db(transaction) for transaction in transactions]
+
+
 @router.post("/{trip_id}/transactions")
 async def add_transaction(
     trip_id: str,
@@ -285,11 +440,14 @@ async def add_transaction(
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
 
-    # Get the trip first
-    trip = await trips_collection.find_one(
-        {"_id": ObjectId(trip_id), "user_id": current_user_email}
+    # The trip must exist before a participant is created for the transaction.
+    # Touching updated_at first also keeps the totals verifier away from the
+    # trip until the $inc below has landed (see utils/trip_totals.py).
+    touched = await trips_collection.update_one(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        {"$set": {"updated_at": datetime.now()}},
     )
-    if not trip:
+    if touched.matched_count == 0:
         raise HTTPException(status_code=404, detail="Trip not found")
 
     participant_id = None
@@ -297,16 +455,16 @@ async def add_transaction(
     # Handle new participant creation if needed
     if transaction_data.participant_data:
         participant_id = str(ObjectId())
+        initial_contribution = transaction_data.participant_data.get(
+            "initial_contribution", 0.0
+        )
         participant_doc = {
             "id": participant_id,
             "name": transaction_data.participant_data["name"],
             "email": transaction_data.participant_data.get("email", ""),
-            "initial_contribution": transaction_data.participant_data.get(
-                "initial_contribution", 0.0
-            ),
-            "total_contributed": transaction_data.participant_data.get(
-                "initial_contribution", 0.0
-            ),
+            "initial_contribution": initial_contribution,
+            "total_contributed": initial_contribution,
+            "paid_for_group": 0.0,
             "payment_method": transaction_data.participant_data.get(
                 "payment_method", "cash"
             ),
@@ -314,14 +472,21 @@ async def add_transaction(
 
         # Add new participant to trip
         await trips_collection.update_one(
-            {"_id": ObjectId(trip_id)}, {"$push": {"participants": participant_doc}}
+            {"_id": ObjectId(trip_id)},
+            {
+                "$push": {"participants": participant_doc},
+                "$inc": {"totals.contributed": initial_contribution},
+                "$set": {"updated_at": datetime.now()},
+            },
         )
     elif transaction_data.participant_id:
         participant_id = transaction_data.participant_id
 
     # Create transaction document
     transaction_doc = {
-        "id": str(ObjectId()),
+        "_id": ObjectId(),
+        "trip_id": ObjectId(trip_id),
+        "user_id": current_user_email,
         "type": transaction_data.type,
         "amount": transaction_data.amount,
         "description": transaction_data.description,
@@ -332,37 +497,26 @@ async def add_transaction(
         "participant_id": participant_id,
     }
 
-    # Update operations
-    update_operations = {
-        "$push": {"transactions": transaction_doc},
-        "$set": {"updated_at": datetime.now()},
-    }
-
-    # If this is a participant contribution OR out-of-pocket expense, update their total_contributed
-    if (
-        transaction_data.type == "participant_contribution"
-        or transaction_data.type == "participant_outofpocket"
-    ) and participant_id:
-        update_operations["$inc"] = {
-            "participants.$[elem].total_contributed": transaction_data.amount
-        }
-
-        # Add transaction to trip with participant contribution update
-        result = await trips_collection.update_one(
-            {"_id": ObjectId(trip_id), "user_id": current_user_email},
-            update_operations,
-            array_filters=[{"elem.id": participant_id}],
-        )
-    else:
-        # Regular leader expense transaction
-        result = await trips_collection.update_one(
-            {"_id": ObjectId(trip_id), "user_id": current_user_email}, update_operations
-        )
+    # Store the transaction, then adjust the trip and participant totals in one
+    # update. Totals missed by a failure in between are repaired by the verifier.
+    await trip_transactions_collection.insert_one(transaction_doc)
+    inc, array_filters = transaction_inc(transaction_doc)
+    result = await trips_collection.update_one(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        {"$inc": inc, "$set": {"updated_at": datetime.now()}},
+        array_filters=array_filters or None,
+    )
 
     if result.matched_count == 0:
+        # The trip was deleted meanwhile
+        await trip_transactions_collection.delete_one({"_id": transaction_doc["_id"]})
         raise HTTPException(status_code=404, detail="Trip not found")
+    await bump_versions(database, current_user_email, "trips")
 
-    return {"message": "Transaction added successfully", "transaction": transaction_doc}
+    return {
+        "message": "Transaction added successfully",
+        "transaction": transaction_from_db(transaction_doc),
+    }
 
 
 @router.delete("/{trip_id}/transactions/{transaction_id}")
@@ -376,142 +530,110 @@ async def delete_transaction(
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
 
-    # Get the trip and transaction first
-    trip = await trips_collection.find_one(
-        {"_id": ObjectId(trip_id), "user_id": current_user_email}
+    # Touch the trip before the transaction disappears, so the totals verifier
+    # leaves it alone until the reverting $inc has landed
+    touched = await trips_collection.update_one(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        {"$set": {"updated_at": datetime.now()}},
     )
-    if not trip:
+    if touched.matched_count == 0:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    # Find the transaction to delete
-    transaction_to_delete = None
-    for transaction in trip.get("transactions", []):
-        if transaction.get("id") == transaction_id:
-            transaction_to_delete = transaction
-            break
-
-    if not transaction_to_delete:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-
-    # If it's a participant contribution OR out-of-pocket expense, we need to update the participant's total_contributed
-    if (
-        transaction_to_delete.get("type") == "participant_contribution"
-        or transaction_to_delete.get("type") == "participant_outofpocket"
-    ) and transaction_to_delete.get("participant_id"):
-        participant_id = transaction_to_delete["participant_id"]
-        amount = transaction_to_delete["amount"]
-
-        # First, calculate what the new total_contributed should be
-        participant_data = None
-        for participant in trip.get("participants", []):
-            if participant.get("id") == participant_id:
-                participant_data = participant
-                break
-
-        if participant_data:
-            current_total = participant_data.get("total_contributed", 0)
-            new_total = max(0, current_total - amount)  # Prevent negative values
-
-            # Remove the transaction and update participant's total_contributed
-            result = await trips_collection.update_one(
-                {"_id": ObjectId(trip_id), "user_id": current_user_email},
-                {
-                    "$pull": {"transactions": {"id": transaction_id}},
-                    "$set": {
-                        "participants.$[elem].total_contributed": new_total,
-                        "updated_at": datetime.now(),
-                    },
-                },
-                array_filters=[{"elem.id": participant_id}],
-            )
-        else:
-            # If participant not found, just remove the transaction
-            result = await trips_collection.update_one(
-                {"_id": ObjectId(trip_id), "user_id": current_user_email},
-                {
-                    "$pull": {"transactions": {"id": transaction_id}},
-                    "$set": {"updated_at": datetime.now()},
-                },
-            )
-    else:
-        # Regular leader expense transaction - just remove it
-        result = await trips_collection.update_one(
-            {"_id": ObjectId(trip_id), "user_id": current_user_email},
+    # Only one concurrent delete gets the document back, so the totals are
+    # reverted exactly once
+    deleted = None
+    if ObjectId.is_valid(transaction_id):
+        deleted = await trip_transactions_collection.find_one_and_delete(
             {
-                "$pull": {"transactions": {"id": transaction_id}},
-                "$set": {"updated_at": datetime.now()},
-            },
+                "_id": ObjectId(transaction_id),
+                "trip_id": ObjectId(trip_id),
+                "user_id": current_user_email,
+            }
         )
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Transaction not found")
 
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Trip not found")
+    inc, array_filters = transaction_inc(deleted, sign=-1)
+    await trips_collection.update_one(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        {"$inc": inc, "$set": {"updated_at": datetime.now()}},
+        array_filters=array_filters or None,
+    )
+    await bump_versions(database, current_user_email, "trips")
 
     return {"message": "Transaction deleted successfully"}
 
 
+@router.get("/{trip_id}/settlement", response_model=TripSettlement)
+async def get_trip_settlement(
+    trip_id: str,
+    exact: bool = True,
+    current_user_email: str = Depends(get_current_user),
+):
+    """
+    Net balance of every member and the transfers that settle them. Small
+    groups get the fewest possible transfers; larger ones (or exact=false) a
+    greedy settlement with at most one transfer fewer than the member count.
+    """
+    if not ObjectId.is_valid(trip_id):
+        raise HTTPException(status_code=400, detail="Invalid trip ID")
+
+    trip = await trips_collection.find_one(
+        {"_id": ObjectId(trip_id), "user_id": current_user_email},
+        projection={
+            "participants.id": 1,
+            "participants.name": 1,
+            "participants.initial_contribution": 1,
+        },
+    )
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+
+    # Every transaction counts towards the balances, not just a page of them
+    trip["transactions"] = await get_transactions(
+        database,
+        trip["_id"],
+        limit=0,
+        projection={
+            "_id": 0,
+            "type": 1,
+            "amount": 1,
+            "paid_by": 1,
+            "participant_id": 1,
+        },
+    )
+    return trip_settlement(trip, exact)
+
+
 @router.post("/{trip_id}/fix-data-consistency")
 async def fix_data_consistency(
     trip_id: str, current_user_email: str = Depends(get_current_user)
 ):
-    """Fix data consistency issues in trip participant contributions"""
+    """
+    Verify the trip's stored totals and participant contributions against its
+    transactions (one aggregation) and repair any drift. The same check runs
+    periodically for every trip in the background.
+
+    Unlike that run, this one does not wait out the grace window: the caller's
+    own writes are done by now. Should another request's $inc still be in
+    flight, the repair and that $inc may count its transaction twice, which
+    the next background run corrects.
+    """
 
     if not ObjectId.is_valid(trip_id):
         raise HTTPException(status_code=400, detail="Invalid trip ID")
 
-    # Get the trip
-    trip = await trips_collection.find_one(
-        {"_id": ObjectId(trip_id), "user_id": current_user_email}
-    )
-    if not trip:
+    match = {"_id": ObjectId(trip_id), "user_id": current_user_email}
+    trip_exists = await trips_collection.count_documents(match, limit=1)
+    if not trip_exists:
         raise HTTPException(status_code=404, detail="Trip not found")
 
-    # Calculate correct total_contributed for each participant
-    updates = []
-    for participant in trip.get("participants", []):
-        participant_id = participant.get("id")
-        initial_contribution = participant.get("initial_contribution", 0)
-
-        # Calculate total from transactions
-        contribution_from_transactions = 0
-        for transaction in trip.get("transactions", []):
-            if transaction.get("participant_id") == participant_id and transaction.get(
-                "type"
-            ) in ["participant_contribution", "participant_outofpocket"]:
-                contribution_from_transactions += transaction.get("amount", 0)
-
-        # Correct total should be initial + transaction contributions
-        correct_total = initial_contribution + contribution_from_transactions
-        current_total = participant.get("total_contributed", 0)
-
-        if current_total != correct_total:
-            updates.append(
-                {
-                    "participant_id": participant_id,
-                    "name": participant.get("name"),
-                    "current_total": current_total,
-                    "correct_total": correct_total,
-                    "difference": correct_total - current_total,
-                }
-            )
-
-    # Apply corrections
-    if updates:
-        for update in updates:
-            await trips_collection.update_one(
-                {"_id": ObjectId(trip_id), "user_id": current_user_email},
-                {
-                    "$set": {
-                        "participants.$[elem].total_contributed": update[
-                            "correct_total"
-                        ],
-                        "updated_at": datetime.now(),
-                    }
-                },
-                array_filters=[{"elem.id": update["participant_id"]}],
-            )
+    repaired = await verify_trip_totals(database, match, grace_seconds=0)
+    corrections = repaired[0]["corrections"] if repaired else []
 
     return {
         "message": "Data consistency check completed",
-        "updates_applied": len(updates),
-        "corrections": updates,
+        "updates_applied": len(corrections) or len(repaired),
+        "corrections": corrections,
+        "totals": repaired[0]["totals"]["correct"] if repaired else None,
     }
@@ -0,0 +1,188 @@
+# backend/utils/categorizer.py
+"""
+Local, per-user transaction categorizer.
+
+Learns `notes` -> (categoryId, subCategoryId) from the user's own expense and
+income history. Notes are broken into word and two-word features ("chai",
+"raghavendra hotel"); an inverted index maps each feature to how often it was
+seen under each category pair. A suggestion is a handful of dictionary lookups,
+scored by how specific each feature is (features seen under many categories
+count for little) and how consistently it points at one category.
+
+Models are built lazily from the transactions collection, kept in a small
+per-worker LRU, and updated incrementally as transactions are written, so
+most categorization requests never need the LLM.
+"""
+
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+CACHE_MAX_USERS = 256
+# Rebuild from the database now and then to pick up writes made by other workers
+MODEL_TTL_SECONDS = 900
+MAX_TRAINING_TRANSACTIONS = 5000
+# Suggestions below this confidence are handed to the LLM instead
+MIN_CONFIDENCE = 0.6
+# Pseudo-observations against every suggestion: a category seen once under
+# these words is not yet a sure thing (1 / (1 + 1) caps it below MIN_CONFIDENCE)
+CONFIDENCE_PRIOR = 1
+
+# fmt: off
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "had", "i", "in", "is", "it",
+    "me", "my", "of", "on", "paid", "rs", "rupees", "the", "to", "was", "with",
+    "usd", "inr", "cost", "costs", "bought", "spent",
+}
+# fmt: on
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+Label = Tuple[str, Optional[str]]
+
+
+def extract_features(text: Optional[str]) -> List[str]:
+    """Lower-cased word and adjacent word-pair features, without stopwords."""
+    if not text:
+        return []
+    words = [
+        word
+        for word in TOKEN_PATTERN.findall(text.lower())
+        if word not in STOPWORDS and len(word) > 1
+    ]
+    bigrams = [f"{first} {second}" for first, second in zip(words, words[1:])]
+    # A feature counts once per note, however often it repeats
+    return list(dict.fromkeys(words + bigrams))
+
+
+class CategoryModel:
+    """Inverted index from note features to category-pair frequencies."""
+
+    def __init__(self):
+        self.features: Dict[str, Counter] = {}
+        self.label_counts: Counter = Counter()
+        self.document_count = 0
+        self.loaded_at = time.monotonic()
+
+    def add(self, notes: Optional[str], label: Label, weight: int = 1):
+        """Learn (weight=1) or unlearn (weight=-1) one transaction."""
+        features = extract_features(notes)
+        if not features:
+            return
+
+        self.document_count += weight
+        self.label_counts[label] += weight
+        if self.label_counts[label] <= 0:
+            del self.label_counts[label]
+
+        for feature in features:
+            counts = self.features.setdefault(feature, Counter())
+            counts[label] += weight
+            if counts[label] <= 0:
+                del counts[label]
+                if not counts:
+                    del self.features[feature]
+
+    def suggest(self, text: str) -> Optional[Tuple[Label, float]]:
+        """
+        Best category pair for the text and a confidence in [0, 1]: its share
+        of the score, scaled down when few past transactions back it.
+        """
+        scores: Counter = Counter()
+        # Past transactions behind each label: the most any one feature saw,
+        # since the features of one note are not independent observations
+        evidence: Counter = Counter()
+        for feature in extract_features(text):
+            counts = self.features.get(feature)
+            if not counts:
+                continue
+            feature_total = sum(counts.values())
+            # Rare, single-category features ("raghavendra hotel") beat common
+            # ones ("hotel") that appear under several categories.
+            specificity = math.log(1 + self.document_count / feature_total)
+            bigram_boost = 2.0 if " " in feature else 1.0
+            for label, count in counts.items():
+                scores[label] += bigram_boost * specificity * count / feature_total
+                evidence[label] = max(evidence[label], count)
+
+        if not scores:
+            return None
+
+        label, best = scores.most_common(1)[0]
+        share = best / sum(scores.values())
+        seen = evidence[label]
+        return label, share * seen / (seen + CONFIDENCE_PRIOR)
+
+
+class Categorizer:
+    def __init__(
+        self, max_users: int = CACHE_MAX_USERS, ttl: float = MODEL_TTL_SECONDS
+    ):
+        self._models: "OrderedDict[str, CategoryModel]" = OrderedDict()
+        self._max_users = max_users
+        self._ttl = ttl
+        # Writes bump the epoch so a model built concurrently with them is not
+        # cached without their contribution.
+        self._epoch = 0
+
+    async def _load(self, db: AsyncIOMotorDatabase, user_id: str) -> CategoryModel:
+        model = self._models.get(user_id)
+        if model is not None and time.monotonic() - model.loaded_at < self._ttl:
+            self._models.move_to_end(user_id)
+            return model
+
+        epoch = self._epoch
+        model = CategoryModel()
+        cursor = (
+            db.transactions.find(
+                {
+                    "userId": user_id,
+                    "type": {"$in": ["expense", "income"]},
+                    "notes": {"$nin": [None, ""]},
+                },
+                projection={"notes": 1, "categoryId": 1, "subCategoryId": 1},
+            )
+            .sort("_id", -1)
+            .limit(MAX_TRAINING_TRANSACTIONS)
+        )
+        async for transaction in cursor:
+            model.add(transaction["notes"], _label(transaction))
+
+        if epoch == self._epoch:
+            self._models[user_id] = model
+            self._models.move_to_end(user_id)
+            while len(self._models) > self._max_users:
+                self._models.popitem(last=False)
+        return model
+
+    async def suggest(
+        self, db: AsyncIOMotorDatabase, user_id: str, text: str
+    ) -> Optional[Tuple[Label, float]]:
+        model = await self._load(db, user_id)
+        return model.suggest(text)
+
+    def observe(self, user_id: str, transactions: Iterable[dict], weight: int = 1):
+        """
+        Apply written transactions to the user's model if it is loaded. Models
+        that are not loaded will see the write when they are next built.
+        """
+        self._epoch += 1
+        model = self._models.get(user_id)
+        if model is None:
+            return
+        for transaction in transactions:
+            if transaction.get("type") in ("expense", "income"):
+                model.add(transaction.get("notes"), _label(transaction), weight)
+
+    def forget(self, user_id: str, transactions: Iterable[dict]):
+        self.observe(user_id, transactions, weight=-1)
+
+
+def _label(transaction: dict) -> Label:
+    return transaction["categoryId"], transaction.get("subCategoryId")
+
+
+categorizer = Categorizer()
@@ -0,0 +1,83 @@
+# backend/utils/category_cache.py
+"""
+In-process, per-user cache of categories.
+
+A user's categories are read on nearly every expense screen but change rarely,
+so each worker keeps the most recently used users' categories in a small LRU,
+indexed by id and by name. Every write in routes/categories.py (and the
+"Transfer" category auto-creation) invalidates the user's entry; the next read
+repopulates it. The TTL bounds staleness when another worker made the write,
+so a name the cache does not know is still checked by the database (the
+unique (userId, name) index, and conditional sub-category writes).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+CACHE_MAX_USERS = 1024
+CACHE_TTL_SECONDS = 300
+MAX_CATEGORIES_PER_USER = 100
+
+
+class UserCategories:
+    """A user's categories plus O(1) lookups by id and by name."""
+
+    __slots__ = ("categories", "by_id", "by_name", "loaded_at")
+
+    def __init__(self, categories: List[dict]):
+        self.categories = categories
+        self.by_id: Dict[str, dict] = {str(c["_id"]): c for c in categories}
+        self.by_name: Dict[str, dict] = {c["name"]: c for c in categories}
+        self.loaded_at = time.monotonic()
+
+    def copies(self) -> List[dict]:
+        """The categories as new dicts, safe to hand out or modify."""
+        return [
+            {
+                **category,
+                "subcategories": [
+                    dict(sub) for sub in category.get("subcategories", [])
+                ],
+            }
+            for category in self.categories
+        ]
+
+
+class CategoryCache:
+    def __init__(
+        self, max_users: int = CACHE_MAX_USERS, ttl: float = CACHE_TTL_SECONDS
+    ):
+        self._entries: "OrderedDict[str, UserCategories]" = OrderedDict()
+        self._max_users = max_users
+        self._ttl = ttl
+        # Bumped on every invalidation so a read that raced with a write
+        # does not put stale data back into the cache.
+        self._epoch = 0
+
+    async def get(self, db: AsyncIOMotorDatabase, user_id: str) -> UserCategories:
+        entry = self._entries.get(user_id)
+        if entry is not None and time.monotonic() - entry.loaded_at < self._ttl:
+            self._entries.move_to_end(user_id)
+            return entry
+
+        epoch = self._epoch
+        categories = await db.categories.find({"userId": user_id}).to_list(
+            length=MAX_CATEGORIES_PER_USER
+        )
+        entry = UserCategories(categories)
+
+        if epoch == self._epoch:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_users:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id: str):
+        self._epoch += 1
+        self._entries.pop(user_id, None)
+
+
+category_cache = CategoryCache()
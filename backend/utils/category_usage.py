@@ -0,0 +1,174 @@
+# backend/utils/category_usage.py
+"""
+Pre-aggregated category usage: how often, how much and how recently each of a
+user's categories and sub-categories was used.
+
+One category_usage document per (userId, categoryId) is maintained with $inc
+on every expense/income write, so ranking categories for the pickers reads a
+few small documents instead of aggregating the transactions collection.
+"""
+
+from typing import Iterable, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+
+def usage_op(transaction: dict, weight: int = 1) -> Optional[UpdateOne]:
+    """
+    The counter update for one transaction being added (weight=1) or removed
+    (weight=-1). Transfers are not picked from the category list, so they are
+    not counted.
+    """
+    if transaction.get("type") not in ("expense", "income"):
+        return None
+
+    amount = transaction.get("amount", 0) * weight
+    inc = {"count": weight, "total": amount}
+    latest = {"lastUsed": transaction.get("date")}
+
+    subcategory_id = transaction.get("subCategoryId")
+    if subcategory_id:
+        inc[f"subcategories.{subcategory_id}.count"] = weight
+        inc[f"subcategories.{subcategory_id}.total"] = amount
+        latest[f"subcategories.{subcategory_id}.lastUsed"] = transaction.get("date")
+
+    update = {"$inc": inc}
+    # Removing a transaction cannot tell what the previous last use was,
+    # so lastUsed only ever moves forward.
+    if weight > 0:
+        update["$max"] = latest
+
+    return UpdateOne(
+        {"userId": transaction["userId"], "categoryId": transaction["categoryId"]},
+        update,
+        upsert=True,
+    )
+
+
+async def record_usage(
+    db: AsyncIOMotorDatabase,
+    added: Iterable[dict] = (),
+    removed: Iterable[dict] = (),
+):
+    """Apply usage changes for added and removed transactions in one round trip."""
+    ops = [usage_op(transaction) for transaction in added]
+    ops += [usage_op(transaction, weight=-1) for transaction in removed]
+    ops = [op for op in ops if op is not None]
+    if ops:
+        await db.category_usage.bulk_write(ops)
+
+
+def _sort_key(sort: str):
+    def key(item: dict):
+        usage = item.get("usage") or {}
+        count = usage.get("count", 0)
+        last_used = usage.get("lastUsed")
+        timestamp = last_used.timestamp() if last_used else 0
+        if sort == "recency":
+            return (-timestamp, -count)
+        return (-count, -timestamp)
+
+    return key
+
+
+async def categories_by_usage(
+    db: AsyncIOMotorDatabase, user_id: str, categories: List[dict], sort: str
+) -> List[dict]:
+    """
+    Return copies of the categories (and their sub-categories) with usage
+    attached, ordered by "frequency" or "recency". Unused entries keep their
+    original order at the end.
+    """
+    usage_by_category = {
+        usage["categoryId"]: usage
+        async for usage in db.category_usage.find({"userId": user_id})
+    }
+
+    ranked = []
+    for category in categories:
+        usage = usage_by_category.get(str(category["_id"]), {})
+        sub_usage = usage.get("subcategories", {})
+        subcategories = [
+            {**sub, "usage": sub_usage.get(str(sub["_id"]))}
+            for sub in category.get("subcategories", [])
+        ]
+        subcategories.sort(key=_sort_key(sort))
+        ranked.append(
+            {**category, "usage": usage or None, "subcategories": subcategories}
+        )
+
+    ranked.sort(key=_sort_key(sort))
+    return ranked
+
+
+async def rebuild_category_usage(db: AsyncIOMotorDatabase):
+    """
+    Recompute every usage document from the transactions collection with a
+    single server-side aggregation. Only needed to backfill existing data.
+    """
+    pipeline = [
+        {"$match": {"type": {"$in": ["expense", "income"]}}},
+        {
+            "$group": {
+                "_id": {
+                    "userId": "$userId",
+                    "categoryId": "$categoryId",
+                    "subCategoryId": "$subCategoryId",
+                },
+                "count": {"$sum": 1},
+                "total": {"$sum": "$amount"},
+                "lastUsed": {"$max": "$date"},
+            }
+        },
+        {
+            "$group": {
+                "_id": {"userId": "$_id.userId", "categoryId": "$_id.categoryId"},
+                "count": {"$sum": "$count"},
+                "total": {"$sum": "$total"},
+                "lastUsed": {"$max": "$lastUsed"},
+                "subcategories": {
+                    "$push": {
+                        "k": "$_id.subCategoryId",
+                        "v": {
+                            "count": "$count",
+                            "total": "$total",
+                            "lastUsed": "$lastUsed",
+                        },
+                    }
+                },
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "userId": "$_id.userId",
+                "categoryId": "$_id.categoryId",
+                "count": 1,
+                "total": 1,
+                "lastUsed": 1,
+                "subcategories": {
+                    "$arrayToObject": {
+                        "$filter": {
+                            "input": "$subcategories",
+                            "as": "sub",
+                            "cond": {
+                                "$and": [
+                                    {"$gt": ["$$sub.k", None]},
+                                    {"$ne": ["$$sub.k", ""]},
+                                ]
+                            },
+                        }
+                    }
+                },
+            }
+        },
+        {
+            "$merge": {
+                "into": "category_usage",
+                "on": ["userId", "categoryId"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
+    await db.transactions.aggregate(pipeline).to_list(length=None)
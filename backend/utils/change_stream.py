@@ -0,0 +1,211 @@
+# backend/utils/change_stream.py
+"""
+A single shared MongoDB change stream that fans out per-user change events.
+
+Every worker opens exactly one change-stream cursor (lazily, when the first
+client subscribes) over the watched collections and dispatches each event to
+the queues of the user who owns the changed document. Clients never get a
+cursor of their own.
+
+Change streams need a replica set. For local development a single-node replica
+set is enough:
+
+    mongod --replSet rs0 --dbpath ./data
+    mongosh --eval "rs.initiate()"
+
+and point MONGO_DB_URL at "mongodb://localhost:27017/?replicaSet=rs0".
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from .database import database
+
+# Collections whose changes are pushed to connected clients
+WATCHED_COLLECTIONS = ["accounts", "transactions", "todos", "trips"]
+
+# Per-connection buffer; a client that falls this far behind gets a "resync"
+SUBSCRIBER_QUEUE_SIZE = 100
+RETRY_DELAY_SECONDS = 5
+
+# Only the fields a client needs to patch its local state survive the server-side
+# $project. "owner" is resolved from whichever ownership field the collection uses
+# (trips use "user_id", everything else "userId").
+CHANGE_STREAM_PIPELINE = [
+    {
+        "$match": {
+            "ns.coll": {"$in": WATCHED_COLLECTIONS},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+        }
+    },
+    {
+        "$project": {
+            "operationType": 1,
+            "ns.coll": 1,
+            "documentKey": 1,
+            "updateDescription.updatedFields": 1,
+            "updateDescription.removedFields": 1,
+            "fullDocument": {
+                "$cond": [
+                    {"$in": ["$operationType", ["insert", "replace"]]},
+                    "$fullDocument",
+                    "$$REMOVE",
+                ]
+            },
+            "owner": {
+                "$ifNull": [
+                    "$fullDocument.userId",
+                    "$fullDocument.user_id",
+                    "$fullDocumentBeforeChange.userId",
+                    "$fullDocumentBeforeChange.user_id",
+                ]
+            },
+        }
+    },
+]
+
+
+def compact_change(change: dict) -> dict:
+    """Turn a projected change event into the compact diff sent to clients."""
+    operation = change["operationType"]
+    event = {
+        "type": "change",
+        "collection": change["ns"]["coll"],
+        "op": operation,
+        "id": str(change["documentKey"]["_id"]),
+    }
+    if operation in ("insert", "replace"):
+        event["doc"] = change.get("fullDocument")
+    elif operation == "update":
+        description = change.get("updateDescription", {})
+        event["fields"] = description.get("updatedFields", {})
+        event["removed"] = description.get("removedFields", [])
+    return event
+
+
+def _reset_queue(queue: asyncio.Queue):
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait({"type": "resync"})
+
+
+class ChangeStreamHub:
+    """Owns the worker's change-stream cursor and the per-user subscriber queues."""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self._db = db
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token = None
+        # None until checked on the first subscription
+        self._pre_images: Optional[bool] = None
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+        # Release the cursor once nobody is listening. The next subscriber
+        # starts from "now": replaying what happened meanwhile would only
+        # send it stale events for state it is about to fetch anyway.
+        if not self._subscribers:
+            self._resume_token = None
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _dispatch(self, change: dict):
+        queues = self._subscribers.get(change.get("owner"))
+        if not queues:
+            return
+
+        event = compact_change(change)
+        for queue in queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # The client is too far behind to patch incrementally; drop the
+                # backlog and tell it to refetch.
+                _reset_queue(queue)
+
+    async def _enable_pre_images(self) -> bool:
+        """
+        Best effort: deletes only carry the owner when pre-images are enabled
+        (MongoDB 6.0+). Without them, delete events cannot be routed and are
+        skipped. Returns whether the server supports pre-images at all; older
+        ones reject the stream option, so it must not be requested there.
+        """
+        try:
+            build_info = await self._db.command("buildInfo")
+        except OperationFailure as e:
+            print(f"Change stream pre-images unavailable: {e}")
+            return False
+        if build_info.get("versionArray", [0])[0] < 6:
+            print("Change stream pre-images need MongoDB 6.0 or newer.")
+            return False
+        for collection in WATCHED_COLLECTIONS:
+            try:
+                await self._db.command(
+                    "collMod",
+                    collection,
+                    changeStreamPreAndPostImages={"enabled": True},
+                )
+            except OperationFailure as e:
+                print(f"Change stream pre-images unavailable for {collection}: {e}")
+        return True
+
+    async def _run(self):
+        if self._pre_images is None:
+            self._pre_images = await self._enable_pre_images()
+        options = {"full_document": "updateLookup"}
+        if self._pre_images:
+            options["full_document_before_change"] = "whenAvailable"
+
+        while True:
+            try:
+                async with self._db.watch(
+                    CHANGE_STREAM_PIPELINE,
+                    resume_after=self._resume_token,
+                    **options,
+                ) as stream:
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self._dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                print(f"Change stream interrupted, retrying: {e}")
+                # The driver already retried resumable errors; whatever we get here
+                # may have lost events, so start fresh and have everyone refetch.
+                self._resume_token = None
+                self._broadcast_resync()
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    def _broadcast_resync(self):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                _reset_queue(queue)
+
+
+# One hub (and therefore one cursor) per worker process
+hub = ChangeStreamHub(database)
@@ -0,0 +1,183 @@
+# backend/utils/indexes.py
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """
+    Create the indexes the API relies on. create_indexes is a no-op for indexes
+    that already exist, so this is safe to run on every startup.
+    """
+    # Payment-due sweep: range scan over credit cards by due date only
+    await db.accounts.create_indexes(
+        [
+            IndexModel(
+                [("accountType", ASCENDING), ("paymentDueDate", ASCENDING)],
+                name="credit_card_payment_due",
+                partialFilterExpression={"accountType": "credit_card"},
+            ),
+        ]
+    )
+    await db.payment_notifications.create_indexes(
+        [
+            IndexModel(
+                [
+                    ("accountId", ASCENDING),
+                    ("kind", ASCENDING),
+                    ("paymentDueDate", ASCENDING),
+                ],
+                name="notification_per_due_date",
+                unique=True,
+            ),
+            IndexModel(
+                [("userId", ASCENDING), ("createdAt", DESCENDING)],
+                name="user_notifications",
+            ),
+        ]
+    )
+    # Categories: the unique (userId, name) index is built by migration 013,
+    # once it has merged duplicate names
+    # One usage document per category, also the $merge key of the backfill
+    await db.category_usage.create_indexes(
+        [
+            IndexModel(
+                [("userId", ASCENDING), ("categoryId", ASCENDING)],
+                name="usage_per_category",
+                unique=True,
+            ),
+        ]
+    )
+    # Kanban columns in board order (status, position, _id), keyset
+    # pagination within a column, and counts
+    try:
+        # Superseded by user_status_position
+        await db.todos.drop_index("user_status_id")
+    except OperationFailure:
+        pass
+    await db.todos.create_indexes(
+        [
+            IndexModel(
+                [
+                    ("userId", ASCENDING),
+                    ("status", ASCENDING),
+                    ("position", ASCENDING),
+                    ("_id", DESCENDING),
+                ],
+                name="user_status_position",
+            ),
+            # Pages across all columns: newest first by _id
+            IndexModel(
+                [("userId", ASCENDING), ("_id", DESCENDING)],
+                name="user_id_desc",
+            ),
+            # Analytics: todos completed in a date window
+            IndexModel(
+                [("userId", ASCENDING), ("completedAt", ASCENDING)],
+                name="user_completed_at",
+            ),
+            # Monthly activity: todos started in a date window
+            IndexModel(
+                [("userId", ASCENDING), ("inProgressAt", ASCENDING)],
+                name="user_in_progress_at",
+            ),
+            IndexModel(
+                [("userId", ASCENDING), ("title", TEXT), ("notes", TEXT)],
+                name="user_todo_text",
+                weights={"title": 3},
+            ),
+        ]
+    )
+    # Todo logs: the open bucket for appends and newest-first paging
+    await db.todo_log_buckets.create_indexes(
+        [
+            IndexModel(
+                [("todoId", ASCENDING), ("firstLogId", DESCENDING)],
+                name="todo_log_buckets",
+            ),
+            # One bucket per sequence number, so appends cannot open two
+            # buckets at once (buckets from before `seq` are numbered by
+            # migration 012)
+            IndexModel(
+                [("todoId", ASCENDING), ("seq", ASCENDING)],
+                name="todo_log_bucket_seq",
+                unique=True,
+                partialFilterExpression={"seq": {"$exists": True}},
+            ),
+            IndexModel(
+                [("userId", ASCENDING), ("logs.notes", TEXT)],
+                name="user_todo_log_text",
+            ),
+        ]
+    )
+    # Search: text indexes prefixed with the owner, so per-user filtering
+    # happens inside the index scan (queries must match the owner exactly)
+    await db.transactions.create_indexes(
+        [
+            IndexModel(
+                [("userId", ASCENDING), ("notes", TEXT)],
+                name="user_transaction_text",
+            ),
+            # Monthly activity: spending in a date window
+            IndexModel(
+                [("userId", ASCENDING), ("date", ASCENDING)],
+                name="user_date",
+            ),
+        ]
+    )
+    # Trip transactions: newest-first paging per trip, and search
+    await db.trip_transactions.create_indexes(
+        [
+            IndexModel(
+                [("trip_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)],
+                name="trip_date",
+            ),
+            IndexModel(
+                [("user_id", ASCENDING), ("description", TEXT)],
+                name="user_trip_transaction_text",
+            ),
+        ]
+    )
+    # Habit calendar: one document per user and month
+    await db.task_history_monthly.create_indexes(
+        [
+            IndexModel(
+                [("owner_id", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)],
+                name="owner_month",
+                unique=True,
+            ),
+        ]
+    )
+    # Cold habit history and logs: one document per user and year
+    await db.task_archive.create_indexes(
+        [
+            IndexModel(
+                [("owner_id", ASCENDING), ("year", ASCENDING)],
+                name="owner_year",
+                unique=True,
+            ),
+        ]
+    )
+    # Planner: a user's tasks due on or before a day
+    await db.task_schedule.create_indexes(
+        [
+            IndexModel(
+                [("owner_id", ASCENDING), ("task_id", ASCENDING)],
+                name="owner_task",
+                unique=True,
+            ),
+            IndexModel(
+                [("owner_id", ASCENDING), ("next_due", ASCENDING)],
+                name="owner_next_due",
+            ),
+        ]
+    )
+    # Archive pass: users not yet archived up to the current cutoff
+    await db.tasks.create_indexes(
+        [
+            IndexModel([("archive.before", ASCENDING)], name="archive_before"),
+            IndexModel(
+                [("archive.moving", ASCENDING)], name="archive_moving", sparse=True
+            ),
+        ]
+    )
@@ -0,0 +1,140 @@
+# backend/utils/monthly_activity.py
+"""
+One month of activity across habits, todos and spending, for the calendar.
+
+Three independent reads run concurrently, each a range match on an index:
+
+- habits: the month's task_history_monthly document (owner_id, year, month)
+- todos: completedAt / inProgressAt in the month, grouped per day
+  ((userId, completedAt) and (userId, inProgressAt))
+- spending: expense transactions in the month, summed per day (userId, date)
+
+Days are UTC calendar days, as stored. Results are cached per worker against
+the user's tasks, todos and transactions versions.
+"""
+
+import asyncio
+from calendar import monthrange
+from datetime import datetime
+from typing import Dict, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.task_history import get_month
+from utils.versioning import VersionedCache
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def _per_day(field: str, start: datetime, end: datetime) -> List[dict]:
+    return [
+        {"$match": {field: {"$gte": start, "$lt": end}}},
+        {
+            "$group": {
+                "_id": {"$dateToString": {"format": DAY_FORMAT, "date": f"${field}"}},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+async def todo_activity(
+    db: AsyncIOMotorDatabase, user_id: str, start: datetime, end: datetime
+) -> dict:
+    """{"completed": {day: count}, "started": {day: count}}"""
+    pipeline = [
+        {
+            "$match": {
+                "userId": user_id,
+                "$or": [
+                    {"completedAt": {"$gte": start, "$lt": end}},
+                    {"inProgressAt": {"$gte": start, "$lt": end}},
+                ],
+            }
+        },
+        {
+            "$facet": {
+                "completed": _per_day("completedAt", start, end),
+                "started": _per_day("inProgressAt", start, end),
+            }
+        },
+    ]
+    result = await db.todos.aggregate(pipeline).to_list(length=1)
+    facets = result[0] if result else {}
+    return {
+        name: {group["_id"]: group["count"] for group in facets.get(name, [])}
+        for name in ("completed", "started")
+    }
+
+
+async def spending_activity(
+    db: AsyncIOMotorDatabase, user_id: str, start: datetime, end: datetime
+) -> Dict[str, dict]:
+    """{day: {"spent": total, "count": transactions}} for expenses."""
+    pipeline = [
+        {
+            "$match": {
+                "userId": user_id,
+                "date": {"$gte": start, "$lt": end},
+                "type": "expense",
+            }
+        },
+        {
+            "$group": {
+                "_id": {"$dateToString": {"format": DAY_FORMAT, "date": "$date"}},
+                "spent": {"$sum": "$amount"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+    return {
+        group["_id"]: {"spent": group["spent"], "count": group["count"]}
+        async for group in db.transactions.aggregate(pipeline)
+    }
+
+
+async def compute_monthly_activity(
+    db: AsyncIOMotorDatabase, user_id: str, year: int, month: int
+) -> dict:
+    start, end = month_bounds(year, month)
+    habits, todos, spending = await asyncio.gather(
+        get_month(db, user_id, year, month),
+        todo_activity(db, user_id, start, end),
+        spending_activity(db, user_id, start, end),
+    )
+
+    habits_per_day: Dict[str, int] = {}
+    for completed_dates in habits.values():
+        for day in completed_dates:
+            habits_per_day[day] = habits_per_day.get(day, 0) + 1
+
+    _, last_day = monthrange(year, month)
+    days = []
+    for day_of_month in range(1, last_day + 1):
+        day = f"{year:04d}-{month:02d}-{day_of_month:02d}"
+        spent = spending.get(day, {})
+        days.append(
+            {
+                "date": day,
+                "habitsCompleted": habits_per_day.get(day, 0),
+                "todosCompleted": todos["completed"].get(day, 0),
+                "todosStarted": todos["started"].get(day, 0),
+                "spent": spent.get("spent", 0),
+                "expenses": spent.get("count", 0),
+            }
+        )
+
+    return {
+        "year": year,
+        "month": month,
+        "habits": habits,
+        "days": days,
+        "totalSpent": sum(day["spent"] for day in days),
+    }
+
+
+activity_cache = VersionedCache()
@@ -0,0 +1,164 @@
+# backend/utils/payment_sweep.py
+"""
+Periodic sweep that flags credit cards whose payment is due soon or overdue.
+
+The sweep only range-scans the credit_card_payment_due index between
+OVERDUE_LOOKBACK_DAYS in the past and DUE_SOON_DAYS in the future, so its cost
+grows with the number of cards actually due rather than with the accounts
+collection. For each card it precomputes the urgency into the account document
+(writing, and bumping the owner's accounts version, only when it changed) and
+upserts one notification per (card, kind, due date), which keeps repeated
+sweeps idempotent.
+"""
+
+import asyncio
+import os
+from datetime import datetime, time, timedelta
+from typing import Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from .versioning import version_bump_op
+
+DUE_SOON_DAYS = 7
+OVERDUE_LOOKBACK_DAYS = 30
+SWEEP_BATCH_SIZE = 500
+SWEEP_INTERVAL_SECONDS = int(os.getenv("PAYMENT_SWEEP_INTERVAL_SECONDS", "3600"))
+
+
+def days_until_due(
+    payment_due_date, today=None
+) -> Tuple[Optional[datetime], Optional[int]]:
+    """Normalize a stored due date and return it with the days left until it."""
+    if not payment_due_date:
+        return None, None
+    if isinstance(payment_due_date, str):
+        payment_due_date = datetime.fromisoformat(
+            payment_due_date.replace("Z", "+00:00")
+        )
+    today = today or datetime.now().date()
+    return payment_due_date, (payment_due_date.date() - today).days
+
+
+def payment_urgency(days_left: Optional[int]) -> Tuple[str, str]:
+    """Map days until the due date to an urgency level and its reasoning."""
+    if days_left is None:
+        return "low", "Regular payment maintains good credit standing"
+    if days_left < 0:
+        return "high", "Payment is overdue! Pay immediately to avoid penalties"
+    if days_left <= 3:
+        return "high", "Payment due very soon, pay now to avoid late fees"
+    if days_left <= DUE_SOON_DAYS:
+        return "medium", "Payment due within a week, plan payment soon"
+    return "low", "Regular payment maintains good credit standing"
+
+
+async def run_payment_sweep(db: AsyncIOMotorDatabase, now: Optional[datetime] = None):
+    """Run one sweep and return how many cards were flagged."""
+    now = now or datetime.now()
+    today = now.date()
+    today_start = datetime.combine(today, time.min)
+
+    cursor = db.accounts.find(
+        {
+            "accountType": "credit_card",
+            "paymentDueDate": {
+                "$gte": today_start - timedelta(days=OVERDUE_LOOKBACK_DAYS),
+                "$lt": today_start + timedelta(days=DUE_SOON_DAYS + 1),
+            },
+        },
+        projection={
+            "userId": 1,
+            "accountName": 1,
+            "balance": 1,
+            "minimumPaymentDue": 1,
+            "paymentDueDate": 1,
+            "paymentUrgency": 1,
+        },
+    )
+
+    account_ops = []
+    notification_ops = []
+    touched_users = set()
+    flagged = 0
+
+    async for account in cursor:
+        due_date, days_left = days_until_due(account["paymentDueDate"], today)
+        urgency, reasoning = payment_urgency(days_left)
+
+        if account.get("paymentUrgency") != urgency:
+            touched_users.add(account["userId"])
+            account_ops.append(
+                UpdateOne(
+                    {"_id": account["_id"], "paymentUrgency": {"$ne": urgency}},
+                    {
+                        "$set": {
+                            "paymentUrgency": urgency,
+                            "urgencyUpdatedAt": now,
+                        }
+                    },
+                )
+            )
+
+        # Nothing to remind about once the card is paid off
+        if account.get("balance", 0) > 0:
+            flagged += 1
+            notification_ops.append(
+                UpdateOne(
+                    {
+                        "accountId": str(account["_id"]),
+                        "kind": "overdue" if days_left < 0 else "due_soon",
+                        "paymentDueDate": due_date,
+                    },
+                    {
+                        "$set": {
+                            "userId": account["userId"],
+                            "accountName": account.get("accountName"),
+                            "amountDue": account.get("minimumPaymentDue")
+                            or account["balance"] * 0.02,
+                            "daysUntilDue": days_left,
+                            "urgency": urgency,
+                            "message": reasoning,
+                            "updatedAt": now,
+                        },
+                        "$setOnInsert": {"createdAt": now, "read": False},
+                    },
+                    upsert=True,
+                )
+            )
+
+        if len(account_ops) + len(notification_ops) >= SWEEP_BATCH_SIZE:
+            await _flush(db, account_ops, notification_ops, touched_users)
+            account_ops, notification_ops, touched_users = [], [], set()
+
+    await _flush(db, account_ops, notification_ops, touched_users)
+    return flagged
+
+
+async def _flush(
+    db: AsyncIOMotorDatabase,
+    account_ops: list,
+    notification_ops: list,
+    touched_users: set,
+):
+    if account_ops:
+        await db.accounts.bulk_write(account_ops, ordered=False)
+    if notification_ops:
+        await db.payment_notifications.bulk_write(notification_ops, ordered=False)
+    if touched_users:
+        # The urgency fields are part of the account list responses
+        await db.collection_versions.bulk_write(
+            [version_bump_op(user_id, "accounts") for user_id in touched_users],
+            ordered=False,
+        )
+
+
+async def payment_sweep_loop(db: AsyncIOMotorDatabase):
+    """Background task started by the app lifespan."""
+    while True:
+        try:
+            flagged = await run_payment_sweep(db)
+            print(f"Payment sweep flagged {flagged} credit cards.")
+        except PyMongoError as e:
+            print(f"Payment sweep failed: {e}")
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,162 @@
+# backend/utils/settlement.py
+"""
+Who owes whom on a trip.
+
+Every member's net balance is what they paid minus their share, in integer
+cents so that balances always sum to exactly zero:
+
+- contributions (initial and participant_contribution) are cash handed to the
+  leader: the participant is owed it, the leader owes it back
+- leader_expense and participant_outofpocket are paid for the whole group by
+  the leader or the participant, and split equally between all members (the
+  leader and every participant); leftover cents go to the first members
+
+Transfers then move money from debtors to creditors. The greedy settlement
+repeatedly matches the largest debtor with the largest creditor (two heaps),
+which settles at least one member per transfer: at most n - 1 transfers in
+O(n log n). The exact settlement finds the fewest transfers: members split
+into the most groups that each sum to zero, and a group of k settles in k - 1
+transfers. That is a subset DP in O(2^n * n), so it only runs for up to
+EXACT_MAX_MEMBERS members with a non-zero balance.
+"""
+
+import heapq
+from typing import Dict, List, Tuple
+
+LEADER = "leader"
+EXACT_MAX_MEMBERS = 12
+EXPENSE_TYPES = ("leader_expense", "participant_outofpocket")
+
+
+def to_cents(amount) -> int:
+    return int(round((amount or 0) * 100))
+
+
+def net_balances(trip: dict) -> Tuple[List[str], Dict[str, int], Dict[str, int]]:
+    """
+    (members, paid, net) in cents. Members are the leader followed by the
+    participants in trip order; net > 0 means the member is owed money.
+    """
+    members = [LEADER] + [p["id"] for p in trip.get("participants", []) if "id" in p]
+    paid = {member: 0 for member in members}
+
+    for participant in trip.get("participants", []):
+        if participant.get("id") in paid:
+            cents = to_cents(participant.get("initial_contribution"))
+            paid[participant["id"]] += cents
+            paid[LEADER] -= cents
+
+    shared = 0
+    for transaction in trip.get("transactions", []):
+        cents = to_cents(transaction.get("amount"))
+        payer = transaction.get("participant_id") or transaction.get("paid_by")
+        if transaction.get("type") == "participant_contribution":
+            if payer in paid and payer != LEADER:
+                paid[payer] += cents
+                paid[LEADER] -= cents
+        elif transaction.get("type") in EXPENSE_TYPES:
+            if transaction["type"] == "leader_expense" or payer not in paid:
+                payer = LEADER
+            paid[payer] += cents
+            shared += cents
+
+    # Every expense is split between everyone, so the shares add up once
+    share, leftover = divmod(shared, len(members))
+    net = {
+        member: paid[member] - share - (1 if index < leftover else 0)
+        for index, member in enumerate(members)
+    }
+    return members, paid, net
+
+
+def _greedy(net: Dict[str, int]) -> List[Tuple[str, str, int]]:
+    creditors = [(-cents, member) for member, cents in net.items() if cents > 0]
+    debtors = [(cents, member) for member, cents in net.items() if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        owed, creditor = heapq.heappop(creditors)
+        owes, debtor = heapq.heappop(debtors)
+        amount = min(-owed, -owes)
+        transfers.append((debtor, creditor, amount))
+        if -owed > amount:
+            heapq.heappush(creditors, (owed + amount, creditor))
+        if -owes > amount:
+            heapq.heappush(debtors, (owes + amount, debtor))
+    return transfers
+
+
+def _zero_sum_groups(members: List[str], net: Dict[str, int]) -> List[List[str]]:
+    """The largest partition of `members` into groups whose balances sum to 0."""
+    count = len(members)
+    full = (1 << count) - 1
+    total = [0] * (full + 1)
+    groups = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = (mask & -mask).bit_length() - 1
+        total[mask] = total[mask & (mask - 1)] + net[members[low]]
+        groups[mask] = max(
+            groups[mask ^ (1 << index)] for index in range(count) if mask >> index & 1
+        ) + (total[mask] == 0)
+
+    # Walk back down one chain of optimal removals; each zero-sum mask on the
+    # chain closes a group
+    partition = []
+    mask, boundary = full, full
+    while mask:
+        zero = total[mask] == 0
+        for index in range(count):
+            if mask >> index & 1 and groups[mask ^ (1 << index)] + zero == groups[mask]:
+                mask ^= 1 << index
+                break
+        if mask == 0 or total[mask] == 0:
+            partition.append(
+                [members[i] for i in range(count) if (boundary & ~mask) >> i & 1]
+            )
+            boundary = mask
+    return partition
+
+
+def settle(net: Dict[str, int], exact: bool = True) -> Tuple[list, str]:
+    """(transfers as (from, to, cents), method) settling every balance."""
+    owing = [member for member, cents in net.items() if cents != 0]
+    if not exact or len(owing) > EXACT_MAX_MEMBERS:
+        return _greedy(net), "greedy"
+    transfers = []
+    for group in _zero_sum_groups(owing, net):
+        # Within a group with no zero-sum subgroup, greedy needs k - 1 transfers
+        transfers.extend(_greedy({member: net[member] for member in group}))
+    return transfers, "exact"
+
+
+def trip_settlement(trip: dict, exact: bool = True) -> dict:
+    members, paid, net = net_balances(trip)
+    names = {LEADER: "Leader"}
+    names.update(
+        {p["id"]: p.get("name", "") for p in trip.get("participants", []) if "id" in p}
+    )
+    transfers, method = settle(net, exact)
+    return {
+        "method": method,
+        "balances": [
+            {
+                "member_id": member,
+                "name": names[member],
+                "paid": paid[member] / 100,
+                "net": net[member] / 100,
+            }
+            for member in members
+        ],
+        "transfers": [
+            {
+                "from_id": debtor,
+                "from_name": names[debtor],
+                "to_id": creditor,
+                "to_name": names[creditor],
+                "amount": cents / 100,
+            }
+            for debtor, creditor, cents in transfers
+        ],
+    }
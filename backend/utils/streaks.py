@@ -0,0 +1,248 @@
+# backend/utils/streaks.py
+"""
+Habit streaks that respect each task's free-text `frequency`.
+
+Understood frequencies (case-insensitive; anything else counts as daily):
+
+    "daily", "every day"                -> every day is due
+    "weekdays"                          -> Monday to Friday are due
+    "mon, wed, fri", "tuesdays"         -> those weekdays are due
+    "every 3 days", "every other day"   -> at most N days between completions
+    "3 times a week", "twice a week", "3x/week", "weekly"
+                                        -> N completions per (Monday) week
+
+Day-based streaks count completions and break when a due day passes without
+one; week-based streaks count consecutive weeks that met the quota.
+
+Each task stores its streak state next to its history. A toggle that adds the
+newest completion advances the state in O(1) (`advance`); any other toggle
+replays the task's history (`compute`), which is the same fold from an empty
+state and doubles as the consistency check.
+
+Once old history is archived (see utils/task_archive.py), replays start from
+the task's base state: the fold over its archived days.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional
+from utils.task_history import history_from_bits
+
+WEEKDAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+EVERY_DAY = frozenset(range(7))
+WEEKDAYS = frozenset(range(5))
+COUNT_WORDS = {"once": "1 times", "twice": "2 times", "thrice": "3 times"}
+
+
+@dataclass(frozen=True)
+class Schedule:
+    kind: str = "days"  # "days", "interval" or "weekly"
+    due_weekdays: FrozenSet[int] = field(default=EVERY_DAY)
+    interval: int = 1
+    per_week: int = 1
+
+    @property
+    def unit(self) -> str:
+        return "weeks" if self.kind == "weekly" else "days"
+
+
+def parse_frequency(frequency: Optional[str]) -> Schedule:
+    text = (frequency or "").strip().lower()
+    for word, count in COUNT_WORDS.items():
+        text = re.sub(rf"\b{word}\b", count, text)
+    if not text or text in ("daily", "every day", "everyday"):
+        return Schedule()
+    if "weekday" in text:
+        return Schedule(due_weekdays=WEEKDAYS)
+
+    if "every other day" in text:
+        return Schedule(kind="interval", interval=2)
+    match = re.search(r"every\s+(\d+)\s+days?", text)
+    if match:
+        return Schedule(kind="interval", interval=max(1, int(match.group(1))))
+
+    match = re.search(r"(\d+)\s*(?:x|times?)?\s*(?:a|per|/|each)\s*week", text)
+    if match:
+        return Schedule(kind="weekly", per_week=max(1, int(match.group(1))))
+    if text in ("weekly", "every week"):
+        return Schedule(kind="weekly", per_week=1)
+
+    named = frozenset(
+        index
+        for index, name in enumerate(WEEKDAY_NAMES)
+        if re.search(rf"\b{name}", text)
+    )
+    if named:
+        return Schedule(due_weekdays=named)
+    return Schedule()
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def empty_state(schedule: Schedule) -> dict:
+    return {
+        "current": 0,
+        "longest": 0,
+        "unit": schedule.unit,
+        "last_completed": None,
+        # Week-based schedules: the week being counted and its completions
+        "period_start": None,
+        "period_count": 0,
+        # Week-based schedules: the last week that met the quota
+        "last_period": None,
+    }
+
+
+def _missed_due_day(schedule: Schedule, after: date, before: date) -> bool:
+    """Whether a due day lies strictly between the two dates."""
+    if schedule.kind == "interval":
+        return (before - after).days > schedule.interval
+    gap = (before - after).days - 1
+    if gap >= 7:
+        return True
+    return any(
+        (after + timedelta(days=offset)).weekday() in schedule.due_weekdays
+        for offset in range(1, gap + 1)
+    )
+
+
+def advance(state: dict, day: str, schedule: Schedule) -> dict:
+    """The state after completing `day`, which must be after last_completed."""
+    state = {**state, "unit": schedule.unit}
+    completed = date.fromisoformat(day)
+
+    if schedule.kind == "weekly":
+        period = week_start(completed).isoformat()
+        if state.get("period_start") == period:
+            state["period_count"] = state.get("period_count", 0) + 1
+        else:
+            state["period_start"], state["period_count"] = period, 1
+        if state["period_count"] == schedule.per_week:
+            previous = (week_start(completed) - timedelta(weeks=1)).isoformat()
+            extends = state.get("last_period") == previous
+            state["current"] = state["current"] + 1 if extends else 1
+            state["last_period"] = period
+    else:
+        last = state.get("last_completed")
+        extends = last is not None and not _missed_due_day(
+            schedule, date.fromisoformat(last), completed
+        )
+        state["current"] = state["current"] + 1 if extends else 1
+
+    state["longest"] = max(state.get("longest", 0), state["current"])
+    state["last_completed"] = day
+    return state
+
+
+def compute(
+    completed_days: Iterable[str], schedule: Schedule, base: Optional[dict] = None
+) -> dict:
+    """Replay a task's completed days (oldest first) from `base` or empty."""
+    state = dict(base) if base else empty_state(schedule)
+    for day in completed_days:
+        state = advance(state, day, schedule)
+    return state
+
+
+def compute_task(task: dict, base: Optional[dict] = None) -> dict:
+    """
+    The task's streak state from its history_bits, continuing from `base` (the
+    state over its archived days) when that was computed for this frequency.
+    """
+    schedule = parse_frequency(task.get("frequency"))
+    days = [
+        entry["date"] for entry in history_from_bits(task.get("history_bits") or {})
+    ]
+    if base and base.get("frequency") != task.get("frequency"):
+        base = None
+    # Remember the frequency the state was computed for, to spot changes
+    return {**compute(days, schedule, base), "frequency": task.get("frequency")}
+
+
+def with_streaks(
+    categories: List[dict], bases: Optional[Dict[str, dict]] = None
+) -> List[dict]:
+    """Encoded categories with every task's streak state recomputed."""
+    bases = bases or {}
+    return [
+        {
+            **category,
+            "tasks": [
+                {**task, "streak": compute_task(task, bases.get(str(task["id"])))}
+                for task in category["tasks"]
+            ],
+        }
+        for category in categories
+    ]
+
+
+def toggle(task: dict, day: str, completed: bool, base: Optional[dict] = None) -> dict:
+    """
+    The task's streak state after a toggle, given the task as stored after
+    the toggle was applied. Adding the newest completion is O(1).
+    """
+    schedule = parse_frequency(task.get("frequency"))
+    state = task.get("streak")
+    last = state.get("last_completed") if state else None
+    if state and state.get("frequency") == task.get("frequency"):
+        if completed and (last is None or day > last):
+            return advance(state, day, schedule)
+        if last is not None and day > last:
+            # Clearing a day that was never counted
+            return state
+        if completed and day == last:
+            return state
+    return compute_task(task, base)
+
+
+def next_due(state: Optional[dict], schedule: Schedule, since: date) -> date:
+    """
+    The next day the task is due: the first due day after its last completion,
+    or on/after `since` if it was never completed. Weekly quotas are due every
+    day until met, then again from the next Monday.
+    """
+    last = state.get("last_completed") if state else None
+    if last is None:
+        if schedule.kind != "days":
+            return since
+        start = since
+    else:
+        last_day = date.fromisoformat(last)
+        if schedule.kind == "interval":
+            return last_day + timedelta(days=schedule.interval)
+        if schedule.kind == "weekly":
+            week = week_start(last_day)
+            if state.get("last_period") == week.isoformat():
+                return week + timedelta(weeks=1)
+            return last_day + timedelta(days=1)
+        start = last_day + timedelta(days=1)
+    return next(
+        start + timedelta(days=offset)
+        for offset in range(7)
+        if (start + timedelta(days=offset)).weekday() in schedule.due_weekdays
+    )
+
+
+def current_streak(state: Optional[dict], schedule: Schedule, today: date) -> int:
+    """The stored run length, or 0 if a due day has passed since it ended."""
+    if not state or not state.get("last_completed"):
+        return 0
+    if schedule.kind == "weekly":
+        last_period = state.get("last_period")
+        if last_period is None:
+            return 0
+        weeks_ago = (week_start(today) - date.fromisoformat(last_period)).days // 7
+        # The current week is still in progress
+        return state["current"] if weeks_ago <= 1 else 0
+    last = date.fromisoformat(state["last_completed"])
+    if today <= last:
+        return state["current"]
+    if schedule.kind == "interval":
+        alive = (today - last).days <= schedule.interval
+    else:
+        # Today is not missed until it is over
+        alive = not _missed_due_day(schedule, last, today)
+    return state["current"] if alive else 0
@@ -0,0 +1,395 @@
+# backend/utils/task_archive.py
+"""
+Cold storage for old habit history and daily logs.
+
+History bits and daily logs older than ARCHIVE_AFTER_MONTHS move out of the
+user's tasks document into task_archive, one document per (owner_id, year):
+
+    {owner_id, year,
+     history_bits: {"YYYY-MM": {"<task id>": bits, ...}, ...},
+     daily_logs: {"<task id>": [log, ...], ...}}
+
+The tasks document then records what was moved:
+
+    archive: {before: "YYYY-MM", streak_base: {"<task id>": streak state},
+              moving: true}
+
+Everything before `before` lives in the archive. `moving` is set while a pass
+is still copying the newly archived months; until it is cleared they are also
+still in the tasks document, and toggles update both copies. `streak_base` is each task's
+streak state over its archived days, so streaks still replay exactly from the
+hot history alone (see utils/streaks.py). The calendar and heatmap read the
+monthly index, which keeps every month; only GET /api/tasks for an archived
+month and edits to archived days or logs touch the archive.
+
+A background loop archives users in batches; each pass is idempotent, and a
+pass that is interrupted or keeps racing with edits leaves `moving` set, so
+the next one finishes it.
+"""
+
+import asyncio
+import os
+from datetime import date
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import PyMongoError
+from .streaks import compute, parse_frequency
+from .task_history import history_from_bits
+from .versioning import version_bump_op
+
+ARCHIVE_AFTER_MONTHS = int(os.getenv("TASK_ARCHIVE_AFTER_MONTHS", "12"))
+ARCHIVE_BATCH_SIZE = 50
+ARCHIVE_ATTEMPTS = 5
+ARCHIVE_INTERVAL_SECONDS = int(os.getenv("TASK_ARCHIVE_INTERVAL_SECONDS", "86400"))
+
+ARCHIVE_PROJECTION = {
+    "owner_id": 1,
+    "archive": 1,
+    "categories.tasks.id": 1,
+    "categories.tasks.frequency": 1,
+    "categories.tasks.history_bits": 1,
+    "categories.tasks.daily_logs": 1,
+}
+
+
+def archive_cutoff(today: Optional[date] = None) -> str:
+    """The oldest month ("YYYY-MM") that stays in the tasks document."""
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - ARCHIVE_AFTER_MONTHS
+    return f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+
+def archived_before(user_tasks_doc: Optional[dict]) -> Optional[str]:
+    return ((user_tasks_doc or {}).get("archive") or {}).get("before")
+
+
+def is_archived(user_tasks_doc: Optional[dict], key: str) -> bool:
+    before = archived_before(user_tasks_doc)
+    return before is not None and key < before
+
+
+async def archived_history(
+    db: AsyncIOMotorDatabase, owner_id: str
+) -> Dict[str, Dict[str, int]]:
+    """{task id: {"YYYY-MM": bits}} over all of the user's archived years."""
+    history: Dict[str, Dict[str, int]] = {}
+    async for archive in db.task_archive.find(
+        {"owner_id": owner_id}, projection={"history_bits": 1}
+    ):
+        for key, tasks in (archive.get("history_bits") or {}).items():
+            for task_id, bits in tasks.items():
+                if bits:
+                    history.setdefault(task_id, {})[key] = bits
+    return history
+
+
+def streak_base(task: dict, archived_bits: Dict[str, int]) -> dict:
+    """A task's streak state over its archived days."""
+    schedule = parse_frequency(task.get("frequency"))
+    days = [entry["date"] for entry in history_from_bits(archived_bits)]
+    return {**compute(days, schedule), "frequency": task.get("frequency")}
+
+
+async def streak_bases(
+    db: AsyncIOMotorDatabase, owner_id: str, categories: List[dict], archive: dict
+) -> Optional[Dict[str, dict]]:
+    """
+    The streak bases to replay `categories` from. Returns None when the stored
+    bases still match every task's frequency, otherwise freshly computed ones
+    (which the caller should store).
+    """
+    bases = archive.get("streak_base") or {}
+    stale = [
+        task
+        for category in categories
+        for task in category["tasks"]
+        if str(task["id"]) in bases
+        and bases[str(task["id"])].get("frequency") != task.get("frequency")
+    ]
+    if not stale:
+        return None
+    history = await archived_history(db, owner_id)
+    fresh = dict(bases)
+    for task in stale:
+        fresh[str(task["id"])] = streak_base(task, history.get(str(task["id"]), {}))
+    return fresh
+
+
+async def archive_user(
+    db: AsyncIOMotorDatabase, user_tasks_doc: dict, cutoff: str
+) -> bool:
+    """
+    Move one user's history and logs from before `cutoff` into task_archive.
+    Returns whether anything was moved.
+
+    `archive.before` moves to the cutoff first, so from then on toggles of
+    those months go through set_archived_day. The months are then copied, and dropped from the tasks document only if
+    it still holds what was copied; otherwise they are read and copied again.
+    """
+    user_tasks_doc = await db.tasks.find_one_and_update(
+        {
+            "_id": user_tasks_doc["_id"],
+            "archive.before": {"$not": {"$gt": cutoff}},
+        },
+        {"$set": {"archive.before": cutoff, "archive.moving": True}},
+        projection=ARCHIVE_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    copied_log_ids: Dict[str, set] = {}
+    for _ in range(ARCHIVE_ATTEMPTS):
+        if user_tasks_doc is None or archived_before(user_tasks_doc) != cutoff:
+            # A later pass has taken over
+            return False
+        moved = await _move_old_months(db, user_tasks_doc, cutoff, copied_log_ids)
+        if moved is not None:
+            return moved
+        user_tasks_doc = await db.tasks.find_one(
+            {"_id": user_tasks_doc["_id"]}, projection=ARCHIVE_PROJECTION
+        )
+    return False
+
+
+async def _move_old_months(
+    db: AsyncIOMotorDatabase,
+    user_tasks_doc: dict,
+    cutoff: str,
+    copied_log_ids: Dict[str, set],
+) -> Optional[bool]:
+    """
+    One attempt of archive_user. Returns None if the tasks document changed
+    between the read and the final update, which then did nothing.
+    """
+    owner_id = user_tasks_doc["owner_id"]
+    first_day = f"{cutoff}-01"
+    years: Dict[int, dict] = {}
+    log_ids: Dict[str, list] = {}
+    old_bits: Dict[str, Dict[str, int]] = {}
+    # The final update only applies to the tasks document as read here
+    query = {"_id": user_tasks_doc["_id"], "archive.before": cutoff}
+    update: dict = {"$unset": {"archive.moving": ""}}
+    tasks = []
+
+    for c, category in enumerate(user_tasks_doc.get("categories", [])):
+        for t, task in enumerate(category.get("tasks", [])):
+            tasks.append(task)
+            task_id = str(task["id"])
+            path = f"categories.{c}.tasks.{t}"
+            for key, bits in (task.get("history_bits") or {}).items():
+                if key >= cutoff:
+                    continue
+                query[f"{path}.id"] = task["id"]
+                query[f"{path}.history_bits.{key}"] = bits
+                update["$unset"][f"{path}.history_bits.{key}"] = ""
+                if bits:
+                    old_bits.setdefault(task_id, {})[key] = bits
+                # Set rather than OR: the tasks document is the source of
+                # truth until the months are dropped from it
+                years.setdefault(int(key[:4]), {}).setdefault("$set", {})[
+                    f"history_bits.{key}.{task_id}"
+                ] = bits
+            logs = task.get("daily_logs") or []
+            moved_logs = [
+                log for log in logs if log.get("date", "") < first_day and log.get("id")
+            ]
+            if not moved_logs:
+                continue
+            query[f"{path}.id"] = task["id"]
+            query[f"{path}.daily_logs"] = logs
+            update.setdefault("$pull", {})[f"{path}.daily_logs"] = {
+                "id": {"$in": [log["id"] for log in moved_logs]}
+            }
+            log_ids.setdefault(task_id, []).extend(log["id"] for log in moved_logs)
+            for log in moved_logs:
+                logs_update = years.setdefault(int(log["date"][:4]), {})
+                logs_update.setdefault("$push", {}).setdefault(
+                    f"daily_logs.{task_id}", {"$each": []}
+                )["$each"].append(log)
+
+    # Copy first: a pass interrupted after this point is simply repeated.
+    # Logs copied by an earlier attempt are replaced, so an edit or delete
+    # made in between is not left behind as a second copy.
+    stale_logs = {
+        task_id: list(copied_log_ids.get(task_id, set()) | set(ids))
+        for task_id, ids in log_ids.items()
+    }
+    for task_id, ids in copied_log_ids.items():
+        stale_logs.setdefault(task_id, list(ids))
+    if stale_logs:
+        await db.task_archive.update_many(
+            {"owner_id": owner_id},
+            {
+                "$pull": {
+                    f"daily_logs.{task_id}": {"id": {"$in": ids}}
+                    for task_id, ids in stale_logs.items()
+                }
+            },
+        )
+    if years:
+        await db.task_archive.bulk_write(
+            [
+                UpdateOne({"owner_id": owner_id, "year": year}, changes, upsert=True)
+                for year, changes in years.items()
+            ],
+            ordered=False,
+        )
+    for task_id, ids in log_ids.items():
+        copied_log_ids.setdefault(task_id, set()).update(ids)
+
+    bases = dict((user_tasks_doc.get("archive") or {}).get("streak_base") or {})
+    if old_bits:
+        history = await archived_history(db, owner_id)
+        for task in tasks:
+            task_id = str(task["id"])
+            if task_id in old_bits:
+                bases[task_id] = streak_base(task, history.get(task_id, {}))
+    update["$set"] = {"archive.streak_base": bases}
+
+    result = await db.tasks.update_one(query, update)
+    if not result.matched_count:
+        return None
+    return bool(years)
+
+
+async def run_task_archive(
+    db: AsyncIOMotorDatabase, today: Optional[date] = None
+) -> int:
+    """Archive every user not yet archived up to this month's cutoff."""
+    cutoff = archive_cutoff(today)
+    cursor = db.tasks.find(
+        {
+            "$or": [
+                {"archive.before": {"$lt": cutoff}},
+                {"archive": {"$exists": False}},
+                {"archive.moving": True},
+            ]
+        },
+        projection=ARCHIVE_PROJECTION,
+    )
+
+    archived = 0
+    batch = []
+    async for user_tasks_doc in cursor:
+        batch.append(user_tasks_doc)
+        if len(batch) >= ARCHIVE_BATCH_SIZE:
+            archived += await _archive_batch(db, batch, cutoff)
+            batch = []
+    if batch:
+        archived += await _archive_batch(db, batch, cutoff)
+    return archived
+
+
+async def _archive_batch(db: AsyncIOMotorDatabase, batch: List[dict], cutoff: str):
+    moved = await asyncio.gather(*(archive_user(db, doc, cutoff) for doc in batch))
+    touched_users = [doc["owner_id"] for doc, did in zip(batch, moved) if did]
+    if touched_users:
+        # The archived data is no longer part of the task list responses
+        await db.collection_versions.bulk_write(
+            [version_bump_op(user_id, "tasks") for user_id in touched_users],
+            ordered=False,
+        )
+    return len(touched_users)
+
+
+async def task_archive_loop(db: AsyncIOMotorDatabase):
+    """Background task started by the app lifespan."""
+    while True:
+        try:
+            archived = await run_task_archive(db)
+            print(f"Task archive moved old history of {archived} users.")
+        except PyMongoError as e:
+            print(f"Task archive failed: {e}")
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
+
+
+# --- Reads and edits of archived data -----------------------------------------
+
+
+async def merge_archived_month(
+    db: AsyncIOMotorDatabase, user_tasks_doc: dict, key: str
+) -> dict:
+    """The tasks document with one archived month's bits and logs merged in."""
+    archive = await db.task_archive.find_one(
+        {"owner_id": user_tasks_doc["owner_id"], "year": int(key[:4])},
+        projection={f"history_bits.{key}": 1, "daily_logs": 1},
+    )
+    if not archive:
+        return user_tasks_doc
+    month_bits = (archive.get("history_bits") or {}).get(key) or {}
+    archived_logs = archive.get("daily_logs") or {}
+
+    def merged(task: dict) -> dict:
+        task_id = str(task["id"])
+        bits = dict(task.get("history_bits") or {})
+        if month_bits.get(task_id):
+            bits[key] = bits.get(key, 0) | month_bits[task_id]
+        logs = list(task.get("daily_logs") or [])
+        hot_ids = {log.get("id") for log in logs}
+        logs.extend(
+            log
+            for log in archived_logs.get(task_id, [])
+            if log.get("date", "").startswith(key) and log.get("id") not in hot_ids
+        )
+        return {**task, "history_bits": bits, "daily_logs": logs}
+
+    return {
+        **user_tasks_doc,
+        "categories": [
+            {**category, "tasks": [merged(task) for task in category["tasks"]]}
+            for category in user_tasks_doc.get("categories", [])
+        ],
+    }
+
+
+async def set_archived_day(
+    db: AsyncIOMotorDatabase, owner_id: str, task: dict, key: str, operation: dict
+) -> dict:
+    """Apply a toggle's $bit to an archived month; returns the new streak base."""
+    task_id = str(task["id"])
+    await db.task_archive.update_one(
+        {"owner_id": owner_id, "year": int(key[:4])},
+        {"$bit": {f"history_bits.{key}.{task_id}": operation}},
+        upsert=True,
+    )
+    # While archive_user is still moving the month, the tasks document holds
+    # the copy it moves (and compares against): toggle that one too
+    await db.tasks.update_one(
+        {"owner_id": owner_id, "archive.moving": True},
+        {"$bit": {f"categories.$[].tasks.$[t].history_bits.{key}": operation}},
+        array_filters=[
+            {"t.id": task["id"], f"t.history_bits.{key}": {"$exists": True}}
+        ],
+    )
+    history = await archived_history(db, owner_id)
+    return streak_base(task, history.get(task_id, {}))
+
+
+async def update_archived_log(
+    db: AsyncIOMotorDatabase,
+    owner_id: str,
+    task_id: int,
+    condition: dict,
+    array_filter: dict,
+    fields: dict,
+) -> bool:
+    result = await db.task_archive.update_one(
+        {"owner_id": owner_id, f"daily_logs.{task_id}": {"$elemMatch": condition}},
+        {
+            "$set": {
+                f"daily_logs.{task_id}.$[l].{name}": value
+                for name, value in fields.items()
+            }
+        },
+        array_filters=[array_filter],
+    )
+    return result.matched_count > 0
+
+
+async def delete_archived_log(
+    db: AsyncIOMotorDatabase, owner_id: str, task_id: int, condition: dict
+) -> bool:
+    result = await db.task_archive.update_one(
+        {"owner_id": owner_id, f"daily_logs.{task_id}": {"$elemMatch": condition}},
+        {"$pull": {f"daily_logs.{task_id}": condition}},
+    )
+    return result.modified_count > 0
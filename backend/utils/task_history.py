@@ -0,0 +1,220 @@
+# backend/utils/task_history.py
+"""
+Compact habit-task completion history.
+
+Instead of one {date, completed} object per task per day, each task stores
+one 32-bit integer per month under `history_bits`:
+
+    "history_bits": {"2025-06": 0b1100000000000000000000000000011, ...}
+
+Bit (day - 1) is set when the task was done that day. A year of history is
+12 small integers rather than 365 embedded documents, and a toggle is a
+single atomic $bit update. The API still speaks the TaskHistory shape: these
+helpers convert between the two at the edges.
+"""
+
+from calendar import monthrange
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+
+def month_key(day: str) -> Tuple[str, int]:
+    """("YYYY-MM", day of month) for a "YYYY-MM-DD" date."""
+    return day[:7], int(day[8:10])
+
+
+def day_mask(day_of_month: int) -> int:
+    return 1 << (day_of_month - 1)
+
+
+def bits_from_history(history: Iterable[dict]) -> Dict[str, int]:
+    bits: Dict[str, int] = {}
+    for entry in history:
+        if not entry.get("completed"):
+            continue
+        key, day = month_key(entry["date"])
+        bits[key] = bits.get(key, 0) | day_mask(day)
+    return bits
+
+
+def days_in_month(key: str, bits: int) -> List[str]:
+    """The completed "YYYY-MM-DD" dates encoded in one month's bits."""
+    year, month = int(key[:4]), int(key[5:7])
+    _, last_day = monthrange(year, month)
+    return [
+        f"{key}-{day:02d}" for day in range(1, last_day + 1) if bits & day_mask(day)
+    ]
+
+
+def history_from_bits(bits: Dict[str, int]) -> List[dict]:
+    """The TaskHistory entries (completed days only), oldest first."""
+    return [
+        {"date": day, "completed": True}
+        for key in sorted(bits)
+        for day in days_in_month(key, bits[key])
+    ]
+
+
+def encode_task(task: dict) -> dict:
+    """A task as stored: its history folded into history_bits."""
+    stored = {key: value for key, value in task.items() if key != "history"}
+    if "history" in task:
+        bits = bits_from_history(task["history"] or [])
+        # Keep days already toggled into bits on a partly migrated task
+        for key, value in (task.get("history_bits") or {}).items():
+            bits[key] = bits.get(key, 0) | value
+        stored["history_bits"] = bits
+    return stored
+
+
+def encode_categories(categories: List[dict]) -> List[dict]:
+    return [
+        {**category, "tasks": [encode_task(task) for task in category["tasks"]]}
+        for category in categories
+    ]
+
+
+def decode_task(task: dict) -> dict:
+    """A task as served: history rebuilt from history_bits."""
+    if "history_bits" not in task:
+        # Not migrated yet; the embedded history is still authoritative
+        return {**task, "history": task.get("history", [])}
+    served = {key: value for key, value in task.items() if key != "history_bits"}
+    served["history"] = history_from_bits(task["history_bits"])
+    return served
+
+
+def decode_user_tasks(doc: dict) -> dict:
+    return {
+        **doc,
+        "categories": [
+            {**category, "tasks": [decode_task(task) for task in category["tasks"]]}
+            for category in doc.get("categories", [])
+        ],
+    }
+
+
+# --- Monthly index ---------------------------------------------------------
+# task_history_monthly holds one document per (owner_id, year, month) with the
+# month's bits of every task: {"tasks": {"<task id>": bits, ...}}. The calendar
+# reads a month with one indexed find_one instead of scanning the tasks.
+
+
+def _month_filter(owner_id: str, key: str) -> dict:
+    return {"owner_id": owner_id, "year": int(key[:4]), "month": int(key[5:7])}
+
+
+async def record_day(
+    db: AsyncIOMotorDatabase, owner_id: str, task_id: int, key: str, operation: dict
+):
+    """Apply a toggle's $bit operation to the month's index document."""
+    await db.task_history_monthly.update_one(
+        _month_filter(owner_id, key),
+        {"$bit": {f"tasks.{task_id}": operation}},
+        upsert=True,
+    )
+
+
+async def rebuild_monthly_index(
+    db: AsyncIOMotorDatabase,
+    owner_id: str,
+    categories: List[dict],
+    since: Optional[str] = None,
+):
+    """
+    Rewrite the user's monthly index from their stored (encoded) tasks. With
+    `since`, months before it (archived, see utils/task_archive.py) are kept.
+    """
+    months: Dict[str, Dict[str, int]] = {}
+    for category in categories:
+        for task in category.get("tasks", []):
+            for key, bits in (task.get("history_bits") or {}).items():
+                if bits and (since is None or key >= since):
+                    months.setdefault(key, {})[str(task["id"])] = bits
+
+    if months:
+        await db.task_history_monthly.bulk_write(
+            [
+                UpdateOne(
+                    _month_filter(owner_id, key),
+                    {"$set": {"tasks": tasks}},
+                    upsert=True,
+                )
+                for key, tasks in months.items()
+            ],
+            ordered=False,
+        )
+    # Months whose completions were all removed
+    stale = {"owner_id": owner_id}
+    if since is not None:
+        stale["$or"] = [
+            {"year": {"$gt": int(since[:4])}},
+            {"year": int(since[:4]), "month": {"$gte": int(since[5:7])}},
+        ]
+    if months:
+        stale["$nor"] = [
+            {"year": int(key[:4]), "month": int(key[5:7])} for key in months
+        ]
+    await db.task_history_monthly.delete_many(stale)
+
+
+async def get_month(
+    db: AsyncIOMotorDatabase, owner_id: str, year: int, month: int
+) -> Dict[int, List[str]]:
+    """{task id: completed dates} for one month, from a single point read."""
+    key = f"{year:04d}-{month:02d}"
+    doc = await db.task_history_monthly.find_one(
+        _month_filter(owner_id, key), projection={"tasks": 1}
+    )
+    history_map = {}
+    for task_id, bits in ((doc or {}).get("tasks") or {}).items():
+        completed_dates = days_in_month(key, bits)
+        if completed_dates:
+            history_map[int(task_id)] = completed_dates
+    return history_map
+
+
+async def get_year_heatmap(
+    db: AsyncIOMotorDatabase, owner_id: str, year: int, tasks: List[dict]
+) -> dict:
+    """
+    Day-by-day completions for a year from its (at most 12) monthly index
+    documents: a 0/1 array per task, indexed by day of year, plus per-day
+    totals and the share of tasks done.
+    """
+    year_length = (date(year + 1, 1, 1) - date(year, 1, 1)).days
+    days_by_task = {task["id"]: [0] * year_length for task in tasks}
+    totals = [0] * year_length
+    async for month_doc in db.task_history_monthly.find(
+        {"owner_id": owner_id, "year": year}, projection={"month": 1, "tasks": 1}
+    ):
+        offset = date(year, month_doc["month"], 1).timetuple().tm_yday - 1
+        _, last_day = monthrange(year, month_doc["month"])
+        for task_id, bits in (month_doc.get("tasks") or {}).items():
+            days = days_by_task.get(int(task_id))
+            if days is None or not bits:
+                continue
+            for day in range(1, last_day + 1):
+                if bits & day_mask(day):
+                    days[offset + day - 1] = 1
+                    totals[offset + day - 1] += 1
+
+    task_count = len(tasks)
+    return {
+        "year": year,
+        "start": date(year, 1, 1).isoformat(),
+        "tasks": [
+            {
+                "task_id": task["id"],
+                "text": task.get("text", ""),
+                "days": days_by_task[task["id"]],
+            }
+            for task in tasks
+        ],
+        "totals": totals,
+        "ratios": [
+            round(total / task_count, 3) if task_count else 0.0 for total in totals
+        ],
+    }
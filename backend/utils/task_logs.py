@@ -0,0 +1,65 @@
+# backend/utils/task_logs.py
+"""
+Stable identifiers for habit-task daily logs.
+
+Every log carries an `id`, so edits and deletes address exactly one log with
+array filters instead of rewriting the task list. Logs written before ids
+existed were identified by created_at, or by date when they had none; those
+identifiers are still accepted.
+"""
+
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+
+
+def new_log_id() -> str:
+    return uuid4().hex
+
+
+def normalize_log(log: dict) -> dict:
+    """A log as stored: with an id, and string dates as the API serves them."""
+    normalized = {**log, "id": log.get("id") or new_log_id()}
+    if isinstance(log.get("date"), datetime):
+        normalized["date"] = log["date"].strftime("%Y-%m-%d")
+    if isinstance(log.get("created_at"), datetime):
+        normalized["created_at"] = log["created_at"].isoformat()
+    return normalized
+
+
+def needs_normalizing(log: dict) -> bool:
+    return (
+        not log.get("id")
+        or isinstance(log.get("date"), datetime)
+        or isinstance(log.get("created_at"), datetime)
+    )
+
+
+def with_log_ids(categories: List[dict]) -> List[dict]:
+    """Categories with an id on every task's daily logs."""
+    return [
+        {
+            **category,
+            "tasks": [
+                {
+                    **task,
+                    "daily_logs": [
+                        normalize_log(log) for log in task.get("daily_logs") or []
+                    ],
+                }
+                for task in category["tasks"]
+            ],
+        }
+        for category in categories
+    ]
+
+
+def log_match(log_id: str, prefix: str = "") -> dict:
+    """Condition on a daily log (or `prefix`-ed array filter) for `log_id`."""
+    return {
+        "$or": [
+            {f"{prefix}id": log_id},
+            {f"{prefix}created_at": log_id},
+            {f"{prefix}created_at": None, f"{prefix}date": log_id},
+        ]
+    }
@@ -0,0 +1,75 @@
+# backend/utils/task_schedule.py
+"""
+Precomputed due dates for habit tasks.
+
+task_schedule holds one document per task with the next day it is due:
+
+    {owner_id, task_id, text, frequency, prescription, last_completed,
+     next_due: "YYYY-MM-DD"}
+
+next_due follows from the task's frequency and its streak state (see
+utils/streaks.py), and is rewritten whenever either changes. "What is due
+today" is then a range read on the (owner_id, next_due) index instead of a
+walk over every task's history.
+
+A task never completed has no due date to fall behind on: it is due on each
+of its due days and never overdue. Its stored next_due is only ever earlier
+than that day, so the range read still finds it and get_due re-derives the
+day from today.
+"""
+
+from datetime import date
+from typing import List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from .streaks import next_due, parse_frequency
+
+
+def schedule_update(owner_id: str, task: dict, today: date) -> UpdateOne:
+    """Upsert of one task's schedule entry from its stored streak state."""
+    state = task.get("streak") or {}
+    due = next_due(state, parse_frequency(task.get("frequency")), today)
+    fields = {
+        "text": task.get("text", ""),
+        "frequency": task.get("frequency"),
+        "prescription": bool(task.get("prescription")),
+        "last_completed": state.get("last_completed"),
+        "next_due": due.isoformat(),
+    }
+    return UpdateOne(
+        {"owner_id": owner_id, "task_id": task["id"]}, {"$set": fields}, upsert=True
+    )
+
+
+async def rebuild_schedule(
+    db: AsyncIOMotorDatabase, owner_id: str, categories: List[dict], today: date
+):
+    """Refresh the schedule of every task and drop entries of removed tasks."""
+    tasks = [task for category in categories for task in category.get("tasks", [])]
+    if tasks:
+        await db.task_schedule.bulk_write(
+            [schedule_update(owner_id, task, today) for task in tasks], ordered=False
+        )
+    await db.task_schedule.delete_many(
+        {"owner_id": owner_id, "task_id": {"$nin": [task["id"] for task in tasks]}}
+    )
+
+
+async def get_due(db: AsyncIOMotorDatabase, owner_id: str, today: date) -> List[dict]:
+    """The user's tasks due today or overdue, most overdue first."""
+    cursor = db.task_schedule.find(
+        {"owner_id": owner_id, "next_due": {"$lte": today.isoformat()}},
+        projection={"_id": 0, "owner_id": 0},
+    ).sort("next_due", 1)
+    due = []
+    async for entry in cursor:
+        if not entry.get("last_completed"):
+            # Never done: due today only if today is one of its due days
+            schedule = parse_frequency(entry.get("frequency"))
+            if next_due(None, schedule, today) != today:
+                continue
+            entry["next_due"] = today.isoformat()
+        due.append({**entry, "overdue": entry["next_due"] < today.isoformat()})
+    # Most overdue first, with never-done tasks moved to today
+    due.sort(key=lambda entry: entry["next_due"])
+    return due
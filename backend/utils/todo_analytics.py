@@ -0,0 +1,186 @@
+# backend/utils/todo_analytics.py
+"""
+Kanban flow metrics computed from the todo timestamps.
+
+- Lead time: createdAt -> completedAt
+- Cycle time: inProgressAt -> completedAt (todos that skipped "In Progress"
+  have no cycle time)
+- WIP: todos currently "In Progress"
+- Throughput: todos completed per week (weeks start on Monday, UTC)
+
+Everything comes from one aggregation: a $match served by the
+(userId, completedAt) and (userId, status, _id) indexes, then a $facet per
+metric. Results are cached per worker against the user's todos version, so
+they are recomputed only after a todo write.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.versioning import VersionedCache
+
+PERCENTILES = [0.5, 0.85, 0.95]
+CACHE_MAX_ENTRIES = 512
+
+
+def week_start(moment: datetime) -> datetime:
+    """Monday 00:00 of the moment's week, matching $dateTrunc."""
+    day = datetime(moment.year, moment.month, moment.day)
+    return day - timedelta(days=day.weekday())
+
+
+def _hours_between(start: str, end: str) -> dict:
+    # $dateDiff is null when either date is missing, which the accumulators skip
+    return {
+        "$divide": [
+            {"$dateDiff": {"startDate": start, "endDate": end, "unit": "minute"}},
+            60,
+        ]
+    }
+
+
+def _duration_accumulators(field: str, prefix: str) -> dict:
+    return {
+        f"{prefix}_count": {"$sum": {"$cond": [{"$ne": [field, None]}, 1, 0]}},
+        f"{prefix}_averageHours": {"$avg": field},
+        f"{prefix}_percentiles": {
+            "$percentile": {"input": field, "p": PERCENTILES, "method": "approximate"}
+        },
+    }
+
+
+def analytics_pipeline(user_id: str, start: datetime, end: datetime) -> list:
+    completed_in_window = {"completedAt": {"$gte": start, "$lt": end}}
+    return [
+        {
+            "$match": {
+                "userId": user_id,
+                "$or": [completed_in_window, {"status": "In Progress"}],
+            }
+        },
+        {
+            "$facet": {
+                "durations": [
+                    {"$match": completed_in_window},
+                    {
+                        "$project": {
+                            "leadHours": _hours_between("$createdAt", "$completedAt"),
+                            "cycleHours": _hours_between(
+                                "$inProgressAt", "$completedAt"
+                            ),
+                        }
+                    },
+                    {
+                        "$group": {
+                            "_id": None,
+                            "completed": {"$sum": 1},
+                            **_duration_accumulators("$leadHours", "lead"),
+                            **_duration_accumulators("$cycleHours", "cycle"),
+                        }
+                    },
+                ],
+                "throughput": [
+                    {"$match": completed_in_window},
+                    {
+                        "$group": {
+                            "_id": {
+                                "$dateTrunc": {
+                                    "date": "$completedAt",
+                                    "unit": "week",
+                                    "startOfWeek": "monday",
+                                }
+                            },
+                            "completed": {"$sum": 1},
+                        }
+                    },
+                    # Weeks without completions count as zero throughput
+                    {
+                        "$densify": {
+                            "field": "_id",
+                            "range": {
+                                "step": 1,
+                                "unit": "week",
+                                "bounds": [week_start(start), end],
+                            },
+                        }
+                    },
+                    {"$fill": {"output": {"completed": {"value": 0}}}},
+                    {"$sort": {"_id": 1}},
+                    {
+                        "$group": {
+                            "_id": None,
+                            "weeks": {
+                                "$push": {
+                                    "weekStart": "$_id",
+                                    "completed": "$completed",
+                                }
+                            },
+                            "percentiles": {
+                                "$percentile": {
+                                    "input": "$completed",
+                                    "p": PERCENTILES,
+                                    "method": "approximate",
+                                }
+                            },
+                        }
+                    },
+                ],
+                "wip": [
+                    {"$match": {"status": "In Progress"}},
+                    {"$count": "count"},
+                ],
+            }
+        },
+    ]
+
+
+def _percentile_fields(values: Optional[list]) -> dict:
+    values = values or [None] * len(PERCENTILES)
+    return {"p50": values[0], "p85": values[1], "p95": values[2]}
+
+
+def _durations(group: dict, prefix: str) -> dict:
+    return {
+        "count": group.get(f"{prefix}_count", 0),
+        "averageHours": group.get(f"{prefix}_averageHours"),
+        **_percentile_fields(group.get(f"{prefix}_percentiles")),
+    }
+
+
+async def compute_todo_analytics(
+    db: AsyncIOMotorDatabase, user_id: str, start: datetime, end: datetime
+) -> dict:
+    result = await db.todos.aggregate(analytics_pipeline(user_id, start, end)).to_list(
+        length=1
+    )
+    facets = result[0]
+    durations = facets["durations"][0] if facets["durations"] else {}
+    throughput = facets["throughput"][0] if facets["throughput"] else {}
+    wip = facets["wip"][0]["count"] if facets["wip"] else 0
+
+    weeks = throughput.get("weeks")
+    throughput_percentiles = throughput.get("percentiles")
+    if weeks is None:
+        # Nothing completed in the window: every week is a zero week
+        weeks = []
+        week = week_start(start)
+        while week < end:
+            weeks.append({"weekStart": week, "completed": 0})
+            week += timedelta(weeks=1)
+        throughput_percentiles = [0] * len(PERCENTILES)
+
+    return {
+        "start": start,
+        "end": end,
+        "completed": durations.get("completed", 0),
+        "wip": wip,
+        "leadTime": _durations(durations, "lead"),
+        "cycleTime": _durations(durations, "cycle"),
+        "throughput": {
+            **_percentile_fields(throughput_percentiles),
+            "weeks": weeks,
+        },
+    }
+
+
+analytics_cache = VersionedCache(max_entries=CACHE_MAX_ENTRIES)
@@ -0,0 +1,115 @@
+# backend/utils/todo_logs.py
+"""
+Todo activity logs, stored with the bucket pattern.
+
+Logs live in todo_log_buckets rather than in an array on the todo, so the todo
+document keeps a fixed size however many logs it collects. Each bucket holds up
+to LOG_BUCKET_SIZE logs of one todo in the order they were added:
+
+    {todoId, userId, seq, firstLogId, count, logs: [{_id, timestamp, notes}, ...]}
+
+`count` is the number of slots used and is never decremented, so only the
+newest bucket is ever open for appends and buckets stay in log order. `seq`
+numbers a todo's buckets and is unique per todo, so two concurrent appends
+that both find the open bucket full cannot each start a new one. The todo
+itself only carries `logCount`.
+"""
+
+from typing import List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+LOG_BUCKET_SIZE = 50
+# Logs attached to single-todo responses; older ones are paged via /logs
+RECENT_LOGS = 20
+
+
+async def append_log(
+    db: AsyncIOMotorDatabase, todo_id: ObjectId, user_id: str, log_doc: dict
+):
+    """Add a log to the todo's open bucket, starting a new one when it is full."""
+    while True:
+        result = await db.todo_log_buckets.update_one(
+            {"todoId": todo_id, "count": {"$lt": LOG_BUCKET_SIZE}},
+            {"$push": {"logs": log_doc}, "$inc": {"count": 1}},
+        )
+        if result.matched_count:
+            return
+        newest = await db.todo_log_buckets.find_one(
+            {"todoId": todo_id, "seq": {"$exists": True}},
+            projection={"seq": 1},
+            sort=[("seq", -1)],
+        )
+        try:
+            await db.todo_log_buckets.insert_one(
+                {
+                    "todoId": todo_id,
+                    "userId": user_id,
+                    "seq": newest["seq"] + 1 if newest else 0,
+                    "firstLogId": log_doc["_id"],
+                    "count": 1,
+                    "logs": [log_doc],
+                }
+            )
+            return
+        except DuplicateKeyError:
+            # Another append started that bucket first: append to it instead
+            continue
+
+
+async def get_logs(
+    db: AsyncIOMotorDatabase,
+    todo_id: ObjectId,
+    limit: int = RECENT_LOGS,
+    before: Optional[ObjectId] = None,
+) -> List[dict]:
+    """
+    The todo's logs, newest first. Only the buckets covering the requested
+    page are read, so the cost depends on `limit`, not on the total count.
+    """
+    query = {"todoId": todo_id}
+    if before is not None:
+        query["firstLogId"] = {"$lt": before}
+
+    logs = []
+    async for bucket in db.todo_log_buckets.find(query).sort("firstLogId", -1):
+        for log in reversed(bucket["logs"]):
+            if before is not None and log["_id"] >= before:
+                continue
+            logs.append(log)
+            if len(logs) >= limit:
+                return logs
+    return logs
+
+
+async def update_log(
+    db: AsyncIOMotorDatabase, todo_id: ObjectId, log_id: ObjectId, fields: dict
+) -> bool:
+    """Set fields on one log; returns False if the log does not exist."""
+    result = await db.todo_log_buckets.update_one(
+        {"todoId": todo_id, "logs._id": log_id},
+        {"$set": {f"logs.$.{name}": value for name, value in fields.items()}},
+    )
+    return result.matched_count > 0
+
+
+async def delete_log(
+    db: AsyncIOMotorDatabase, todo_id: ObjectId, log_id: ObjectId
+) -> bool:
+    """Remove one log; returns False if the log does not exist."""
+    result = await db.todo_log_buckets.update_one(
+        {"todoId": todo_id, "logs._id": log_id},
+        {"$pull": {"logs": {"_id": log_id}}},
+    )
+    if result.modified_count == 0:
+        return False
+    # Full buckets that lost all their logs will never be appended to again
+    await db.todo_log_buckets.delete_many(
+        {"todoId": todo_id, "count": {"$gte": LOG_BUCKET_SIZE}, "logs": {"$size": 0}}
+    )
+    return True
+
+
+async def delete_todo_logs(db: AsyncIOMotorDatabase, todo_id: ObjectId):
+    await db.todo_log_buckets.delete_many({"todoId": todo_id})
@@ -0,0 +1,442 @@
+# backend/utils/trip_totals.py
+"""
+Trip aggregates kept up to date with atomic $inc.
+
+Every trip write adjusts the stored aggregates with one update of the trip
+document, so they never need a read-modify-write:
+
+    totals: {spent, contributed, transaction_count,
+             by_category: {<category>: spent},
+             by_type: {<transaction type>: {amount, count}}}
+    participants.$.total_contributed   initial + contributions + out-of-pocket
+    participants.$.paid_for_group      out-of-pocket expenses paid for the group
+
+`spent` counts leader and out-of-pocket expenses; `contributed` counts initial
+and additional contributions. What each member owes is spent split equally
+(see utils/settlement.py).
+
+Transactions themselves live in trip_transactions (see
+utils/trip_transactions.py). The verifier recomputes all of this in one
+aggregation, joining each trip's transactions, and only returns the trips whose
+stored values disagree, which it then repairs. It runs in the background and on
+demand for one trip. It also repairs a transaction written without its $inc,
+should a request fail between the two writes.
+
+Routes touch the trip's updated_at before writing to trip_transactions, and
+the verifier skips trips updated in the last VERIFY_GRACE_SECONDS, so it never
+sees a transaction whose $inc is still in flight. Each repair is also a
+compare-and-set on the updated_at and aggregates it read: a write landing
+between the aggregation and the repair makes the repair a no-op.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+from .versioning import version_bump_op
+
+TRANSACTION_TYPES = [
+    "leader_expense",
+    "participant_contribution",
+    "participant_outofpocket",
+]
+EXPENSE_TYPES = ["leader_expense", "participant_outofpocket"]
+CONTRIBUTION_TYPES = ["participant_contribution", "participant_outofpocket"]
+VERIFY_BATCH_SIZE = 500
+VERIFY_INTERVAL_SECONDS = int(os.getenv("TRIP_VERIFY_INTERVAL_SECONDS", "86400"))
+VERIFY_GRACE_SECONDS = int(os.getenv("TRIP_VERIFY_GRACE_SECONDS", "300"))
+
+
+def category_key(category: Optional[str]) -> str:
+    # Dots would nest the field in update paths
+    return (category or "other").replace(".", "_")
+
+
+def empty_totals() -> dict:
+    return {
+        "spent": 0.0,
+        "contributed": 0.0,
+        "transaction_count": 0,
+        "by_category": {},
+        "by_type": {},
+    }
+
+
+def transaction_inc(transaction: dict, sign: int = 1) -> Tuple[dict, list]:
+    """($inc, array_filters) applying (sign=1) or reverting (-1) a transaction."""
+    amount = sign * transaction.get("amount", 0)
+    inc = {"totals.transaction_count": sign}
+    if transaction.get("type") in TRANSACTION_TYPES:
+        inc[f"totals.by_type.{transaction['type']}.amount"] = amount
+        inc[f"totals.by_type.{transaction['type']}.count"] = sign
+    if transaction.get("type") in EXPENSE_TYPES:
+        inc["totals.spent"] = amount
+        inc[f"totals.by_category.{category_key(transaction.get('category'))}"] = amount
+    if transaction.get("type") == "participant_contribution":
+        inc["totals.contributed"] = amount
+
+    array_filters = []
+    participant_id = transaction.get("participant_id")
+    if transaction.get("type") in CONTRIBUTION_TYPES and participant_id:
+        inc["participants.$[contributor].total_contributed"] = amount
+        if transaction["type"] == "participant_outofpocket":
+            inc["participants.$[contributor].paid_for_group"] = amount
+        array_filters.append({"contributor.id": participant_id})
+    return inc, array_filters
+
+
+# --- Verifier ----------------------------------------------------------------
+
+
+def _transactions(types: List[str], extra: Optional[dict] = None) -> dict:
+    cond = {"$in": ["$$t.type", types]}
+    if extra:
+        cond = {"$and": [cond, extra]}
+    return {
+        "$filter": {
+            "input": {"$ifNull": ["$transactions", []]},
+            "as": "t",
+            "cond": cond,
+        }
+    }
+
+
+def _amounts(transactions: dict) -> dict:
+    return {"$sum": {"$map": {"input": transactions, "as": "t", "in": "$$t.amount"}}}
+
+
+def _cents(value) -> dict:
+    return {"$round": [{"$ifNull": [value, 0]}, 2]}
+
+
+def _differs(stored, expected) -> dict:
+    return {"$ne": [_cents(stored), _cents(expected)]}
+
+
+def _category_key_expr(field: str) -> dict:
+    return {
+        "$replaceAll": {
+            "input": {"$ifNull": [field, "other"]},
+            "find": ".",
+            "replacement": "_",
+        }
+    }
+
+
+def _rounded_pairs(obj) -> dict:
+    return {
+        "$map": {
+            "input": {"$objectToArray": obj},
+            "as": "pair",
+            "in": {"k": "$$pair.k", "v": _cents("$$pair.v")},
+        }
+    }
+
+
+def _type_differs(transaction_type: str) -> dict:
+    stored = f"$totals.by_type.{transaction_type}"
+    expected = f"$expected.by_type.{transaction_type}"
+    return {
+        "$or": [
+            _differs(f"{stored}.amount", f"{expected}.amount"),
+            {"$ne": [{"$ifNull": [f"{stored}.count", 0]}, f"{expected}.count"]},
+        ]
+    }
+
+
+def verify_pipeline(match: dict, embedded: bool = False) -> list:
+    """
+    The verifier aggregation. With `embedded`, transactions are read from the
+    trips' own `transactions` arrays, as stored before migration 010.
+    """
+    expenses = _transactions(EXPENSE_TYPES)
+    join = [
+        {
+            "$lookup": {
+                "from": "trip_transactions",
+                "localField": "_id",
+                "foreignField": "trip_id",
+                "pipeline": [
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "type": 1,
+                            "amount": 1,
+                            "category": 1,
+                            "participant_id": 1,
+                        }
+                    }
+                ],
+                "as": "transactions",
+            }
+        },
+    ]
+    return [
+        {"$match": match},
+        *([] if embedded else join),
+        {
+            "$project": {
+                "user_id": 1,
+                "updated_at": 1,
+                "totals": {"$ifNull": ["$totals", {}]},
+                "expected": {
+                    "spent": _amounts(expenses),
+                    "contributed": {
+                        "$add": [
+                            {
+                                "$sum": {
+                                    "$map": {
+                                        "input": {"$ifNull": ["$participants", []]},
+                                        "as": "p",
+                                        "in": "$$p.initial_contribution",
+                                    }
+                                }
+                            },
+                            _amounts(_transactions(["participant_contribution"])),
+                        ]
+                    },
+                    "transaction_count": {"$size": {"$ifNull": ["$transactions", []]}},
+                    "by_type": {
+                        transaction_type: {
+                            "amount": _amounts(_transactions([transaction_type])),
+                            "count": {"$size": _transactions([transaction_type])},
+                        }
+                        for transaction_type in TRANSACTION_TYPES
+                    },
+                    "by_category": {
+                        "$arrayToObject": {
+                            "$map": {
+                                "input": {
+                                    "$setUnion": [
+                                        {
+                                            "$map": {
+                                                "input": expenses,
+                                                "as": "t",
+                                                "in": _category_key_expr(
+                                                    "$$t.category"
+                                                ),
+                                            }
+                                        }
+                                    ]
+                                },
+                                "as": "key",
+                                "in": {
+                                    "k": "$$key",
+                                    "v": _amounts(
+                                        _transactions(
+                                            EXPENSE_TYPES,
+                                            {
+                                                "$eq": [
+                                                    _category_key_expr("$$t.category"),
+                                                    "$$key",
+                                                ]
+                                            },
+                                        )
+                                    ),
+                                },
+                            }
+                        }
+                    },
+                },
+                "participants": {
+                    "$map": {
+                        "input": {"$ifNull": ["$participants", []]},
+                        "as": "p",
+                        "in": {
+                            "id": "$$p.id",
+                            "name": "$$p.name",
+                            "total_contributed": "$$p.total_contributed",
+                            "paid_for_group": "$$p.paid_for_group",
+                            "expected_contributed": {
+                                "$add": [
+                                    {"$ifNull": ["$$p.initial_contribution", 0]},
+                                    _amounts(
+                                        _transactions(
+                                            CONTRIBUTION_TYPES,
+                                            {"$eq": ["$$t.participant_id", "$$p.id"]},
+                                        )
+                                    ),
+                                ]
+                            },
+                            "expected_paid": _amounts(
+                                _transactions(
+                                    ["participant_outofpocket"],
+                                    {"$eq": ["$$t.participant_id", "$$p.id"]},
+                                )
+                            ),
+                        },
+                    }
+                },
+            }
+        },
+        # Only trips whose stored aggregates are off by a cent or more
+        {
+            "$match": {
+                "$expr": {
+                    "$or": [
+                        _differs("$totals.spent", "$expected.spent"),
+                        _differs("$totals.contributed", "$expected.contributed"),
+                        {
+                            "$ne": [
+                                {"$ifNull": ["$totals.transaction_count", 0]},
+                                "$expected.transaction_count",
+                            ]
+                        },
+                        *(
+                            _type_differs(transaction_type)
+                            for transaction_type in TRANSACTION_TYPES
+                        ),
+                        {
+                            "$not": [
+                                {
+                                    "$setEquals": [
+                                        _rounded_pairs(
+                                            {"$ifNull": ["$totals.by_category", {}]}
+                                        ),
+                                        _rounded_pairs("$expected.by_category"),
+                                    ]
+                                }
+                            ]
+                        },
+                        {
+                            "$anyElementTrue": {
+                                "$map": {
+                                    "input": "$participants",
+                                    "as": "p",
+                                    "in": {
+                                        "$or": [
+                                            _differs(
+                                                "$$p.total_contributed",
+                                                "$$p.expected_contributed",
+                                            ),
+                                            _differs(
+                                                "$$p.paid_for_group",
+                                                "$$p.expected_paid",
+                                            ),
+                                        ]
+                                    },
+                                }
+                            }
+                        },
+                    ]
+                }
+            }
+        },
+    ]
+
+
+def _repair(trip: dict, now: datetime) -> Tuple[dict, dict, list, List[dict]]:
+    """(filter, update, array_filters, corrections) repairing one trip."""
+    expected = trip["expected"]
+    stored = trip["totals"]
+    # Compare-and-set: only applies if nothing was written since the read
+    query = {
+        "_id": trip["_id"],
+        "updated_at": trip.get("updated_at"),
+        "totals.spent": stored.get("spent"),
+        "totals.contributed": stored.get("contributed"),
+        "totals.transaction_count": stored.get("transaction_count"),
+    }
+    updates = {"totals": expected, "updated_at": now}
+    array_filters = []
+    corrections = []
+    read_participants = []
+    for index, participant in enumerate(trip["participants"]):
+        current_total = participant.get("total_contributed") or 0
+        correct_total = participant["expected_contributed"]
+        if round(current_total, 2) != round(correct_total, 2):
+            corrections.append(
+                {
+                    "participant_id": participant["id"],
+                    "name": participant.get("name"),
+                    "current_total": current_total,
+                    "correct_total": correct_total,
+                    "difference": correct_total - current_total,
+                }
+            )
+        read_participants.append(
+            {
+                "$elemMatch": {
+                    "id": participant["id"],
+                    "total_contributed": participant.get("total_contributed"),
+                    "paid_for_group": participant.get("paid_for_group"),
+                }
+            }
+        )
+        updates[f"participants.$[p{index}].total_contributed"] = correct_total
+        updates[f"participants.$[p{index}].paid_for_group"] = participant[
+            "expected_paid"
+        ]
+        array_filters.append({f"p{index}.id": participant["id"]})
+    if read_participants:
+        query["participants"] = {"$all": read_participants}
+    return query, {"$set": updates}, array_filters or None, corrections
+
+
+async def verify_trip_totals(
+    db: AsyncIOMotorDatabase,
+    match: Optional[dict] = None,
+    embedded: bool = False,
+    grace_seconds: int = VERIFY_GRACE_SECONDS,
+) -> List[dict]:
+    """
+    Recompute the aggregates of the matching trips (all by default) and repair
+    those that drifted. Trips written in the last `grace_seconds` are left for
+    the next run. Returns one entry per repaired trip. `embedded` reads the
+    transactions from the trip documents (see verify_pipeline).
+    """
+    now = datetime.now()
+    match = dict(match or {})
+    if grace_seconds:
+        match["updated_at"] = {"$lt": now - timedelta(seconds=grace_seconds)}
+    repaired = []
+    batch = []
+
+    async def flush():
+        # One conditional update per trip: a bulk write would not say which
+        # repairs lost the race against a live write (matched nothing)
+        results = await asyncio.gather(
+            *(
+                db.trips.update_one(query, update, array_filters=array_filters)
+                for (query, update, array_filters, _), _trip in batch
+            )
+        )
+        touched_users = set()
+        for ((*_, corrections), trip), result in zip(batch, results):
+            if not result.matched_count:
+                continue
+            touched_users.add(trip["user_id"])
+            repaired.append(
+                {
+                    "trip_id": str(trip["_id"]),
+                    "totals": {"stored": trip["totals"], "correct": trip["expected"]},
+                    "corrections": corrections,
+                }
+            )
+        if touched_users:
+            await db.collection_versions.bulk_write(
+                [version_bump_op(user_id, "trips") for user_id in touched_users],
+                ordered=False,
+            )
+        batch.clear()
+
+    async for trip in db.trips.aggregate(verify_pipeline(match, embedded)):
+        batch.append((_repair(trip, now), trip))
+        if len(batch) >= VERIFY_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+    return repaired
+
+
+async def trip_totals_loop(db: AsyncIOMotorDatabase):
+    """Background task started by the app lifespan."""
+    while True:
+        try:
+            repaired = await verify_trip_totals(db)
+            print(f"Trip totals verifier repaired {len(repaired)} trips.")
+        except PyMongoError as e:
+            print(f"Trip totals verifier failed: {e}")
+        await asyncio.sleep(VERIFY_INTERVAL_SECONDS)
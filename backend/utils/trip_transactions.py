@@ -0,0 +1,92 @@
+# backend/utils/trip_transactions.py
+"""
+Trip expenses and contributions, one document per transaction.
+
+Transactions live in trip_transactions rather than in an array on the trip, so
+the trip document stays small however long the trip runs, and adding or
+deleting a transaction writes one small document plus an $inc of the trip's
+stored totals (see utils/trip_totals.py):
+
+    {_id, trip_id, user_id, type, amount, description, category, date,
+     added_by, paid_by, participant_id}
+
+Listing is keyset-paginated newest first over the (trip_id, date, _id) index.
+"""
+
+from typing import List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Transactions attached to single-trip responses; older ones are paged
+RECENT_TRANSACTIONS = 20
+MAX_PAGE_SIZE = 100
+
+
+def transaction_doc(trip_id: ObjectId, user_id: str, transaction: dict) -> dict:
+    """A transaction as stored, from its served (or formerly embedded) shape."""
+    transaction_id = transaction.get("id") or transaction.get("_id")
+    fields = {
+        key: value for key, value in transaction.items() if key not in ("id", "_id")
+    }
+    return {
+        **fields,
+        "_id": (
+            ObjectId(transaction_id)
+            if ObjectId.is_valid(transaction_id)
+            else ObjectId()
+        ),
+        "trip_id": trip_id,
+        "user_id": user_id,
+    }
+
+
+def transaction_from_db(doc: dict) -> dict:
+    """A stored transaction in the shape the API serves."""
+    served = {
+        key: value
+        for key, value in doc.items()
+        if key not in ("_id", "trip_id", "user_id")
+    }
+    served["id"] = str(doc["_id"])
+    return served
+
+
+async def get_transactions(
+    db: AsyncIOMotorDatabase,
+    trip_id: ObjectId,
+    limit: int = RECENT_TRANSACTIONS,
+    before: Optional[dict] = None,
+    projection: Optional[dict] = None,
+) -> List[dict]:
+    """
+    The trip's transactions, newest first. `before` is the last transaction of
+    the previous page (its _id and date); `limit=0` returns all of them.
+    """
+    query = {"trip_id": trip_id}
+    if before is not None:
+        query["$or"] = [
+            {"date": {"$lt": before["date"]}},
+            {"date": before["date"], "_id": {"$lt": before["_id"]}},
+        ]
+    cursor = (
+        db.trip_transactions.find(query, projection=projection)
+        .sort([("date", -1), ("_id", -1)])
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit or None)
+
+
+async def page_start(
+    db: AsyncIOMotorDatabase, trip_id: ObjectId, transaction_id: str
+) -> Optional[dict]:
+    """The keyset position of a `before` cursor, or None if it is unknown."""
+    if not ObjectId.is_valid(transaction_id):
+        return None
+    return await db.trip_transactions.find_one(
+        {"_id": ObjectId(transaction_id), "trip_id": trip_id},
+        projection={"date": 1},
+    )
+
+
+async def delete_trip_transactions(db: AsyncIOMotorDatabase, trip_id: ObjectId):
+    await db.trip_transactions.delete_many({"trip_id": trip_id})
@@ -0,0 +1,118 @@
+# backend/utils/versioning.py
+"""
+Per-user, per-collection version counters for conditional GETs.
+
+Every write in the routers bumps the counter of each collection it touched
+(one small upsert on collection_versions). List endpoints derive their ETag
+from those counters alone, so a matching If-None-Match is answered with a 304
+after a single point read, before the list query runs or the body is built.
+
+The random "generation" is set when a user's counter document is first created,
+so ETags never repeat if the counters are ever reset and never collide
+between users.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+from bson import ObjectId
+from fastapi import Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+# Browsers may store list responses but must revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def version_bump_op(user_id: str, *collections: str) -> UpdateOne:
+    """The bump as a bulk_write operation, for jobs that touch many users."""
+    return UpdateOne(
+        {"_id": user_id},
+        {
+            "$inc": {collection: 1 for collection in collections},
+            "$setOnInsert": {"generation": str(ObjectId())},
+        },
+        upsert=True,
+    )
+
+
+async def bump_versions(db: AsyncIOMotorDatabase, user_id: str, *collections: str):
+    """Record that the user's data in the given collections changed."""
+    await db.collection_versions.bulk_write([version_bump_op(user_id, *collections)])
+
+
+async def get_etag(
+    db: AsyncIOMotorDatabase, user_id: str, *collections: str, variant: str = ""
+) -> str:
+    """
+    Weak ETag covering the current state of the given collections. `variant`
+    tells apart responses the URL alone does not determine, such as a window
+    defaulting to today.
+    """
+    versions = await db.collection_versions.find_one({"_id": user_id}) or {}
+    generation = versions.get("generation", "0")
+    counters = "-".join(str(versions.get(collection, 0)) for collection in collections)
+    if variant:
+        counters = f"{counters}-{variant}"
+    return f'W/"{generation}-{counters}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of the request's If-None-Match against an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare_etag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == bare_etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    *collections: str,
+    variant: str = "",
+) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current. Otherwise attach the
+    ETag to the outgoing response and return None so the endpoint carries on.
+    """
+    etag = await get_etag(db, user_id, *collections, variant=variant)
+    if etag_matches(request, etag):
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return None
+
+
+class VersionedCache:
+    """
+    Small per-worker LRU for derived results, each stored with the ETag it was
+    computed under. A lookup with a different ETag misses, so entries expire
+    with the next write to the collections the ETag covers.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self._entries: "OrderedDict[Hashable, Tuple[str, Any]]" = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, key: Hashable, etag: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Hashable, etag: str, value: Any):
+        self._entries[key] = (etag, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
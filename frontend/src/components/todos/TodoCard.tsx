@@ -1,5 +1,5 @@
 import React from "react";
-import { useDraggable } from "@dnd-kit/core";
+import { useDraggable, useDroppable } from "@dnd-kit/core";
 import { CSS } from "@dnd-kit/utilities";
 import {
   DotsSixVertical,
@@ -30,6 +30,8 @@ export const TodoCard: React.FC<TodoCardProps> = ({
     useDraggable({
       id: todo.id,
     });
+  // Cards are drop targets too, so a card can be dropped in front of another
+  const { setNodeRef: setDropRef } = useDroppable({ id: todo.id });
 
   const style = {
     transform: CSS.Translate.toString(transform),
@@ -39,7 +41,10 @@ export const TodoCard: React.FC<TodoCardProps> = ({
 
   return (
     <div
-      ref={setNodeRef}
+      ref={(node) => {
+        setNodeRef(node);
+        setDropRef(node);
+      }}
       style={style}
       className="bg-gray-900 p-4 rounded-lg shadow-md border border-gray-700 group cursor-pointer hover:border-gray-600 transition-colors"
       onClick={() => onViewDetails(todo)}
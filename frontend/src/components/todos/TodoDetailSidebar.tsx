@@ -11,12 +11,18 @@ import {
 import { format } from "date-fns";
 import toast from "react-hot-toast";
 
-import type { TodoItem, TodoStatus, CreateTodoLogData } from "../../types";
+import type {
+  TodoItem,
+  TodoLog,
+  TodoStatus,
+  CreateTodoLogData,
+} from "../../types";
 import { getTodoStatusMessage, getTimeAgo } from "../../utils/date";
 import {
   updateTodoLog,
   deleteTodoLog,
   updateTodo,
+  getTodoLogs,
 } from "../../services/todoService";
 
 interface TodoDetailSidebarProps {
@@ -52,6 +58,13 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
   const [logNotes, setLogNotes] = useState("");
   const [editingLogId, setEditingLogId] = useState<string | null>(null);
   const [editingLogNotes, setEditingLogNotes] = useState("");
+  // Logs older than the recent ones the todo arrives with
+  const [olderLogs, setOlderLogs] = useState<TodoLog[]>([]);
+  const [isLoadingLogs, setIsLoadingLogs] = useState(false);
+
+  useEffect(() => {
+    setOlderLogs([]);
+  }, [todo?.id]);
 
   useEffect(() => {
     if (todo) {
@@ -73,6 +86,27 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
     return null;
   }
 
+  const recentLogIds = new Set(todo.logs.map((log) => log.id));
+  const logs = [
+    ...todo.logs,
+    ...olderLogs.filter((log) => !recentLogIds.has(log.id)),
+  ];
+  const logCount = Math.max(todo.logCount ?? 0, logs.length);
+
+  const handleLoadOlderLogs = async () => {
+    const oldest = logs.reduce((a, b) => (a.id < b.id ? a : b));
+    setIsLoadingLogs(true);
+    try {
+      const page = await getTodoLogs(todo.id, oldest.id);
+      setOlderLogs((prev) => [...prev, ...page]);
+    } catch (error) {
+      console.error("Failed to load logs:", error);
+      toast.error("Failed to load older logs");
+    } finally {
+      setIsLoadingLogs(false);
+    }
+  };
+
   const handleSaveEdit = async () => {
     try {
       const updateData: Partial<TodoItem> = {
@@ -129,6 +163,7 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
 
     try {
       const updatedTodo = await deleteTodoLog(todo.id, logId);
+      setOlderLogs((prev) => prev.filter((log) => log.id !== logId));
       onUpdate(updatedTodo);
       toast.success("Log deleted successfully!");
     } catch (error) {
@@ -152,6 +187,17 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
       const updatedTodo = await updateTodoLog(todo.id, logId, {
         notes: editingLogNotes,
       });
+      setOlderLogs((prev) =>
+        prev.map((log) =>
+          log.id === logId
+            ? {
+                ...log,
+                notes: editingLogNotes,
+                timestamp: new Date().toISOString(),
+              }
+            : log
+        )
+      );
       onUpdate(updatedTodo);
       setEditingLogId(null);
       setEditingLogNotes("");
@@ -312,7 +358,7 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
         <div className="flex items-center justify-between">
           <h3 className="text-lg font-medium text-gray-700 flex items-center gap-2">
             <ChatCircle size={20} />
-            Activity Logs ({todo.logs.length})
+            Activity Logs ({logCount})
           </h3>
           <button
             onClick={() => setIsAddingLog(true)}
@@ -356,12 +402,12 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
 
         {/* Logs List */}
         <div className="space-y-3">
-          {todo.logs.length === 0 ? (
+          {logs.length === 0 ? (
             <p className="text-gray-500 italic bg-gray-50 p-4 rounded-lg text-center">
               No activity logs yet. Add the first log to track progress!
             </p>
           ) : (
-            todo.logs
+            logs
               .slice()
               .sort(
                 (a, b) =>
@@ -434,6 +480,17 @@ export const TodoDetailSidebar: React.FC<TodoDetailSidebarProps> = ({
                 </div>
               ))
           )}
+          {logs.length < logCount && (
+            <button
+              onClick={handleLoadOlderLogs}
+              disabled={isLoadingLogs}
+              className="w-full text-sm text-blue-600 hover:text-blue-700 p-2 rounded-lg hover:bg-gray-100 disabled:opacity-50"
+            >
+              {isLoadingLogs
+                ? "Loading..."
+                : `Show older logs (${logCount - logs.length} more)`}
+            </button>
+          )}
         </div>
       </div>
 
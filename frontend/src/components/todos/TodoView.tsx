@@ -13,8 +13,10 @@ import {
   getTodos,
   createTodo,
   updateTodo,
+  bulkUpdateTodos,
   deleteTodo,
   addTodoLog,
+  getTodoById,
 } from "../../services/todoService";
 import type {
   TodoItem,
@@ -22,6 +24,7 @@ import type {
   CreateTodoData,
   UpdateTodoData,
   CreateTodoLogData,
+  TodoMove,
 } from "../../types";
 
 import { KanbanColumn } from "./KanbanColumn";
@@ -33,6 +36,19 @@ const columns: TodoStatus[] = ["Not Started", "In Progress", "Done"];
 
 type SidebarType = "add" | "edit" | "details" | null;
 
+// A column in board order: cards never reordered (no position) keep the
+// server's newest-first order on top, the rest follow by position
+const boardPosition = (todo: TodoItem) =>
+  todo.position ?? Number.NEGATIVE_INFINITY;
+const columnTodos = (todos: TodoItem[], status: TodoStatus) =>
+  todos
+    .filter((t) => t.status === status)
+    .sort((a, b) =>
+      boardPosition(a) === boardPosition(b)
+        ? 0
+        : boardPosition(a) - boardPosition(b)
+    );
+
 export const TodoView: React.FC = () => {
   const [todos, setTodos] = useState<TodoItem[]>([]);
   const [isLoading, setIsLoading] = useState(true);
@@ -124,46 +140,57 @@ export const TodoView: React.FC = () => {
     if (!over || active.id === over.id) return;
 
     const draggedTodo = todos.find((t) => t.id === active.id);
-    const newStatus = over.id as TodoStatus;
-
-    if (draggedTodo && draggedTodo.status !== newStatus) {
-      const originalTodos = todos;
-      const now = new Date().toISOString();
-
-      // Prepare the update data with timestamps
-      const updateData: UpdateTodoData = { status: newStatus };
-
-      // Add timestamps based on the new status
-      if (newStatus === "In Progress" && !draggedTodo.inProgressAt) {
-        updateData.inProgressAt = now;
-      } else if (newStatus === "Done" && !draggedTodo.completedAt) {
-        updateData.completedAt = now;
-      }
+    if (!draggedTodo) return;
 
-      // Optimistic UI update with timestamps
-      setTodos((prev) =>
-        prev.map((t) =>
-          t.id === active.id
-            ? {
-                ...t,
-                status: newStatus,
-                ...(newStatus === "In Progress" &&
-                  !t.inProgressAt && { inProgressAt: now }),
-                ...(newStatus === "Done" &&
-                  !t.completedAt && { completedAt: now }),
-              }
-            : t
-        )
-      );
+    // Dropped on a card: take its place; dropped on a column: go last
+    const overTodo = todos.find((t) => t.id === over.id);
+    const newStatus = overTodo ? overTodo.status : (over.id as TodoStatus);
+    const column = columnTodos(todos, newStatus).filter(
+      (t) => t.id !== draggedTodo.id
+    );
+    const index = overTodo
+      ? column.findIndex((t) => t.id === overTodo.id)
+      : column.length;
+    column.splice(index, 0, draggedTodo);
+
+    // Renumber the column, sending only the cards that actually changed
+    const changes: TodoMove[] = column.flatMap((todo, position) => {
+      const moved = todo.id === draggedTodo.id && todo.status !== newStatus;
+      if (!moved && todo.position === position) return [];
+      return [{ id: todo.id, position, ...(moved && { status: newStatus }) }];
+    });
+    if (changes.length === 0) return;
+
+    const originalTodos = todos;
+    const now = new Date().toISOString();
+    const changesById = new Map(changes.map((change) => [change.id, change]));
+
+    // Optimistic UI update; the server stamps the same timestamps
+    setTodos((prev) =>
+      prev.map((t) => {
+        const change = changesById.get(t.id);
+        if (!change) return t;
+        return {
+          ...t,
+          position: change.position,
+          ...(change.status && { status: change.status }),
+          ...(change.status === "In Progress" &&
+            !t.inProgressAt && { inProgressAt: now }),
+          ...(change.status === "Done" &&
+            !t.completedAt && { completedAt: now }),
+        };
+      })
+    );
 
-      try {
-        await updateTodo(draggedTodo.id, updateData);
+    try {
+      await bulkUpdateTodos(changes);
+      if (draggedTodo.status !== newStatus) {
         toast.success(`Moved "${draggedTodo.title}" to ${newStatus}`);
-      } catch (err) {
-        console.error("Failed to update todo status:", err);
-        toast.error("Failed to update status. Reverting.");
-        setTodos(originalTodos); // Revert on error
       }
+    } catch (err) {
+      console.error("Failed to move todo:", err);
+      toast.error("Failed to move item. Reverting.");
+      setTodos(originalTodos); // Revert on error
     }
   };
 
@@ -205,8 +232,19 @@ export const TodoView: React.FC = () => {
     }
   };
 
-  const handleViewDetails = (todo: TodoItem) => {
+  // Board listings carry no logs, so load the full item when opening it
+  const openDetails = async (todo: TodoItem) => {
     openSidebar("details", todo);
+    try {
+      setDetailTodo(await getTodoById(todo.id));
+    } catch (err) {
+      console.error("Failed to load todo details:", err);
+      toast.error("Failed to load activity logs");
+    }
+  };
+
+  const handleViewDetails = (todo: TodoItem) => {
+    openDetails(todo);
   };
 
   const handleEditTodo = (todo: TodoItem) => {
@@ -214,7 +252,7 @@ export const TodoView: React.FC = () => {
   };
 
   const handleAddLog = (todo: TodoItem) => {
-    openSidebar("details", todo);
+    openDetails(todo);
   };
 
   // Direct update function for log operations (no API call needed)
@@ -273,7 +311,7 @@ export const TodoView: React.FC = () => {
               <KanbanColumn
                 key={status}
                 status={status}
-                todos={todos.filter((t) => t.status === status)}
+                todos={columnTodos(todos, status)}
                 onEdit={handleEditTodo}
                 onDelete={setDeletingTodo}
                 onLog={handleAddLog}
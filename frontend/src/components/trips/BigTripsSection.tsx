@@ -4,7 +4,7 @@ import { Plus } from "phosphor-react";
 import { CreateTripForm } from "./CreateTripForm";
 import { TripDetails } from "./TripDetails";
 import { tripService } from "../../services/tripService";
-import type { Trip } from "../../types/trip";
+import type { TripSummary } from "../../types/trip";
 
 interface BigTripsSectionProps {
   onTripSelected?: (tripId: string | null) => void;
@@ -13,7 +13,7 @@ interface BigTripsSectionProps {
 export const BigTripsSection = ({ onTripSelected }: BigTripsSectionProps) => {
   const [showCreateForm, setShowCreateForm] = useState(false);
   const [selectedTripId, setSelectedTripId] = useState<string | null>(null);
-  const [trips, setTrips] = useState<Trip[]>([]);
+  const [trips, setTrips] = useState<TripSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -26,7 +26,7 @@ export const BigTripsSection = ({ onTripSelected }: BigTripsSectionProps) => {
     try {
       setLoading(true);
       setError(null);
-      const tripsData = await tripService.getAllTrips();
+      const tripsData = await tripService.getTripSummaries();
       console.log("Loaded trips:", tripsData); // Debug log
       setTrips(tripsData);
     } catch (err) {
@@ -45,7 +45,16 @@ export const BigTripsSection = ({ onTripSelected }: BigTripsSectionProps) => {
   }) => {
     try {
       const newTrip = await tripService.createTrip(tripData);
-      setTrips([...trips, newTrip]);
+      setTrips([
+        ...trips,
+        {
+          ...newTrip,
+          participant_count: 0,
+          transaction_count: 0,
+          total_spent: 0,
+          total_contributed: 0,
+        },
+      ]);
       setShowCreateForm(false);
     } catch (err) {
       console.error("Error creating trip:", err);
@@ -171,7 +180,12 @@ export const BigTripsSection = ({ onTripSelected }: BigTripsSectionProps) => {
                   </p>
                   <p>
                     <span className="font-medium">Participants:</span>{" "}
-                    {trip.participants.length}
+                    {trip.participant_count}
+                  </p>
+                  <p>
+                    <span className="font-medium">Spent:</span>{" "}
+                    {trip.total_spent.toLocaleString()} of{" "}
+                    {trip.total_contributed.toLocaleString()} contributed
                   </p>
                   {trip.start_date && (
                     <p className="text-xs text-gray-500 mt-2">
@@ -182,8 +196,7 @@ export const BigTripsSection = ({ onTripSelected }: BigTripsSectionProps) => {
               </div>
               <button
                 onClick={() => {
-                  const tripId =
-                    trip.id || (trip as Trip & { _id?: string })._id;
+                  const tripId = trip.id;
                   console.log("Selecting trip:", tripId, trip); // Debug log
                   if (tripId) {
                     setSelectedTripId(tripId);
@@ -1,6 +1,6 @@
 // src/components/trips/BudgetOverview.tsx
 import { CurrencyInr, TrendUp, TrendDown, Wallet } from "phosphor-react";
-import type { Trip } from "../../types/trip";
+import type { Trip, Transaction } from "../../types/trip";
 import { useState } from "react";
 
 interface BudgetOverviewProps {
@@ -41,20 +41,18 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
       setIsFixingData(false);
     }
   };
-  // Calculate direct contributions to central budget (initial + additional contributions)
-  const directContributions =
-    trip.participants.reduce(
-      (sum, participant) => sum + participant.initial_contribution,
-      0
-    ) +
-    trip.transactions
-      .filter((transaction) => transaction.type === "participant_contribution")
-      .reduce((sum, transaction) => sum + transaction.amount, 0);
+  // Totals kept by the server; trip.transactions only holds the latest ones
+  const byType = (type: Transaction["type"]) =>
+    trip.totals.by_type[type] ?? { amount: 0, count: 0 };
+  const leaderExpenses = byType("leader_expense");
+  const contributions = byType("participant_contribution");
+  const outOfPocket = byType("participant_outofpocket");
 
-  // Calculate total expenses from central budget (only leader expenses)
-  const centralBudgetExpenses = trip.transactions
-    .filter((transaction) => transaction.type === "leader_expense")
-    .reduce((sum, transaction) => sum + transaction.amount, 0);
+  // Direct contributions to central budget (initial + additional contributions)
+  const directContributions = trip.totals.contributed;
+
+  // Total expenses from central budget (only leader expenses)
+  const centralBudgetExpenses = leaderExpenses.amount;
 
   // Calculate remaining central budget balance
   const remainingBalance = directContributions - centralBudgetExpenses;
@@ -131,15 +129,8 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
             </div>
           </div>
           <p className="text-red-600 text-sm mt-1">
-            {
-              trip.transactions.filter((t) => t.type === "leader_expense")
-                .length
-            }{" "}
-            leader expense
-            {trip.transactions.filter((t) => t.type === "leader_expense")
-              .length !== 1
-              ? "s"
-              : ""}
+            {leaderExpenses.count} leader expense
+            {leaderExpenses.count !== 1 ? "s" : ""}
           </p>
         </div>
 
@@ -262,30 +253,18 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
               <details>
                 <summary>Debug: Transaction Summary</summary>
                 <div className="mt-2 space-y-1">
-                  <div>Total Transactions: {trip.transactions.length}</div>
+                  <div>Total Transactions: {trip.totals.transaction_count}</div>
                   <div>
                     Participant Contributions:{" "}
-                    {
-                      trip.transactions.filter(
-                        (t) => t.type === "participant_contribution"
-                      ).length
-                    }
+                    {contributions.count}
                   </div>
                   <div>
                     Out-of-Pocket Expenses:{" "}
-                    {
-                      trip.transactions.filter(
-                        (t) => t.type === "participant_outofpocket"
-                      ).length
-                    }
+                    {outOfPocket.count}
                   </div>
                   <div>
                     Leader Expenses:{" "}
-                    {
-                      trip.transactions.filter(
-                        (t) => t.type === "leader_expense"
-                      ).length
-                    }
+                    {leaderExpenses.count}
                   </div>
                   <button
                     onClick={handleFixDataConsistency}
@@ -302,8 +281,7 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
       )}
 
       {/* Participant Out-of-Pocket Expenses */}
-      {trip.transactions.filter((t) => t.type === "participant_outofpocket")
-        .length > 0 && (
+      {outOfPocket.count > 0 && (
         <div className="mb-4 p-4 bg-blue-50 rounded-lg border border-blue-200">
           <h4 className="font-medium text-blue-800 mb-2 flex items-center">
             💳 Participant Out-of-Pocket Expenses
@@ -317,26 +295,14 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
               <p className="text-blue-700">Total Out-of-Pocket</p>
               <p className="font-semibold text-blue-900">
                 ₹
-                {trip.transactions
-                  .filter((t) => t.type === "participant_outofpocket")
-                  .reduce((sum, t) => sum + t.amount, 0)
-                  .toLocaleString()}
+                {outOfPocket.amount.toLocaleString()}
               </p>
             </div>
             <div>
               <p className="text-blue-700">Transactions</p>
               <p className="font-semibold text-blue-900">
-                {
-                  trip.transactions.filter(
-                    (t) => t.type === "participant_outofpocket"
-                  ).length
-                }{" "}
-                expense
-                {trip.transactions.filter(
-                  (t) => t.type === "participant_outofpocket"
-                ).length !== 1
-                  ? "s"
-                  : ""}
+                {outOfPocket.count} expense
+                {outOfPocket.count !== 1 ? "s" : ""}
               </p>
             </div>
           </div>
@@ -360,13 +326,8 @@ export const BudgetOverview = ({ trip, onTripUpdate }: BudgetOverviewProps) => {
           <p className="text-gray-500">Avg. Leader Expense</p>
           <p className="font-semibold text-gray-800">
             ₹
-            {trip.transactions.filter((t) => t.type === "leader_expense")
-              .length > 0
-              ? (
-                  centralBudgetExpenses /
-                  trip.transactions.filter((t) => t.type === "leader_expense")
-                    .length
-                ).toLocaleString()
+            {leaderExpenses.count > 0
+              ? (centralBudgetExpenses / leaderExpenses.count).toLocaleString()
               : 0}
           </p>
         </div>
@@ -610,10 +610,10 @@ export const TransactionLogger = ({
                 );
               })}
 
-            {trip.transactions.length > 5 && (
+            {trip.totals.transaction_count > 5 && (
               <div className="text-center pt-2">
                 <button className="text-blue-600 text-sm hover:underline">
-                  View all {trip.transactions.length} transactions
+                  View all {trip.totals.transaction_count} transactions
                 </button>
               </div>
             )}
@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import { CaretLeft, CaretRight, CaretDown } from "phosphor-react";
-import { getMonthlyHistory } from "../services/taskService";
+import { getMonthlyActivity } from "../services/activityService";
+import type { DayActivity } from "../types/activity";
 import type { UserTasks } from "../types";
 
 interface MonthlyViewProps {
@@ -12,6 +13,7 @@ type HistoryData = Record<number, string[]>; // Maps task.id to an array of "YYY
 export const MonthlyView = ({ userTasks }: MonthlyViewProps) => {
   const [currentDate, setCurrentDate] = useState(new Date());
   const [historyData, setHistoryData] = useState<HistoryData>({});
+  const [activityDays, setActivityDays] = useState<DayActivity[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [openCategory, setOpenCategory] = useState<string | null>(null);
 
@@ -21,8 +23,9 @@ export const MonthlyView = ({ userTasks }: MonthlyViewProps) => {
       try {
         const year = currentDate.getFullYear();
         const month = currentDate.getMonth() + 1;
-        const data = await getMonthlyHistory(year, month);
-        setHistoryData(data);
+        const data = await getMonthlyActivity(year, month);
+        setHistoryData(data.habits);
+        setActivityDays(data.days);
       } catch (error) {
         console.error("Failed to fetch monthly history:", error);
       } finally {
@@ -80,6 +83,25 @@ export const MonthlyView = ({ userTasks }: MonthlyViewProps) => {
         </button>
       </div>
 
+      {!isLoading && activityDays.length > 0 && (
+        <div className="flex justify-around mb-4 bg-white p-3 rounded-xl shadow text-black text-sm">
+          <span>
+            Todos done:{" "}
+            {activityDays.reduce((sum, day) => sum + day.todosCompleted, 0)}
+          </span>
+          <span>
+            Todos started:{" "}
+            {activityDays.reduce((sum, day) => sum + day.todosStarted, 0)}
+          </span>
+          <span>
+            Spent:{" "}
+            {activityDays
+              .reduce((sum, day) => sum + day.spent, 0)
+              .toLocaleString()}
+          </span>
+        </div>
+      )}
+
       {isLoading ? (
         <div className="text-center p-8 text-black">
           Loading monthly progress...
@@ -22,12 +22,23 @@ import { AddCategoryForm } from "../components/AddCategoryForm";
 import { ConfirmationDialog } from "../components/ConfirmationDialog";
 import { EditForm } from "../components/EditForm";
 import { initialTasks } from "../data/mockTasks";
-import type { UserTasks, Category, Task, TaskHistory } from "../types";
+import type {
+  UserTasks,
+  Category,
+  Task,
+  TaskHistory,
+  DailyLog,
+} from "../types";
 import {
   getTasks,
   createInitialTasks,
   updateTasks,
   deleteTaskLog,
+  setTaskDay,
+  addTaskLog,
+  updateTaskLog,
+  moveTask,
+  renameTaskCategory,
 } from "../services/taskService";
 import { Plus, CaretLeft, CaretRight, Trash } from "phosphor-react";
 import { Button } from "../components/ui/Button";
@@ -218,11 +229,15 @@ export const TaskView = () => {
       if (task) {
         if (!task.daily_logs) task.daily_logs = [];
 
+        let save: () => Promise<unknown>;
         if (editingLogId) {
           // Editing existing log
+          const logId = editingLogId;
+          save = () =>
+            updateTaskLog(itemId, logId, { date: selectedLogDate, note });
           const existingLogIndex = task.daily_logs.findIndex(
-            (log: { date: string; note: string; created_at?: string }) => {
-              const logId = log.created_at || log.date;
+            (log: DailyLog) => {
+              const logId = log.id || log.created_at || log.date;
               return logId === editingLogId;
             }
           );
@@ -233,17 +248,20 @@ export const TaskView = () => {
           }
         } else {
           // Creating new log
-          task.daily_logs.push({
+          const newLog = {
+            id: crypto.randomUUID().replace(/-/g, ""),
             date: selectedLogDate,
             note: note,
             created_at: new Date().toISOString(),
-          });
+          };
+          task.daily_logs.push(newLog);
+          save = () => addTaskLog(itemId, newLog);
         }
 
         // Update the sidebar editing task with the new log data
         setSidebarEditingTask(task);
 
-        updateAndSaveChanges(newCategories);
+        updateAndSaveChanges(newCategories, save);
         toast.success(
           editingLogId ? "Log updated successfully!" : "Log saved successfully!"
         );
@@ -269,10 +287,10 @@ export const TaskView = () => {
       if (category) {
         const task = category.tasks.find((t: Task) => t.id === itemId);
         if (task && task.daily_logs) {
-          // Remove the log with the matching unique identifier (created_at or date)
+          // Remove the log with the matching unique identifier (id, created_at or date)
           task.daily_logs = task.daily_logs.filter(
-            (log: { date: string; note: string; created_at?: string }) => {
-              const currentLogId = log.created_at || log.date;
+            (log: DailyLog) => {
+              const currentLogId = log.id || log.created_at || log.date;
               return currentLogId !== logId;
             }
           );
@@ -413,7 +431,9 @@ export const TaskView = () => {
       });
       destinationCategory.tasks.push(movedTask);
 
-      updateAndSaveChanges(newCategories);
+      updateAndSaveChanges(newCategories, () =>
+        moveTask(movedTask.id, destinationCategory.name)
+      );
       toast.success(`Task moved to "${destinationCategory.name}"`);
       return { ...prev, categories: newCategories };
     });
@@ -433,14 +453,19 @@ export const TaskView = () => {
     }
   };
 
-  const updateAndSaveChanges = async (newCategories: Category[]) => {
+  // Applies the change locally, then saves it: by default the whole task
+  // list, or just the one change when a targeted `save` request is given
+  const updateAndSaveChanges = async (
+    newCategories: Category[],
+    save: () => Promise<unknown> = () => updateTasks(newCategories)
+  ) => {
     const previousTasks = userTasks; // Keep a backup to revert on error
     setUserTasks((prev) =>
       prev ? { ...prev, categories: newCategories } : null
     );
     if (!isNewUser) {
       try {
-        await updateTasks(newCategories);
+        await save();
         // A success toast here can be a bit noisy on every check, so we can omit it.
       } catch (error) {
         console.error("Failed to update tasks:", error);
@@ -474,12 +499,14 @@ export const TaskView = () => {
     const { newText, newCategory, newNotes } = data;
     const newCategories = JSON.parse(JSON.stringify(userTasks.categories));
     const originalCategoryName = editingInfo.categoryName;
+    let save: (() => Promise<unknown>) | undefined;
 
     if (editingInfo.type === "category") {
       const categoryToEdit = newCategories.find(
         (c: Category) => c.name === originalCategoryName
       );
       if (categoryToEdit) categoryToEdit.name = newText;
+      save = () => renameTaskCategory(originalCategoryName, newText);
     } else {
       // type is 'task'
       const sourceCategory = newCategories.find(
@@ -506,7 +533,7 @@ export const TaskView = () => {
         }
       }
     }
-    updateAndSaveChanges(newCategories);
+    updateAndSaveChanges(newCategories, save);
     setEditingInfo(null);
   };
 
@@ -577,7 +604,9 @@ export const TaskView = () => {
         }
       }
     }
-    updateAndSaveChanges(newCategories);
+    updateAndSaveChanges(newCategories, () =>
+      setTaskDay(taskId, date, !currentState)
+    );
   };
 
   const handleDeleteTask = (categoryName: string, taskId: number) => {
@@ -901,18 +930,7 @@ export const TaskView = () => {
                               <div className="space-y-2 max-h-64 overflow-y-auto">
                                 {sidebarEditingTask.daily_logs
                                   .sort(
-                                    (
-                                      a: {
-                                        date: string;
-                                        note: string;
-                                        created_at?: string;
-                                      },
-                                      b: {
-                                        date: string;
-                                        note: string;
-                                        created_at?: string;
-                                      }
-                                    ) => {
+                                    (a: DailyLog, b: DailyLog) => {
                                       // Sort by created_at if available, otherwise by date
                                       const dateA = a.created_at
                                         ? new Date(a.created_at)
@@ -925,14 +943,7 @@ export const TaskView = () => {
                                   )
                                   .slice(0, logsToShow)
                                   .map(
-                                    (
-                                      log: {
-                                        date: string;
-                                        note: string;
-                                        created_at?: string;
-                                      },
-                                      index: number
-                                    ) => (
+                                    (log: DailyLog, index: number) => (
                                       <div
                                         key={index}
                                         className="p-3 bg-gray-50 rounded-lg"
@@ -966,7 +977,7 @@ export const TaskView = () => {
                                                 setSelectedLogDate(log.date);
                                                 setTempLogNote(log.note);
                                                 setEditingLogId(
-                                                  log.created_at || log.date
+                                                  log.id || log.created_at || log.date
                                                 );
                                               }}
                                               className="text-black hover:text-gray-600 text-xs px-2 py-1 rounded hover:bg-gray-100 transition-colors"
@@ -981,9 +992,9 @@ export const TaskView = () => {
                                                     "Are you sure you want to delete this log?"
                                                   )
                                                 ) {
-                                                  // Use created_at as unique identifier, fallback to date if not available
+                                                  // Use the log id, falling back to created_at or date for older logs
                                                   const logId =
-                                                    log.created_at || log.date;
+                                                    log.id || log.created_at || log.date;
                                                   handleDeleteTaskLog(
                                                     sidebarEditingTask.id,
                                                     logId
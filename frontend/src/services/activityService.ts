@@ -0,0 +1,13 @@
+import api from "./api";
+import type { MonthlyActivity } from "../types/activity";
+
+// Habits, todos and spending per day of one month
+export const getMonthlyActivity = async (
+  year: number,
+  month: number
+): Promise<MonthlyActivity> => {
+  const response = await api.get("/activity/monthly", {
+    params: { year, month },
+  });
+  return response.data;
+};
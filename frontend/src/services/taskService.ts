@@ -1,9 +1,13 @@
 import type { Category } from "../types";
 import api from "./api";
 
-// Fetches the logged-in user's tasks
-export const getTasks = async () => {
-  const response = await api.get("/tasks/");
+// Fetches the logged-in user's tasks. History and logs older than the archive
+// horizon are only included for an explicitly requested month.
+export const getTasks = async (archivedMonth?: {
+  year: number;
+  month: number;
+}) => {
+  const response = await api.get("/tasks/", { params: archivedMonth });
   return response.data;
 };
 
@@ -19,6 +23,72 @@ export const updateTasks = async (categories: Category[]) => {
   return response.data;
 };
 
+// Marks a single day of a task as done / not done
+export const setTaskDay = async (
+  taskId: number,
+  date: string,
+  completed: boolean
+) => {
+  const response = await api.put(`/tasks/${taskId}/history/${date}`, {
+    completed,
+  });
+  return response.data;
+};
+
+// Adds a daily log to a task
+export const addTaskLog = async (
+  taskId: number,
+  log: { id?: string; date: string; note: string; created_at?: string }
+) => {
+  const response = await api.post(`/tasks/${taskId}/logs`, log);
+  return response.data;
+};
+
+// Edits a daily log (identified by id, or created_at / date for older logs)
+export const updateTaskLog = async (
+  taskId: number,
+  logId: string,
+  log: { date: string; note: string }
+) => {
+  const response = await api.put(`/tasks/${taskId}/logs/${logId}`, log);
+  return response.data;
+};
+
+// Moves a task to another category
+export const moveTask = async (taskId: number, categoryName: string) => {
+  const response = await api.put(`/tasks/${taskId}/move`, {
+    category_name: categoryName,
+  });
+  return response.data;
+};
+
+// Renames a task category
+export const renameTaskCategory = async (oldName: string, newName: string) => {
+  const response = await api.put(
+    `/tasks/categories/${encodeURIComponent(oldName)}`,
+    { name: newName }
+  );
+  return response.data;
+};
+
+// Current and longest streak per task, as of the user's local today
+export const getTaskStreaks = async (today: string) => {
+  const response = await api.get("/tasks/streaks", { params: { today } });
+  return response.data;
+};
+
+// Tasks due or overdue as of the user's local today
+export const getTaskPlanner = async (today: string) => {
+  const response = await api.get("/tasks/planner", { params: { today } });
+  return response.data;
+};
+
+// A year of completions per task, plus daily totals and ratios
+export const getTaskHeatmap = async (year: number) => {
+  const response = await api.get("/tasks/heatmap", { params: { year } });
+  return response.data;
+};
+
 // Fetches task completion history for a specific month
 export const getMonthlyHistory = async (year: number, month: number) => {
   const response = await api.get("/tasks/history", {
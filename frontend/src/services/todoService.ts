@@ -4,6 +4,8 @@ import type {
   CreateTodoData,
   UpdateTodoData,
   CreateTodoLogData,
+  TodoLog,
+  TodoMove,
 } from "../types";
 
 // Helper to transform the response to TodoItem
@@ -37,6 +39,14 @@ export const updateTodo = async (
   return transformTodoItem(response.data);
 };
 
+// Move/reorder many cards in one request (e.g. a whole Kanban column)
+export const bulkUpdateTodos = async (
+  changes: TodoMove[]
+): Promise<{ matched: number; modified: number }> => {
+  const response = await api.put("/todos/bulk", { changes });
+  return response.data;
+};
+
 export const deleteTodo = async (id: string): Promise<void> => {
   await api.delete(`/todos/${id}`);
 };
@@ -66,6 +76,18 @@ export const deleteTodoLog = async (
   return transformTodoItem(response.data);
 };
 
+// Older logs, newest first; pass the oldest loaded log id as `before`
+export const getTodoLogs = async (
+  todoId: string,
+  before?: string,
+  limit = 20
+): Promise<TodoLog[]> => {
+  const response = await api.get(`/todos/${todoId}/logs`, {
+    params: { before, limit },
+  });
+  return response.data;
+};
+
 export const getTodoById = async (id: string): Promise<TodoItem> => {
   const response = await api.get(`/todos/${id}`);
   return transformTodoItem(response.data);
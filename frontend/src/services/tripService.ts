@@ -1,6 +1,12 @@
 // src/services/tripService.ts
 import api from "./api";
-import type { Trip, Participant, Transaction } from "../types/trip";
+import type {
+  Trip,
+  TripSummary,
+  TripSettlement,
+  Participant,
+  Transaction,
+} from "../types/trip";
 
 export interface CreateTripData {
   name: string;
@@ -73,6 +79,18 @@ export const tripService = {
     return trips;
   },
 
+  // Get every trip with counts and totals, without participants/transactions
+  async getTripSummaries(): Promise<TripSummary[]> {
+    const response = await api.get("/trips/summary");
+    return response.data;
+  },
+
+  // Net balances and the fewest transfers that settle the trip
+  async getSettlement(tripId: string): Promise<TripSettlement> {
+    const response = await api.get(`/trips/${tripId}/settlement`);
+    return response.data;
+  },
+
   // Get a specific trip
   async getTrip(tripId: string): Promise<Trip> {
     const response = await api.get(`/trips/${tripId}`);
@@ -178,6 +196,27 @@ export const tripService = {
     return response.data;
   },
 
+  // A page of a trip's transactions, newest first. Pass the returned
+  // nextCursor as `before` to get the next page.
+  async getTransactions(
+    tripId: string,
+    before?: string,
+    limit?: number
+  ): Promise<{ transactions: Transaction[]; nextCursor: string | null }> {
+    const response = await api.get(`/trips/${tripId}/transactions`, {
+      params: { before, limit },
+    });
+    return {
+      transactions: response.data.map(
+        (transaction: Transaction & { _id?: string }) => ({
+          ...transaction,
+          id: transaction.id || transaction._id,
+        })
+      ),
+      nextCursor: response.headers["x-next-cursor"] ?? null,
+    };
+  },
+
   // Add a transaction to a trip
   async addTransaction(
     tripId: string,
@@ -0,0 +1,18 @@
+// src/types/activity.ts
+
+export interface DayActivity {
+  date: string; // "YYYY-MM-DD"
+  habitsCompleted: number;
+  todosCompleted: number;
+  todosStarted: number;
+  spent: number;
+  expenses: number;
+}
+
+export interface MonthlyActivity {
+  year: number;
+  month: number;
+  habits: Record<number, string[]>; // Task id -> completed dates
+  days: DayActivity[];
+  totalSpent: number;
+}
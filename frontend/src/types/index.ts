@@ -6,8 +6,10 @@ export interface TaskHistory {
 
 // Add this new interface
 export interface DailyLog {
+  id?: string;
   date: string;
   note: string;
+  created_at?: string;
 }
 
 // Matches the Task model in FastAPI
@@ -237,7 +239,9 @@ export interface TodoItem {
   createdAt: string;
   inProgressAt?: string; // When moved to "In Progress"
   completedAt?: string; // When moved to "Done"
-  logs: TodoLog[];
+  position?: number; // Order within its Kanban column
+  logCount?: number;
+  logs: TodoLog[]; // Most recent logs only; empty in board listings
 }
 
 export interface CreateTodoData {
@@ -253,6 +257,12 @@ export interface UpdateTodoData {
   completedAt?: string;
 }
 
+export interface TodoMove {
+  id: string;
+  status?: TodoStatus;
+  position?: number;
+}
+
 export interface CreateTodoLogData {
   notes: string;
 }
@@ -6,6 +6,7 @@ export interface Participant {
   email?: string;
   initial_contribution: number;
   total_contributed: number;
+  paid_for_group?: number; // Out-of-pocket expenses paid for the group
   payment_method?: "cash" | "phonepe" | "googlepay" | "bank_transfer" | "other";
 }
 
@@ -24,12 +25,24 @@ export interface Transaction {
   participant_id?: string; // For participant contributions
 }
 
+// Maintained by the server on every write
+export interface TripTotals {
+  spent: number;
+  contributed: number;
+  transaction_count: number;
+  by_category: Record<string, number>;
+  by_type: Partial<
+    Record<Transaction["type"], { amount: number; count: number }>
+  >;
+}
+
 export interface Trip {
   id: string;
   name: string;
   destinations: string[];
   participants: Participant[];
-  transactions: Transaction[];
+  transactions: Transaction[]; // The most recent ones; page the rest
+  totals: TripTotals;
   start_date?: Date;
   end_date?: Date;
   status: "planning" | "active" | "completed";
@@ -40,3 +53,38 @@ export interface Trip {
 }
 
 export type TripType = "big-trips" | "small-gatherings";
+
+// A trip without its embedded arrays, with totals computed by the server
+export interface TripSummary {
+  id: string;
+  name: string;
+  destinations: string[];
+  start_date?: Date;
+  end_date?: Date;
+  status: "planning" | "active" | "completed";
+  leader_id: string;
+  created_at?: Date;
+  updated_at?: Date;
+  participant_count: number;
+  transaction_count: number;
+  total_spent: number;
+  total_contributed: number;
+}
+
+// Who owes whom: net balances and the transfers that settle them
+export interface TripSettlement {
+  method: "exact" | "greedy";
+  balances: {
+    member_id: string; // "leader" or a participant id
+    name: string;
+    paid: number;
+    net: number; // Positive: is owed money
+  }[];
+  transfers: {
+    from_id: string;
+    from_name: string;
+    to_id: string;
+    to_name: string;
+    amount: number;
+  }[];
+}